@@ -1,11 +1,14 @@
 try:
+    import ctypes
+    import fcntl
+    import os
     import time
     from sonic_py_common.logger import Logger
     from .sfp import Sfp
 except ImportError as e:
     raise ImportError(repr(e) + " - required module not found")
 
-POLL_INTERVAL_IN_SEC = 1
+POLL_INTERVAL_IN_SEC = 0.5
 
 # SFP errors that will block eeprom accessing
 SFP_BLOCKING_ERRORS = [
@@ -16,23 +19,119 @@ SFP_BLOCKING_ERRORS = [
     Sfp.SFP_ERROR_BIT_BAD_CABLE
 ]
 
+# i2c-dev ioctls, see linux/i2c-dev.h
+I2C_SLAVE_FORCE = 0x0706
+I2C_SMBUS = 0x0720
+I2C_SMBUS_READ = 1
+I2C_SMBUS_BYTE_DATA = 2
+
+
+class _SmbusData(ctypes.Union):
+    _fields_ = [('byte', ctypes.c_uint8),
+                ('word', ctypes.c_uint16),
+                ('block', ctypes.c_uint8 * 34)]
+
+
+class _SmbusIoctlData(ctypes.Structure):
+    _fields_ = [('read_write', ctypes.c_uint8),
+                ('command', ctypes.c_uint8),
+                ('size', ctypes.c_uint32),
+                ('data', ctypes.POINTER(_SmbusData))]
+
+
+class CpldPresence:
+    '''
+    Reads the presence of all ports from the CPLD registers holding the
+    xcvr_present bits, as described in pddf-device.json. Each register is
+    read once for all the ports sharing it, by a single SMBus transaction.
+    Ports without a CPLD presence bit, or with a register which can't be
+    read, fall back to Sfp.get_presence().
+    '''
+
+    def __init__(self, sfp_list, logger):
+        self._logger = logger
+        self._fds = {}
+        self._failed = set()
+        # (bus, devaddr, offset) -> list of (port index, mask, cmpval, sfp)
+        self._registers = {}
+        self._other_sfps = []
+        for sfp in sfp_list:
+            attr = self._get_present_attr(sfp)
+            if attr is None:
+                self._other_sfps.append(sfp)
+                continue
+            key = attr[:3]
+            self._registers.setdefault(key, []).append(
+                (sfp.get_position_in_parent() - 1, attr[3], attr[4], sfp))
+
+    def _get_present_attr(self, sfp):
+        try:
+            data = sfp.pddf_obj.data
+            for attr in data[sfp.device + '-CTRL']['i2c']['attr_list']:
+                if attr['attr_name'] != 'xcvr_present':
+                    continue
+                if attr['attr_devtype'] != 'cpld':
+                    return None
+                topo = data[attr['attr_devname']]['i2c']['topo_info']
+                return (int(topo['parent_bus'], 16), int(attr['attr_devaddr'], 16),
+                        int(attr['attr_offset'], 16), int(attr['attr_mask'], 16),
+                        int(attr['attr_cmpval'], 16))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            pass
+        return None
+
+    def _read_byte(self, bus, devaddr, offset):
+        fd = self._fds.get(bus)
+        if fd is None:
+            fd = os.open('/dev/i2c-{}'.format(bus), os.O_RDWR)
+            self._fds[bus] = fd
+        # The CPLD is bound to its driver, hence force the address
+        fcntl.ioctl(fd, I2C_SLAVE_FORCE, devaddr)
+        data = _SmbusData()
+        msg = _SmbusIoctlData(read_write=I2C_SMBUS_READ, command=offset,
+                              size=I2C_SMBUS_BYTE_DATA, data=ctypes.pointer(data))
+        fcntl.ioctl(fd, I2C_SMBUS, msg)
+        return data.byte
+
+    def get_presence_bitmap(self):
+        bitmap = 0
+        for (bus, devaddr, offset), ports in self._registers.items():
+            try:
+                value = self._read_byte(bus, devaddr, offset)
+            except (IOError, OSError) as e:
+                if (bus, devaddr, offset) not in self._failed:
+                    self._failed.add((bus, devaddr, offset))
+                    self._logger.log_warning("Failed to read CPLD 0x{:x} reg 0x{:x} on bus {}: {}".format(
+                        devaddr, offset, bus, str(e)))
+                fd = self._fds.pop(bus, None)
+                if fd is not None:
+                    os.close(fd)
+                for i, _, _, sfp in ports:
+                    if sfp.get_presence():
+                        bitmap |= (1 << i)
+                continue
+            self._failed.discard((bus, devaddr, offset))
+            for i, mask, cmpval, _ in ports:
+                if (value & (1 << mask)) == cmpval:
+                    bitmap |= (1 << i)
+        for sfp in self._other_sfps:
+            if sfp.get_presence():
+                bitmap |= (1 << (sfp.get_position_in_parent() - 1))
+        return bitmap
+
+
 class SfpEvent:
     ''' Listen to insert/remove sfp events '''
 
     def __init__(self, sfp_list):
         self._sfp_list = sfp_list
         self._logger = Logger()
+        self._presence = CpldPresence(sfp_list, self._logger)
         self._sfp_change_event_data = {'present': 0}
         self._sfp_change_event_data['present'] = self.get_presence_bitmap()
 
     def get_presence_bitmap(self):
-        bitmap = 0
-        for sfp in self._sfp_list:
-            modpres = sfp.get_presence()
-            i=sfp.get_position_in_parent() - 1
-            if modpres:
-                bitmap = bitmap | (1 << i)
-        return bitmap
+        return self._presence.get_presence_bitmap()
 
     def get_sfp_event(self, timeout=2000):
         port_dict = {}
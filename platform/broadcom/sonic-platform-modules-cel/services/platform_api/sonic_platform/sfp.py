@@ -231,6 +231,10 @@ QSFP_TYPE = "QSFP"
 OSFP_TYPE = "OSFP"
 QSFP_DD_TYPE = "QSFP_DD"
 
+# EEPROM is read in whole pages; cached pages are reused within one poll cycle
+EEPROM_PAGE_SIZE = 128
+EEPROM_PAGE_CACHE_TTL = 1
+
 
 class Sfp(SfpBase):
     """Platform-specific Sfp class"""
@@ -241,6 +245,8 @@ class Sfp(SfpBase):
         self._sfp_index = sfp_index
         self._config = conf
         self._api_common = Common(self._config)
+        self._eeprom_pages = {}
+        self._last_presence = None
 
         self._read_porttab_mappings()
         self._dom_capability_detect()
@@ -281,27 +287,63 @@ class Sfp(SfpBase):
         else:
             return Common.NULL_VAL
 
-    def _read_eeprom_specific_bytes(self, offset, num_bytes):
-        sysfsfile_eeprom = None
-        eeprom_raw = []
-        for i in range(0, num_bytes):
-            eeprom_raw.append("0x00")
+    def _invalidate_eeprom_cache(self):
+        self._eeprom_pages = {}
+
+    def _read_eeprom_page(self, page_start, now):
+        cached = self._eeprom_pages.get(page_start)
+        if cached is not None and now - cached[1] < EEPROM_PAGE_CACHE_TTL:
+            return cached[0]
 
-        sysfs_sfp_i2c_client_eeprom_path = self._get_eeprom_path()
+        sysfsfile_eeprom = None
         try:
             sysfsfile_eeprom = open(
-                sysfs_sfp_i2c_client_eeprom_path, mode="rb", buffering=0)
-            sysfsfile_eeprom.seek(offset)
-            raw = sysfsfile_eeprom.read(num_bytes)
-            for n in range(0, num_bytes):
-                eeprom_raw[n] = hex(ord(raw[n]))[2:].zfill(2)
+                self._get_eeprom_path(), mode="rb", buffering=0)
+            sysfsfile_eeprom.seek(page_start)
+            page = sysfsfile_eeprom.read(EEPROM_PAGE_SIZE)
         except Exception:
-            pass
+            self._eeprom_pages.pop(page_start, None)
+            return None
         finally:
             if sysfsfile_eeprom:
                 sysfsfile_eeprom.close()
 
-        return eeprom_raw
+        self._eeprom_pages[page_start] = (page, now)
+        return page
+
+    def _read_eeprom_bytes(self, offset, num_bytes):
+        """
+        Reads num_bytes from the transceiver EEPROM starting at offset.
+        Whole 128-byte pages are read and kept for EEPROM_PAGE_CACHE_TTL
+        seconds so the individual DOM getters called during one xcvrd poll
+        share a single read per page.
+        Returns:
+            bytes, or None if the range could not be read
+        """
+        now = time.time()
+        data = b''
+        page_start = offset - offset % EEPROM_PAGE_SIZE
+        end = offset + num_bytes
+        while page_start < end:
+            page = self._read_eeprom_page(page_start, now)
+            if page is None:
+                return None
+            data += page[max(offset - page_start, 0):end - page_start]
+            if len(page) < EEPROM_PAGE_SIZE:
+                break
+            page_start += EEPROM_PAGE_SIZE
+
+        if len(data) != num_bytes:
+            return None
+        return data
+
+    def _read_eeprom_specific_bytes(self, offset, num_bytes):
+        raw = self._read_eeprom_bytes(offset, num_bytes)
+        if raw is None:
+            return ["0x00"] * num_bytes
+
+        # sonic_sfp parsers take a list of hex strings
+        return ["%02x" % b for b in bytearray(raw)]
 
     def _detect_sfp_type(self):
         sfp_type = QSFP_TYPE
@@ -488,7 +530,12 @@ class Sfp(SfpBase):
         Returns:
             bool: True if device is present, False if not
         """
-        return self._api_common.get_output(self._sfp_index, self._config['get_presence'], False)
+        presence = self._api_common.get_output(
+            self._sfp_index, self._config['get_presence'], False)
+        if presence != self._last_presence:
+            self._invalidate_eeprom_cache()
+            self._last_presence = presence
+        return presence
 
     def get_model(self):
         """
@@ -1899,6 +1946,7 @@ class Sfp(SfpBase):
         time.sleep(1)
         # Flip the bit back high and write back to the register to take port out of reset
         output2 = self._api_common.set_output(self._sfp_index, "0x1", config)
+        self._invalidate_eeprom_cache()
 
         return True if (output1 and output2) else False
 
@@ -1929,6 +1977,7 @@ class Sfp(SfpBase):
                 print("Error: unable to open file: %s" % str(e))
                 return False
             finally:
+                self._invalidate_eeprom_cache()
                 if sysfsfile_eeprom is not None:
                     sysfsfile_eeprom.close()
                     time.sleep(0.01)
@@ -1968,6 +2017,7 @@ class Sfp(SfpBase):
                 print("Error: unable to open file: %s" % str(e))
                 return False
             finally:
+                self._invalidate_eeprom_cache()
                 if sysfsfile_eeprom is not None:
                     sysfsfile_eeprom.close()
                     time.sleep(0.01)
@@ -1985,6 +2035,7 @@ class Sfp(SfpBase):
         Returns:
             A boolean, True if lpmode is set successfully, False if not
         """
+        self._invalidate_eeprom_cache()
         return self._api_common.set_output(self._sfp_index, str(lpmode), self._config['set_lpmode'])
 
     def set_power_override(self, power_override, power_set):
@@ -2029,6 +2080,7 @@ class Sfp(SfpBase):
                 print("Error: unable to open file: %s" % str(e))
                 return False
             finally:
+                self._invalidate_eeprom_cache()
                 if sysfsfile_eeprom is not None:
                     sysfsfile_eeprom.close()
                     time.sleep(0.01)
@@ -1,21 +1,48 @@
+import time
+
+from .running_config import RunningConfig
+
+
 class ConfigMgr(object):
     """ The class represents frr configuration """
+    RESYNC_INTERVAL = 300  # seconds. Catch changes made in FRR outside of bgpcfgd
+
     def __init__(self, frr):
         self.frr = frr
         self.current_config = None
         self.current_config_raw = None
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.running_config = None
+        self.generation = 0         # incremented on every commit
+        self.model_generation = -1  # generation the running config model is up to date with
+        self.sync_time = 0.0
 
     def reset(self):
-        """ Reset stored config """
-        self.current_config = None
-        self.current_config_raw = None
+        """ Reset pending changes """
         self.changes = ""
         self.peer_groups_to_restart = []
 
+    def invalidate(self):
+        """ Drop stored config. The next update() reads it from FRR """
+        self.current_config = None
+        self.current_config_raw = None
+        self.running_config = None
+        self.model_generation = -1
+
+    def is_synced(self):
+        """ Return True if the stored config reflects all commits and isn't too old """
+        return self.running_config is not None \
+            and self.model_generation == self.generation \
+            and time.time() - self.sync_time < self.RESYNC_INTERVAL
+
     def update(self):
-        """ Read current config from FRR """
+        """
+        Make sure the stored config is up to date. The config is read from FRR
+        only if the model of running config missed a commit
+        """
+        if self.is_synced():
+            return
         self.current_config = None
         self.current_config_raw = None
         out = self.frr.get_config()
@@ -27,6 +54,9 @@ class ConfigMgr(object):
         text += ["     "]  # Add empty line to have something to work on, if there is no text
         self.current_config_raw = text
         self.current_config = self.to_canonical(out)  # FIXME: use text as an input
+        self.running_config = RunningConfig(out)
+        self.model_generation = self.generation
+        self.sync_time = time.time()
 
     def push_list(self, cmdlist):
         """
@@ -59,12 +89,49 @@ class ConfigMgr(object):
             return True
         rc_write = self.frr.write(self.changes)
         rc_restart = self.frr.restart_peer_groups(self.peer_groups_to_restart)
+        self.generation += 1
+        if rc_write and self.running_config is not None and self.running_config.apply(self.changes):
+            self.model_generation = self.generation
+            self.current_config = None
+            self.current_config_raw = None
         self.reset()
         return rc_write and rc_restart
 
     def get_text(self):
+        if self.current_config_raw is None and self.running_config is not None:
+            self.current_config_raw = self.running_config.get_lines() + ["     "]
         return self.current_config_raw
 
+    def get_canonical(self):
+        if self.current_config is None and self.running_config is not None:
+            self.current_config = self.running_config.get_paths()
+        return self.current_config
+
+    def get_prefix_list(self, family, name):
+        """ Return entries of prefix-list 'name' of family 'ip' or 'ipv6' """
+        self.update()
+        return self.running_config.get_prefix_list(family, name)
+
+    def get_community_list(self, name):
+        """ Return entries of community-list 'name' """
+        self.update()
+        return self.running_config.get_community_list(name)
+
+    def get_route_map(self, name):
+        """ Return entries of route-map 'name' with their commands """
+        self.update()
+        return self.running_config.get_route_map(name)
+
+    def get_peer_groups(self):
+        """ Return names of configured peer-groups """
+        self.update()
+        return self.running_config.get_peer_groups()
+
+    def get_neighbor_route_maps(self, direction):
+        """ Return (neighbor, route-map name) pairs of the route-maps applied to neighbors in 'direction' """
+        self.update()
+        return self.running_config.get_neighbor_route_maps(direction)
+
     @staticmethod
     def to_canonical(raw_config):
         """
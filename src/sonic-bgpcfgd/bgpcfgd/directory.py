@@ -3,12 +3,46 @@ from collections import defaultdict
 from .log import log_err
 
 
+class Subscription(object):
+    """ A handler with its dependencies. Tracks which dependencies are not in the storage yet """
+    def __init__(self, handler, deps, order):
+        self.handler = handler
+        self.deps = deps
+        self.order = order  # handlers are run in the order of subscription
+        self.missing = set(range(len(deps)))  # indexes of deps which are not presented
+
+
+class PathTrie(object):
+    """ Node of a trie of subscribed paths. Each node keeps subscriptions to its path """
+    def __init__(self, path=''):
+        self.path = path
+        self.children = {}
+        self.subscriptions = []  # list of (Subscription, index of the dependency)
+
+    def insert(self, path, subscription, index):
+        node = self
+        for p in path.split("/") if path != '' else []:
+            if p not in node.children:
+                node.children[p] = PathTrie(p if node.path == '' else node.path + "/" + p)
+            node = node.children[p]
+        node.subscriptions.append((subscription, index))
+
+    def collect(self, out):
+        """ Collect the node and all its descendants which have subscriptions """
+        if self.subscriptions:
+            out.append(self)
+        for child in self.children.values():
+            child.collect(out)
+        return out
+
+
 class Directory(object):
     """ This class stores values and notifies callbacks which were registered to be executed as soon
         as some value is changed. This class works as DB cache mostly """
     def __init__(self):
         self.data = defaultdict(dict)  # storage. A key is a slot name, a value is a dictionary with data
-        self.notify = defaultdict(lambda: defaultdict(list))  # registered callbacks: slot -> path -> handlers[]
+        self.notify = defaultdict(PathTrie)  # registered callbacks: slot -> trie of subscribed paths
+        self.subscriptions = []
 
     @staticmethod
     def get_slot_name(db, table):
@@ -72,10 +106,35 @@ class Directory(object):
         slot = self.get_slot_name(db, table)
         self.data[slot][key] = value
         if slot in self.notify:
-            for path in self.notify[slot].keys():
-                if self.path_exist(db, table, path):
-                    for handler in self.notify[slot][path]:
-                        handler()
+            # Only subscriptions to the whole slot or to a path inside of the key are affected
+            for subscription in self.__update_deps(slot, key):
+                if not subscription.missing:
+                    subscription.handler()
+
+    def __update_deps(self, slot, key):
+        """
+        Refresh state of dependencies which could be changed by a change of the key
+        :param slot: changed slot
+        :param key: changed key, None if the whole slot was changed
+        :return: list of affected subscriptions in the order of subscription
+        """
+        root = self.notify[slot]
+        if key is None:
+            nodes = root.collect([])
+        else:
+            nodes = [root] if root.subscriptions else []
+            if key in root.children:
+                root.children[key].collect(nodes)
+        affected = {}
+        for node in nodes:
+            exists = self.path_traverse(slot, node.path)[0]
+            for subscription, index in node.subscriptions:
+                if exists:
+                    subscription.missing.discard(index)
+                else:
+                    subscription.missing.add(index)
+                affected[subscription.order] = subscription
+        return [affected[order] for order in sorted(affected)]
 
     def get(self, db, table, key):
         """
@@ -109,6 +168,8 @@ class Directory(object):
         if slot in self.data:
             if key in self.data[slot]:
                 del self.data[slot][key]
+                if slot in self.notify:
+                    self.__update_deps(slot, key)
             else:
                 log_err("Directory: Can't remove key '%s' from slot '%s'. The key doesn't exist" % (key, slot))
         else:
@@ -123,6 +184,8 @@ class Directory(object):
         slot = self.get_slot_name(db, table)
         if slot in self.data:
             del self.data[slot]
+            if slot in self.notify:
+                self.__update_deps(slot, None)
         else:
             log_err("Directory: Can't remove slot '%s'. The slot doesn't exist" % slot)
 
@@ -150,10 +213,13 @@ class Directory(object):
     def subscribe(self, deps, handler):
         """
         Subscribe the handler to be run as soon as all dependencies are presented
-        :param deps:
-        :param handler:
-        :return:
+        :param deps: list of dependencies: (db, table, path)
+        :param handler: handler to run
         """
-        for db, table, path in deps:
+        subscription = Subscription(handler, list(deps), len(self.subscriptions))
+        self.subscriptions.append(subscription)
+        for index, (db, table, path) in enumerate(subscription.deps):
             slot = self.get_slot_name(db, table)
-            self.notify[slot][path].append(handler)
\ No newline at end of file
+            self.notify[slot].insert(path, subscription, index)
+            if self.path_exist(db, table, path):
+                subscription.missing.discard(index)
\ No newline at end of file
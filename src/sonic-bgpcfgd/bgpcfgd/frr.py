@@ -1,17 +1,128 @@
 import os
 import datetime
+import socket
 import time
 import tempfile
 
-from bgpcfgd.log import log_err, log_info, log_warn, log_crit
+from bgpcfgd.log import log_err, log_info, log_warn, log_crit, log_debug
 from .vars import g_debug
 from .utils import run_command
 
 
+class VtyClient(object):
+    """
+    Persistent connection to the vty unix socket of a FRR daemon.
+    Speaks the protocol used by vtysh: a command is terminated by '\\0',
+    a reply is terminated by three '\\0' bytes followed by the return code
+    """
+    SOCKET_PATH = '/run/frr/%s.vty'
+    CMD_SUCCESS = 0
+    CMD_ERR_NO_MATCH = 2
+    PIPELINE_WINDOW = 64    # commands sent before the replies are read
+    TIMEOUT = 60            # seconds
+
+    def __init__(self, daemon):
+        self.daemon = daemon
+        self.path = self.SOCKET_PATH % daemon
+        self.sock = None
+        self.buffer = b''
+
+    def is_connected(self):
+        return self.sock is not None
+
+    def connect(self):
+        """
+        Connect to the daemon, if not connected yet
+        :return: True if the connection is established, False otherwise
+        """
+        if self.sock is not None:
+            return True
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.TIMEOUT)
+            sock.connect(self.path)
+        except (socket.error, OSError) as e:
+            sock.close()
+            log_debug("Can't connect to '%s': %s" % (self.path, str(e)))
+            return False
+        self.sock = sock
+        self.buffer = b''
+        try:
+            rc, out = self.execute("enable")
+        except (socket.error, OSError):
+            return False
+        if rc != self.CMD_SUCCESS:
+            log_err("Can't enable the vty of '%s': rc=%d out='%s'" % (self.daemon, rc, out))
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except (socket.error, OSError):
+                pass
+        self.sock = None
+        self.buffer = b''
+
+    def execute(self, command):
+        """
+        Execute one command
+        :param command: command to execute
+        :return: a tuple: return code of the command, output of the command
+        """
+        return self.execute_list([command])[0]
+
+    def execute_list(self, commands):
+        """
+        Execute commands. The commands are pipelined: up to PIPELINE_WINDOW commands are
+        sent before their replies are read. The connection is closed on a socket error
+        :param commands: list of commands to execute
+        :return: list of tuples: return code of the command, output of the command
+        """
+        replies = []
+        try:
+            for start in range(0, len(commands), self.PIPELINE_WINDOW):
+                window = commands[start:start + self.PIPELINE_WINDOW]
+                self.sock.sendall(b''.join(command.encode('utf-8') + b'\0' for command in window))
+                for _ in window:
+                    replies.append(self.__read_reply())
+        except (socket.error, OSError) as e:
+            log_err("Connection to '%s' failed: %s" % (self.path, str(e)))
+            self.close()
+            raise
+        return replies
+
+    def __read_reply(self):
+        while True:
+            pos = self.buffer.find(b'\0\0\0')
+            if pos >= 0 and len(self.buffer) >= pos + 4:
+                rc = self.buffer[pos + 3]
+                out = self.buffer[:pos].decode('utf-8', 'replace')
+                self.buffer = self.buffer[pos + 4:]
+                return rc, out
+            data = self.sock.recv(65536)
+            if not data:
+                raise socket.error("connection closed by '%s'" % self.daemon)
+            self.buffer += data
+
+
 class FRR(object):
     """Proxy object with FRR"""
+    CLOSING_COMMANDS = ('exit', 'exit-address-family', 'exit-vrf', 'exit-vni')
+    SKIPPED_LINES = ('Building configuration...', 'Current configuration:', 'end')
+
     def __init__(self, daemons):
         self.daemons = daemons
+        self.clients = {daemon: VtyClient(daemon) for daemon in daemons}
+
+    def connect(self):
+        """
+        Connect to the vty sockets of all the daemons
+        :return: True if all daemons are connected, False otherwise
+        """
+        return all([client.connect() for client in self.clients.values()])
 
     def wait_for_daemons(self, seconds):
         """
@@ -21,6 +132,9 @@ class FRR(object):
         stop_time = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
         log_info("Start waiting for FRR daemons: %s" % str(datetime.datetime.now()))
         while datetime.datetime.now() < stop_time:
+            if self.connect():
+                log_info("All required daemons have accepted vty connections: %s" % str(datetime.datetime.now()))
+                return
             ret_code, out, err = run_command(["vtysh", "-c", "show daemons"], hide_errors=True)
             if ret_code == 0 and all(daemon in out for daemon in self.daemons):
                 log_info("All required daemons have connected to vtysh: %s" % str(datetime.datetime.now()))
@@ -30,16 +144,31 @@ class FRR(object):
             time.sleep(0.1)  # sleep 100 ms
         raise RuntimeError("FRR daemons hasn't been started in %d seconds" % seconds)
 
-    @staticmethod
-    def get_config():
+    def get_config(self):
+        if self.connect():
+            try:
+                texts = []
+                for daemon in self.daemons:
+                    rc, text = self.clients[daemon].execute("show running-config")
+                    if rc != VtyClient.CMD_SUCCESS:
+                        log_crit("can't update running config from '%s': rc=%d out='%s'" % (daemon, rc, text))
+                        return ""
+                    texts.append(text)
+                return self.merge_config(texts)
+            except (socket.error, OSError):
+                pass  # fall back to vtysh
         ret_code, out, err = run_command(["vtysh", "-c", "show running-config"])
         if ret_code != 0:
             log_crit("can't update running config: rc=%d out='%s' err='%s'" % (ret_code, out, err))
             return ""
         return out
 
-    @staticmethod
-    def write(config_text):
+    def write(self, config_text):
+        if self.connect():
+            try:
+                return self.__write_vty(config_text)
+            except (socket.error, OSError):
+                pass  # fall back to vtysh
         fd, tmp_filename = tempfile.mkstemp(dir='/tmp')
         os.close(fd)
         with open(tmp_filename, 'w') as fp:
@@ -55,14 +184,135 @@ class FRR(object):
         return ret_code == 0
 
     @staticmethod
-    def restart_peer_groups(peer_groups):
+    def split_blocks(config_text):
+        """
+        Split configuration into blocks: a top level command followed by the indented
+        commands of its node, and the top level 'exit'/'end' commands closing the node.
+        Comments and empty lines are dropped
+        :param config_text: configuration to split
+        :return: list of lists of commands
+        """
+        blocks = []
+        for line in config_text.split('\n'):
+            if line.strip() == '' or line.lstrip().startswith('!'):
+                continue
+            if blocks and (line[0].isspace() or line.strip() in ('exit', 'end')):
+                blocks[-1].append(line)
+            else:
+                blocks.append([line])
+        return blocks
+
+    @staticmethod
+    def merge_config(texts):
+        """
+        Merge 'show running-config' outputs of the daemons into one configuration, as vtysh does.
+        A node configured in several daemons is written once with the commands of all of them,
+        and a command shown by several daemons is written once
+        :param texts: list of 'show running-config' outputs
+        :return: merged configuration
+        """
+        root = {}   # command -> [line, { command -> [...] }, closing line]
+        for text in texts:
+            stack = [(-1, root, None)]
+            for line in text.split('\n'):
+                s_line = line.strip()
+                if s_line == '' or s_line.startswith('!') or s_line in FRR.SKIPPED_LINES:
+                    continue
+                n_spaces = len(line) - len(line.lstrip())
+                while stack[-1][0] > n_spaces:
+                    stack.pop()
+                if s_line in FRR.CLOSING_COMMANDS:
+                    if stack[-1][0] == n_spaces:
+                        stack.pop()[2][2] = line.rstrip()
+                    continue
+                if stack[-1][0] == n_spaces:
+                    stack.pop()
+                node = stack[-1][1].setdefault(s_line, [line.rstrip(), {}, None])
+                stack.append((n_spaces, node[1], node))
+        lines = []
+        def write(node):
+            line, children, closing = node
+            lines.append(line)
+            for child in children.values():
+                write(child)
+            if closing is not None:
+                lines.append(closing)
+        for node in root.values():
+            write(node)
+            lines.append('!')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def __enter_config(self, clients):
+        """
+        Enter the configuration mode of the daemons
+        :param clients: list of clients of the daemons
+        :return: True if all the daemons entered the configuration mode, False otherwise
+        """
+        res = True
+        for client in clients:
+            rc, out = client.execute("configure terminal")
+            if rc != VtyClient.CMD_SUCCESS:
+                log_err("ConfigMgr::commit(): can't enter configuration mode of '%s': rc=%d out='%s'" % (client.daemon, rc, out))
+                res = False
+        return res
+
+    def __write_vty(self, config_text):
+        """
+        Write configuration through the vty sockets. vtysh sends each command to the daemons
+        which implement it. Here a block is sent to every daemon which accepted its top level
+        command, and a command is successful when at least one of them accepted it.
+        Nothing is sent when a daemon can't enter the configuration mode
+        :param config_text: configuration to write
+        :return: True if all commands were applied successfully, False otherwise
+        """
+        clients = [self.clients[daemon] for daemon in self.daemons]
+        res = self.__enter_config(clients)
+        blocks = self.split_blocks(config_text) if res else []
+        for block in blocks:
+            accepted = []
+            for client in clients:
+                rc, out = client.execute(block[0])
+                if rc != VtyClient.CMD_ERR_NO_MATCH:
+                    accepted.append((client, rc, out))
+            results = [[(rc, out)] for _, rc, out in accepted]
+            if len(block) > 1:
+                for i, (client, _, _) in enumerate(accepted):
+                    results[i] += client.execute_list(block[1:])
+            for line_no, line in enumerate(block):
+                rcs = [(client.daemon, result[line_no]) for (client, _, _), result in zip(accepted, results)]
+                errors = [(daemon, rc, out) for daemon, (rc, out) in rcs
+                          if rc not in (VtyClient.CMD_SUCCESS, VtyClient.CMD_ERR_NO_MATCH)]
+                if errors or not any(rc == VtyClient.CMD_SUCCESS for _, (rc, _) in rcs):
+                    log_err("ConfigMgr::commit(): can't apply command '%s': %s" % (line.strip(), str(errors or "unknown command")))
+                    res = False
+            if block[-1].strip() == 'end' and not self.__enter_config([client for client, _, _ in accepted]):
+                res = False
+                break
+        for client in clients:
+            client.execute("end")
+        return res
+
+    def restart_peer_groups(self, peer_groups):
         """ Restart peer-groups which support BBR
         :param peer_groups: List of peer_groups to restart
         :return: True if restart of all peer-groups was successful, False otherwise
         """
+        peer_groups = sorted(peer_groups)
+        commands = ["clear bgp peer-group %s soft in" % peer_group for peer_group in peer_groups]
+        if peer_groups and 'bgpd' in self.clients and self.clients['bgpd'].connect():
+            try:
+                replies = self.clients['bgpd'].execute_list(commands)
+                res = True
+                for peer_group, (rc, out) in zip(peer_groups, replies):
+                    if rc != VtyClient.CMD_SUCCESS:
+                        log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s'" % (peer_group, rc, out))
+                    res = res and (rc == VtyClient.CMD_SUCCESS)
+                return res
+            except (socket.error, OSError):
+                pass  # fall back to vtysh
         res = True
-        for peer_group in sorted(peer_groups):
-            rc, out, err = run_command(["vtysh", "-c", "clear bgp peer-group %s soft in" % peer_group])
+        for peer_group, command in zip(peer_groups, commands):
+            rc, out, err = run_command(["vtysh", "-c", command])
             if rc != 0:
                 log_value = peer_group, rc, out, err
                 log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s', err='%s'" % log_value)
@@ -29,7 +29,9 @@ from .vars import g_debug
 
 def do_work():
     """ Main function """
-    st_rt_timer = StaticRouteTimer()
+    constants = read_constants()
+    expiry = constants.get('bgp', {}).get('static_route_expiry', {})
+    st_rt_timer = StaticRouteTimer(expiry.get('use_index', False))
     thr = threading.Thread(target = st_rt_timer.run)
     thr.start()
     frr = FRR(["bgpd", "zebra", "staticd"])
@@ -39,7 +41,7 @@ def do_work():
         'directory': Directory(),
         'cfg_mgr':   ConfigMgr(frr),
         'tf':        TemplateFabric(),
-        'constants': read_constants(),
+        'constants': constants,
     }
     managers = [
         # Config DB managers
@@ -67,14 +69,17 @@ def do_work():
         BBRMgr(common_objs, "CONFIG_DB", "BGP_BBR"),
         # Static Route Managers
         StaticRouteMgr(common_objs, "CONFIG_DB", "STATIC_ROUTE"),
-        StaticRouteMgr(common_objs, "APPL_DB", "STATIC_ROUTE"),
+        StaticRouteMgr(common_objs, "APPL_DB", "STATIC_ROUTE", st_rt_timer.index),
         # Route Advertisement Managers
         AdvertiseRouteMgr(common_objs, "STATE_DB", swsscommon.STATE_ADVERTISE_NETWORK_TABLE_NAME),
         RouteMapMgr(common_objs, "APPL_DB", swsscommon.APP_BGP_PROFILE_TABLE_NAME),
         # Device Global Manager
         DeviceGlobalCfgMgr(common_objs, "CONFIG_DB", swsscommon.CFG_BGP_DEVICE_GLOBAL_TABLE_NAME),
     ]
-    runner = Runner(common_objs['cfg_mgr'])
+    coalescing = common_objs['constants'].get('bgp', {}).get('coalescing', {})
+    runner = Runner(common_objs['cfg_mgr'],
+                    coalescing.get('window_ms', Runner.COALESCE_WINDOW_MS),
+                    coalescing.get('max_keys', Runner.COALESCE_MAX_KEYS))
     for mgr in managers:
         runner.add_manager(mgr)
     runner.run()
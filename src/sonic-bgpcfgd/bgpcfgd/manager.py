@@ -53,7 +53,7 @@ class Manager(object):
 
     def on_deps_change(self):
         """ This method is being executed on every dependency change """
-        if not self.directory.available_deps(self.deps):
+        if not self.set_queue or not self.directory.available_deps(self.deps):
             return
         new_queue = []
         for key, data in self.set_queue:
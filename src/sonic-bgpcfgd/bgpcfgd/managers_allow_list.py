@@ -333,18 +333,17 @@ class BGPAllowListMgr(Manager):
         assert af == self.V4 or af == self.V6
         family = self.__af_to_family(af)
         match_string = '%s prefix-list %s seq ' % (family, pl_name)
-        conf = self.cfg_mgr.get_text()
-        if not any(line.strip().startswith(match_string) for line in conf):
+        conf = self.cfg_mgr.get_prefix_list(family, pl_name)
+        if not conf:
             return False, False  # if the prefix list is not exists, it is not correct
         expect_set = set(self.__normalize_ipnetwork(af, constant_list))
         expect_set.update(set(self.__normalize_ipnetwork(af, allow_list)))
 
         config_list = []
         for line in conf:
-            if line.startswith(match_string):
-                found = line[len(match_string):].strip().split(' ')
-                rule = " ".join(found[1:])
-                config_list.append(rule)
+            found = line[len(match_string):].strip().split(' ')
+            rule = " ".join(found[1:])
+            config_list.append(rule)
 
         # Return double Ture, when running configuraiton is identical with config db + constants.
         return True, expect_set == set(self.__normalize_ipnetwork(af, config_list))
@@ -399,8 +398,8 @@ class BGPAllowListMgr(Manager):
         """
         log_debug("BGPAllowListMgr::__is_community_presented. community='%s'" % community_name)
         match_string = 'bgp community-list standard %s permit ' % community_name
-        conf = self.cfg_mgr.get_text()
-        found = [line.strip() for line in conf if line.strip().startswith(match_string)]
+        conf = self.cfg_mgr.get_community_list(community_name)
+        found = [line for line in conf if line.startswith(match_string)]
         if not found:
             return False, None
         community_value = found[0].replace(match_string, '')
@@ -462,21 +461,14 @@ class BGPAllowListMgr(Manager):
         log_debug("BGPAllowListMgr::__parse_default_action_route_map_entries. rm='%s'" % route_map_name)
         match_string = 'route-map %s permit 65535' % route_map_name
         match_community = re.compile(r'^set community (\S+) additive$')
-        inside_route_map = False
         community_value = ""
-        conf = self.cfg_mgr.get_text()
-        for line in conf + [""]:
-            s_line = line.strip()
-            if inside_route_map:
-                matched = match_community.match(s_line)
-                if matched:
-                    community_value = matched.group(1)
-                    break
-                else:
-                    log_err("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=65535" % route_map_name)
-                inside_route_map = False
-            elif s_line == match_string:
-                inside_route_map = True
+        entries = self.cfg_mgr.get_route_map(route_map_name)
+        if match_string in entries:
+            matched = match_community.match(entries[match_string][0]) if entries[match_string] else None
+            if matched:
+                community_value = matched.group(1)
+            else:
+                log_err("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=65535" % route_map_name)
         if community_value == "":
             log_err("BGPAllowListMgr::Default action community value is not found. route-map '%s' entry. seq_no=65535" % route_map_name)
         return community_value
@@ -537,33 +529,28 @@ class BGPAllowListMgr(Manager):
         else:  # self.V6
             match_pl_allow_list = 'match ipv6 address prefix-list '
         match_community = 'match community '
-        conf = self.cfg_mgr.get_text()
-        for line in conf + [""]:
-            if inside_route_map:
-                if line.strip().startswith(match_pl_allow_list):
-                    pl_allow_list_name = line.strip()[len(match_pl_allow_list):]
-                    continue
-                elif line.strip().startswith(match_community):
-                    community_name = line.strip()[len(match_community):]
-                    continue
+        for entry, commands in self.cfg_mgr.get_route_map(route_map_name).items():
+            if not entry.startswith(match_string):
+                continue
+            found = entry[len(match_string):]
+            assert found.isdigit()
+            route_map_seq_number = int(found)
+            pl_allow_list_name = None
+            community_name = self.EMPTY_COMMUNITY
+            for command in commands:
+                if command.startswith(match_pl_allow_list):
+                    pl_allow_list_name = command[len(match_pl_allow_list):]
+                elif command.startswith(match_community):
+                    community_name = command[len(match_community):]
                 else:
-                    if pl_allow_list_name is not None:
-                        entries[route_map_seq_number] = {
-                            'pl_allow_list': pl_allow_list_name,
-                            'community': community_name,
-                        }
-                    else:
-                        if route_map_seq_number != 65535:
-                            log_warn("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=%d" % (route_map_name, route_map_seq_number))
-                    inside_route_map = False
-                    pl_allow_list_name = None
-                    community_name = self.EMPTY_COMMUNITY
-                    route_map_seq_number = None
-            if line.startswith(match_string):
-                found = line[len(match_string):]
-                assert found.isdigit()
-                route_map_seq_number = int(found)
-                inside_route_map = True
+                    break
+            if pl_allow_list_name is not None:
+                entries[route_map_seq_number] = {
+                    'pl_allow_list': pl_allow_list_name,
+                    'community': community_name,
+                }
+            elif route_map_seq_number != 65535:
+                log_warn("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=%d" % (route_map_name, route_map_seq_number))
         return entries
 
     @staticmethod
@@ -597,14 +584,7 @@ class BGPAllowListMgr(Manager):
         Extract names of all peer-groups defined in the config
         :return: list of peer-group names
         """
-        # Find all peer-groups entries
-        re_peer_group = re.compile(r'^\s*neighbor (\S+) peer-group$')
-        peer_groups = []
-        for line in self.cfg_mgr.get_text():
-            result = re_peer_group.match(line)
-            if result:
-                peer_groups.append(result.group(1))
-        return peer_groups
+        return sorted(self.cfg_mgr.get_peer_groups())
 
     def __get_peer_group_to_route_map(self, peer_groups):
         """
@@ -614,13 +594,10 @@ class BGPAllowListMgr(Manager):
                  for the peer_group.
         """
         pg_2_rm = {}
-        for pg in peer_groups:
-            re_peer_group_rm = re.compile(r'^\s*neighbor %s route-map (\S+) in$' % pg)
-            for line in self.cfg_mgr.get_text():
-                result = re_peer_group_rm.match(line)
-                if result:
-                    pg_2_rm[pg] = result.group(1)
-                    break
+        peer_groups = set(peer_groups)
+        for neighbor, route_map in self.cfg_mgr.get_neighbor_route_maps('in'):
+            if neighbor in peer_groups:
+                pg_2_rm.setdefault(neighbor, route_map)
         return pg_2_rm
 
     def __get_route_map_calls(self, rms):
@@ -631,22 +608,16 @@ class BGPAllowListMgr(Manager):
         """
         rm_2_call = {}
         re_rm = re.compile(r'^route-map (\S+) permit \d+$')
-        re_call = re.compile(r'^\s*call (\S+)$')
-        inside_name = None
-        for line in self.cfg_mgr.get_text():
-            if inside_name:
-                inside_result = re_call.match(line)
-                if inside_result:
-                    rm_2_call[inside_name] = inside_result.group(1)
-                    inside_name = None
+        re_call = re.compile(r'^call (\S+)$')
+        for rm in sorted(rms):
+            for entry, commands in self.cfg_mgr.get_route_map(rm).items():
+                if not re_rm.match(entry):
                     continue
-            result = re_rm.match(line)
-            if not result:
-                continue
-            inside_name = None
-            if result.group(1) not in rms:
-                continue
-            inside_name = result.group(1)
+                for command in commands:
+                    result = re_call.match(command)
+                    if result:
+                        rm_2_call[rm] = result.group(1)
+                        break
         return rm_2_call
 
     def __get_routemap_tag(self):
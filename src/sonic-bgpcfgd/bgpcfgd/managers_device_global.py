@@ -70,10 +70,12 @@ class DeviceGlobalCfgMgr(Manager):
         cmd = "\n"
         if tsa_status == "true":
             log_notice("DeviceGlobalCfgMgr:: Device isolated. Executing TSA")
-            cmd += self.get_ts_routemaps(self.cfg_mgr.get_text(), self.tsa_template)
+            template = self.tsa_template
         else:
             log_notice("DeviceGlobalCfgMgr:: Device un-isolated. Executing TSB")
-            cmd += self.get_ts_routemaps(self.cfg_mgr.get_text(), self.tsb_template)
+            template = self.tsb_template
+        route_map_names = set(route_map for _, route_map in self.cfg_mgr.get_neighbor_route_maps('out'))
+        cmd += self.__generate_routemaps_from_template(route_map_names, template)
 
         self.cfg_mgr.push(cmd)
         log_debug("DeviceGlobalCfgMgr::Done")
@@ -8,12 +8,13 @@ from ipaddress import ip_network, IPv4Network
 
 class StaticRouteMgr(Manager):
     """ This class updates static routes when STATIC_ROUTE table is updated """
-    def __init__(self, common_objs, db, table):
+    def __init__(self, common_objs, db, table, expiry_index=None):
         """
         Initialize the object
         :param common_objs: common object dictionary
         :param db: name of the db
         :param table: name of the table in the db
+        :param expiry_index: StaticRouteExpiryIndex to keep updated with the APPL_DB routes, or None
         """
         super(StaticRouteMgr, self).__init__(
             common_objs,
@@ -26,6 +27,7 @@ class StaticRouteMgr(Manager):
         self.static_routes = {}
         self.vrf_pending_redistribution = set()
         self.config_db = None
+        self.expiry_index = expiry_index
 
     OP_DELETE = 'DELETE'
     OP_ADD = 'ADD'
@@ -33,6 +35,8 @@ class StaticRouteMgr(Manager):
     ROUTE_ADVERTISE_DISABLE_TAG = '2'
 
     def set_handler(self, key, data):
+        if self.expiry_index is not None:
+            self.expiry_index.on_set(key, data)
         vrf, ip_prefix = self.split_key(key)
         is_ipv6 = TemplateFabric.is_ipv6(ip_prefix)
 
@@ -128,6 +132,8 @@ class StaticRouteMgr(Manager):
         return False
 
     def del_handler(self, key):
+        if self.expiry_index is not None:
+            self.expiry_index.on_del(key)
         vrf, ip_prefix = self.split_key(key)
         is_ipv6 = TemplateFabric.is_ipv6(ip_prefix)
 
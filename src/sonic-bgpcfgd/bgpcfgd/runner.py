@@ -1,7 +1,9 @@
-from collections import defaultdict
+import time
+
+from collections import defaultdict, OrderedDict
 from swsscommon import swsscommon
 
-from .log import log_debug, log_crit
+from .log import log_debug, log_crit, log_err
 
 
 g_run = True
@@ -19,14 +21,35 @@ class Runner(object):
         when corresponding db/table is updated
     """
     SELECT_TIMEOUT = 1000
+    COALESCE_WINDOW_MS = 50
+    COALESCE_MAX_KEYS = 1000
+    STATS_TABLE = "BGPCFGD_STATS"
+    STATS_KEY = "runner"
+    STATS_INTERVAL = 1.0  # seconds
 
-    def __init__(self, cfg_manager):
-        """ Constructor """
+    def __init__(self, cfg_manager, coalesce_window_ms=COALESCE_WINDOW_MS, coalesce_max_keys=COALESCE_MAX_KEYS):
+        """
+        Constructor
+        :param cfg_manager: ConfigMgr object, which is committed once per batch of events
+        :param coalesce_window_ms: time to collect events into one batch after the first event was received
+        :param coalesce_max_keys: maximum number of events in one batch
+        """
         self.cfg_manager = cfg_manager
+        self.coalesce_window = coalesce_window_ms / 1000.0
+        self.coalesce_max_keys = coalesce_max_keys
         self.db_connectors = {}
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
         self.subscribers = set()
+        self.stats = OrderedDict([
+            ("events_received", 0),
+            ("events_coalesced", 0),
+            ("commits", 0),
+            ("commit_failures", 0),
+        ])
+        self.stats_table = None
+        self.stats_time = 0.0
+        self.stats_pending = False  # the counters were changed after the last export
 
     def add_manager(self, manager):
         """
@@ -53,18 +76,88 @@ class Runner(object):
         while g_run:
             state, _ = self.selector.select(Runner.SELECT_TIMEOUT)
             if state == self.selector.TIMEOUT:
+                if self.stats_pending:
+                    self.export_stats(force=True)
                 continue
             elif state == self.selector.ERROR:
                 raise Exception("Received error from select")
 
-            for subscriber in self.subscribers:
-                while True:
-                    key, op, fvs = subscriber.pop()
-                    if not key:
-                        break
-                    log_debug("Received message : '%s'" % str((key, op, fvs)))
-                    for callback in self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]:
-                        callback(key, op, dict(fvs))
-            rc = self.cfg_manager.commit()
-            if not rc:
-                log_crit("Runner::commit was unsuccessful")
+            events = []
+            self.collect_events(events)
+            deadline = time.time() + self.coalesce_window
+            while len(events) < self.coalesce_max_keys:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                state, _ = self.selector.select(max(int(remaining * 1000), 1))
+                if state == self.selector.TIMEOUT:
+                    break
+                elif state == self.selector.ERROR:
+                    raise Exception("Received error from select")
+                self.collect_events(events)
+            self.process_events(events)
+
+    def collect_events(self, events):
+        """
+        Read all available events from the subscribers into events, in the order of arrival.
+        Only consecutive events of the same key are merged, so the handlers see the events of
+        different keys in the order they were received. Consecutive 'SET' events of a key are
+        replaced by the last one, as they carry the whole entry. A 'DEL' event replaces the
+        'SET' events of the key right before it
+        :param events: list of (db, table, key, op, data)
+        """
+        for subscriber in self.subscribers:
+            db = subscriber.getDbConnector().getDbId()
+            table_name = subscriber.getTableName()
+            while True:
+                key, op, fvs = subscriber.pop()
+                if not key:
+                    break
+                log_debug("Received message : '%s'" % str((key, op, fvs)))
+                self.stats["events_received"] += 1
+                if op == swsscommon.DEL_COMMAND:
+                    while events and events[-1][:4] == (db, table_name, key, swsscommon.SET_COMMAND):
+                        events.pop()
+                        self.stats["events_coalesced"] += 1
+                elif events and events[-1][:4] == (db, table_name, key, op):
+                    events.pop()
+                    self.stats["events_coalesced"] += 1
+                if events and events[-1][:4] == (db, table_name, key, op):  # repeated 'DEL'
+                    self.stats["events_coalesced"] += 1
+                    continue
+                events.append((db, table_name, key, op, dict(fvs)))
+
+    def process_events(self, events):
+        """
+        Run handlers for a batch of events and commit resulting changes with one commit
+        :param events: list of (db, table, key, op, data)
+        """
+        for db, table_name, key, op, data in events:
+            for callback in self.callbacks[db][table_name]:
+                callback(key, op, data)
+        self.stats["commits"] += 1
+        rc = self.cfg_manager.commit()
+        if not rc:
+            self.stats["commit_failures"] += 1
+            log_crit("Runner::commit was unsuccessful")
+        self.export_stats()
+
+    def export_stats(self, force=False):
+        """
+        Write the counters into STATE_DB, at most once per STATS_INTERVAL.
+        The counters which weren't written are flushed by run() when no events arrive
+        :param force: write the counters regardless of STATS_INTERVAL
+        """
+        now = time.time()
+        if not force and now - self.stats_time < self.STATS_INTERVAL:
+            self.stats_pending = True
+            return
+        self.stats_time = now
+        self.stats_pending = False
+        try:
+            if self.stats_table is None:
+                self.stats_table = swsscommon.Table(swsscommon.DBConnector("STATE_DB", 0), self.STATS_TABLE)
+            fvs = swsscommon.FieldValuePairs([(name, str(value)) for name, value in self.stats.items()])
+            self.stats_table.set(self.STATS_KEY, fvs)
+        except Exception as e:
+            log_err("Runner::can't export counters to STATE_DB: %s" % str(e))
@@ -0,0 +1,227 @@
+import re
+
+
+class ConfigNode(object):
+    """ A command of FRR configuration with the commands of its node """
+    def __init__(self, line):
+        self.line = line
+        self.children = {}  # python dicts keep insertion order, which is the order of the config
+
+    def get_lines(self, depth=0):
+        lines = []
+        for child in self.children.values():
+            lines.append(" " * depth + child.line)
+            lines.extend(child.get_lines(depth + 1))
+        return lines
+
+    def get_paths(self, prefix=()):
+        paths = []
+        for child in self.children.values():
+            path = prefix + (child.line,)
+            paths.append(list(path))
+            paths.extend(child.get_paths(path))
+        return paths
+
+
+class RunningConfig(object):
+    """
+    Structured model of FRR running configuration.
+    The model is built from 'show running-config' output and updated with the commands
+    committed by bgpcfgd afterwards. Route-maps, prefix-lists, community-lists and
+    peer-groups are indexed by name, and the route-maps of neighbors by direction.
+    When a committed command can't be applied to the model with certainty the model
+    is marked as stale, and it must be rebuilt from FRR
+    """
+    CLOSING_COMMANDS = ('exit', 'end', 'exit-address-family', 'exit-vrf', 'exit-vni')
+    RE_PREFIX_LIST = re.compile(r'^(ip|ipv6) prefix-list (\S+) seq (\d+) ')
+    RE_COMMUNITY_LIST = re.compile(r'^bgp community-list (?:standard|expanded) (\S+) ')
+    RE_ROUTE_MAP = re.compile(r'^route-map (\S+) (?:permit|deny) (\d+)$')
+    RE_PEER_GROUP = re.compile(r'^neighbor\s+(\S+)\s+peer-group\s*$')
+    RE_NEIGHBOR_ROUTE_MAP = re.compile(r'^neighbor (\S+) route-map (\S+) (in|out)$')
+    # top level commands applied to the model as they are, see apply()
+    RE_ADDABLE = re.compile(r'^((ip|ipv6) prefix-list \S+ seq \d+ |bgp community-list (standard|expanded) \S+ |'
+                            r'route-map \S+ (permit|deny) \d+$|router bgp \d+( vrf \S+)?$)')
+    RE_REMOVABLE = re.compile(r'^((ip|ipv6) prefix-list|bgp community-list (standard|expanded)|route-map) \S+')
+
+    def __init__(self, text=""):
+        self.root = ConfigNode(None)
+        self.stale = False
+        self.prefix_lists = {}     # (family, name) -> { top level command -> command }
+        self.community_lists = {}  # name -> { top level command -> command }
+        self.route_maps = {}       # name -> { top level command -> ConfigNode }
+        self.peer_groups = {}      # top level command -> set of peer-group names
+        self.neighbor_route_maps = {}  # top level command -> list of (neighbor, route-map, direction)
+        self.lines = None
+        self.paths = None
+        self.__parse(text)
+
+    def __parse(self, text):
+        stack = [(-1, self.root)]
+        for line in text.split('\n'):
+            s_line = line.strip()
+            if s_line == '' or s_line.startswith('!') or s_line in self.CLOSING_COMMANDS:
+                continue
+            n_spaces = len(line) - len(line.lstrip())
+            while stack[-1][0] >= n_spaces:
+                stack.pop()
+            parent = stack[-1][1]
+            node = parent.children.setdefault(s_line, ConfigNode(s_line))
+            stack.append((n_spaces, node))
+        for node in self.root.children.values():
+            self.__index(node)
+
+    def apply(self, commands):
+        """
+        Apply commands committed to FRR to the model.
+        FRR normalizes the commands it stores and a command may replace a value configured before,
+        so only the commands with a known effect are applied: entries of prefix-lists (with sequence
+        number) and community-lists, new route-map entries and bgp instances with their commands, and
+        removal of prefix-lists, community-lists and route-maps. Any other command makes the model stale
+        :param commands: configuration text in FRR format
+        :return: True if the model is up to date, False if it became stale
+        """
+        if self.stale:
+            return False
+        stack = [(-1, self.root, False)]    # indent, node, node existed before the commands
+        touched = set()
+        removed = None  # indent of a removed node, its nested commands are unexpected
+        for line in commands.split('\n'):
+            s_line = line.strip()
+            if s_line == '' or s_line.startswith('!') or s_line in self.CLOSING_COMMANDS:
+                continue
+            n_spaces = len(line) - len(line.lstrip())
+            if removed is not None and n_spaces > removed:
+                self.stale = True
+                return False
+            removed = None
+            while stack[-1][0] >= n_spaces:
+                stack.pop()
+            _, parent, parent_existed = stack[-1]
+            top_level = parent is self.root
+            if s_line.startswith('no '):
+                if not top_level or not self.RE_REMOVABLE.match(s_line[3:]):
+                    # e.g. 'no neighbor X' leaves the neighbor's address-family commands in FRR
+                    self.stale = True
+                    return False
+                touched.add(s_line[3:])
+                self.__remove(parent, s_line[3:], touched)
+                removed = n_spaces
+                continue
+            touched.add(s_line if top_level else stack[1][1].line)
+            if s_line not in parent.children:
+                if parent_existed or (top_level and not self.RE_ADDABLE.match(s_line)):
+                    # e.g. 'neighbor X remote-as Y' replaces the previous remote-as of the neighbor
+                    self.stale = True
+                    return False
+                if top_level:
+                    self.__remove_prefix_list_entry(s_line, touched)
+                parent.children[s_line] = ConfigNode(s_line)
+                stack.append((n_spaces, parent.children[s_line], False))
+            else:
+                stack.append((n_spaces, parent.children[s_line], True))
+        for line in touched:
+            self.__unindex(line)
+            if line in self.root.children:
+                self.__index(self.root.children[line])
+        self.lines = None
+        self.paths = None
+        return True
+
+    def __remove(self, parent, command, touched):
+        for line in list(parent.children):
+            if line == command or line.startswith(command + ' '):
+                del parent.children[line]
+                if touched is not None:
+                    touched.add(line)
+
+    def __remove_prefix_list_entry(self, line, touched):
+        """ A prefix-list entry replaces the entry with the same sequence number """
+        m = self.RE_PREFIX_LIST.match(line)
+        if m:
+            self.__remove(self.root, m.group(0).strip(), touched)
+
+    def __index(self, node):
+        line = node.line
+        m = self.RE_PREFIX_LIST.match(line)
+        if m:
+            self.prefix_lists.setdefault((m.group(1), m.group(2)), {})[line] = line
+            return
+        m = self.RE_COMMUNITY_LIST.match(line)
+        if m:
+            self.community_lists.setdefault(m.group(1), {})[line] = line
+            return
+        m = self.RE_ROUTE_MAP.match(line)
+        if m:
+            self.route_maps.setdefault(m.group(1), {})[line] = node
+            return
+        # Peer-groups and route-maps of neighbors are found in 'router bgp' and in its address-families
+        peer_groups = set()
+        route_maps = []
+        nodes = [node]
+        while nodes:
+            node = nodes.pop()
+            m = self.RE_PEER_GROUP.match(node.line)
+            if m:
+                peer_groups.add(m.group(1))
+            m = self.RE_NEIGHBOR_ROUTE_MAP.match(node.line)
+            if m:
+                route_maps.append(m.groups())
+            nodes.extend(reversed(node.children.values()))
+        if peer_groups:
+            self.peer_groups[line] = peer_groups
+        if route_maps:
+            self.neighbor_route_maps[line] = route_maps
+
+    def __unindex(self, line):
+        for index, m in [(self.prefix_lists, self.RE_PREFIX_LIST.match(line)),
+                         (self.community_lists, self.RE_COMMUNITY_LIST.match(line)),
+                         (self.route_maps, self.RE_ROUTE_MAP.match(line))]:
+            if m:
+                key = m.groups()[:2] if index is self.prefix_lists else m.group(1)
+                entries = index.get(key, {})
+                entries.pop(line, None)
+                if not entries:
+                    index.pop(key, None)
+                return
+        self.peer_groups.pop(line, None)
+        self.neighbor_route_maps.pop(line, None)
+
+    def get_lines(self):
+        """ Return configuration as a list of lines, indented by one space per node level """
+        if self.lines is None:
+            self.lines = self.root.get_lines()
+        return self.lines
+
+    def get_paths(self):
+        """ Return configuration in the canonical format of ConfigMgr """
+        if self.paths is None:
+            self.paths = self.root.get_paths()
+        return self.paths
+
+    def get_prefix_list(self, family, name):
+        """
+        :param family: 'ip' or 'ipv6'
+        :param name: name of the prefix-list
+        :return: list of the prefix-list entries commands
+        """
+        return list(self.prefix_lists.get((family, name), {}))
+
+    def get_community_list(self, name):
+        """ Return list of the community-list entries commands """
+        return list(self.community_lists.get(name, {}))
+
+    def get_route_map(self, name):
+        """ Return dictionary: route-map entry command -> list of commands of the entry """
+        return {line: list(node.children) for line, node in self.route_maps.get(name, {}).items()}
+
+    def get_peer_groups(self):
+        """ Return set of names of peer-groups of all bgp instances """
+        return set().union(*self.peer_groups.values())
+
+    def get_neighbor_route_maps(self, direction):
+        """
+        :param direction: 'in' or 'out'
+        :return: list of (neighbor, route-map name) of all bgp instances, in the order of the config
+        """
+        return [(neighbor, route_map) for route_maps in self.neighbor_route_maps.values()
+                for neighbor, route_map, route_map_direction in route_maps if route_map_direction == direction]
@@ -1,19 +1,118 @@
 from .log import log_err, log_info, log_debug
 from swsscommon import swsscommon
+from collections import defaultdict
+import heapq
+import threading
 import time
 
+class StaticRouteExpiryIndex(object):
+    """
+    Time bucketed index of the expiring static routes in APPL_DB.
+    Routes are kept in buckets by the time they were last refreshed, so the timer
+    only examines the routes which were not refreshed during the last timer period.
+    The index is updated from the APPL_DB StaticRouteMgr and read from the timer thread.
+    """
+    KEY_PREFIX = "STATIC_ROUTE:"
+
+    def __init__(self, granularity):
+        """
+        Initialize the object
+        :param granularity: width of one bucket in seconds
+        """
+        self.granularity = granularity
+        self.lock = threading.Lock()
+        self.buckets = defaultdict(set)  # bucket -> set of APPL_DB keys
+        self.bucket_heap = []            # bucket numbers, the oldest one first
+        self.key_bucket = {}             # APPL_DB key -> bucket
+
+    def __len__(self):
+        return len(self.key_bucket)
+
+    def schedule(self, key, refreshed):
+        """
+        Put APPL_DB key into the bucket of its refresh time
+        :param key: APPL_DB key of the static route
+        :param refreshed: time when the route was refreshed
+        """
+        bucket = int(refreshed // self.granularity)
+        with self.lock:
+            old_bucket = self.key_bucket.get(key)
+            if old_bucket == bucket:
+                return
+            if old_bucket is not None:
+                self.buckets[old_bucket].discard(key)
+            if bucket not in self.buckets:
+                heapq.heappush(self.bucket_heap, bucket)
+            self.buckets[bucket].add(key)
+            self.key_bucket[key] = bucket
+
+    def remove(self, key):
+        """
+        Remove APPL_DB key from the index
+        :param key: APPL_DB key of the static route
+        """
+        with self.lock:
+            bucket = self.key_bucket.pop(key, None)
+            if bucket is not None:
+                self.buckets[bucket].discard(key)
+
+    def pop_due(self, refreshed_before):
+        """
+        Remove and return all the keys which were last refreshed before the given time
+        :param refreshed_before: routes refreshed before this time are due
+        :return: list of APPL_DB keys
+        """
+        due = []
+        last_bucket = int(refreshed_before // self.granularity)
+        with self.lock:
+            while self.bucket_heap and self.bucket_heap[0] < last_bucket:
+                bucket = heapq.heappop(self.bucket_heap)
+                for key in self.buckets.pop(bucket, ()):
+                    del self.key_bucket[key]
+                    due.append(key)
+        return due
+
+    def on_set(self, key, data):
+        """
+        Track a static route which was set in APPL_DB
+        :param key: key of the route in APPL_DB STATIC_ROUTE table
+        :param data: route entry
+        """
+        key = self.KEY_PREFIX + key
+        if data.get("expiry") == "false":
+            self.remove(key)
+        elif data.get("refresh") == "true" or key not in self.key_bucket:
+            self.schedule(key, time.time())
+
+    def on_del(self, key):
+        """
+        Stop tracking a static route which was removed from APPL_DB
+        :param key: key of the route in APPL_DB STATIC_ROUTE table
+        """
+        self.remove(self.KEY_PREFIX + key)
+
+
 class StaticRouteTimer(object):
     """ This class checks the static routes and deletes those entries that have not been refreshed """
-    def __init__(self):
+    def __init__(self, use_index=False):
+        """
+        Initialize the object
+        :param use_index: examine only the routes from the expiry index which are due, after the first full sweep
+        """
         self.db = swsscommon.SonicV2Connector()
         self.db.connect(self.db.APPL_DB)
+        self.pipe = swsscommon.RedisPipeline(self.db.get_redis_client(self.db.APPL_DB))
         self.timer = None
         self.start = None
+        self.index = StaticRouteExpiryIndex(self.INDEX_GRANULARITY) if use_index else None
+        self.index_ready = False
 
     DEFAULT_TIMER = 180
     DEFAULT_SLEEP = 60
     # keep same range as value defined in sonic-restapi/sonic_api.yaml
     MAX_TIMER     = 172800
+    SCAN_COUNT    = 1000
+    INDEX_GRANULARITY = 5
 
     def set_timer(self):
         """ Check for custom route expiry time in STATIC_ROUTE_EXPIRY_TIME """
@@ -27,21 +126,54 @@ class StaticRouteTimer(object):
                 log_err("Custom static route expiry time of {}s is invalid!".format(timer))
         return
 
+    def scan_static_routes(self):
+        """ Iterate over the static routes in APPL_DB with SCAN, one batch of keys at a time """
+        cursor = 0
+        while True:
+            cursor, keys = self.db.scan(self.db.APPL_DB, cursor, "STATIC_ROUTE:*", self.SCAN_COUNT)
+            if keys:
+                yield keys
+            if cursor == 0:
+                break
+
+    def sweep(self, static_routes, now):
+        """
+        Reset refresh flag of the refreshed static routes and delete the others.
+        All the updates of the batch are sent with one flush of the redis pipeline
+        :param static_routes: list of APPL_DB keys of the static routes
+        :param now: time of the sweep
+        """
+        for sr in static_routes:
+            route = self.db.get_all(self.db.APPL_DB, sr)
+            if not route or route.get("expiry") == "false":
+                continue
+            command = swsscommon.RedisCommand()
+            if route.get("refresh") == "true":
+                command.formatHSET(sr, {"refresh": "false"})
+                log_debug("Refresh status of static route {} is set to false".format(sr))
+                if self.index is not None:
+                    self.index.schedule(sr, now)
+            else:
+                command.formatDEL(sr)
+                log_debug("Static route {} deleted".format(sr))
+                if self.index is not None:
+                    self.index.remove(sr)
+            self.pipe.push(command)
+        self.pipe.flush()
+
     def alarm(self):
         """ Clear unrefreshed static routes """
-        static_routes = self.db.keys(self.db.APPL_DB, "STATIC_ROUTE:*")
-        if static_routes is not None:
-            for sr in static_routes:
-                expiry = self.db.get(self.db.APPL_DB, sr, "expiry")
-                if expiry == "false":
-                    continue
-                refresh = self.db.get(self.db.APPL_DB, sr, "refresh")
-                if refresh == "true":
-                    self.db.set(self.db.APPL_DB, sr, "refresh", "false")
-                    log_debug("Refresh status of static route {} is set to false".format(sr))
-                else:
-                    self.db.delete(self.db.APPL_DB, sr)
-                    log_debug("Static route {} deleted".format(sr))
+        now = time.time()
+        if self.index_ready:
+            self.sweep(self.index.pop_due(now - (self.timer or self.DEFAULT_TIMER)), now)
+        else:
+            seen = set()
+            for static_routes in self.scan_static_routes():
+                # SCAN may return a key more than once
+                static_routes = [sr for sr in static_routes if sr not in seen]
+                seen.update(static_routes)
+                self.sweep(static_routes, now)
+            self.index_ready = self.index is not None
         self.start = time.time()
         return
 
@@ -49,7 +181,10 @@ class StaticRouteTimer(object):
         self.start = time.time()
         while True:
             self.set_timer()
-            if self.timer:
+            if self.index_ready:
+                time.sleep(self.INDEX_GRANULARITY)
+                self.alarm()
+            elif self.timer:
                 log_info("Static route expiry set to {}s".format(self.timer))
                 time.sleep(self.timer)
                 self.alarm()
@@ -57,4 +192,3 @@ class StaticRouteTimer(object):
                 time.sleep(self.DEFAULT_SLEEP)
                 if time.time() - self.start >= self.DEFAULT_TIMER:
                     self.alarm()
-
@@ -6,12 +6,25 @@ import netaddr
 
 from .log import log_err
 
+try:
+    from template_cache import CACHE_DIR, PREBUILT_CACHE_DIR, SonicBytecodeCache, prewarm_templates
+except ImportError:
+    SonicBytecodeCache = None
+
+
 class TemplateFabric(object):
     """ Fabric for rendering jinja2 templates """
-    def __init__(self, template_path = '/usr/share/sonic/templates'):
+    # Identifies the environment options and filter set in the bytecode cache keys.
+    # Bump it when either of them changes.
+    ENV_VERSION = 'bgpcfgd-1'
+
+    def __init__(self, template_path = '/usr/share/sonic/templates', cache_dir = None):
         j2_template_paths = [template_path]
         j2_loader = jinja2.FileSystemLoader(j2_template_paths)
-        j2_env = jinja2.Environment(loader=j2_loader, trim_blocks=False)
+        j2_bytecode_cache = None
+        if SonicBytecodeCache is not None:
+            j2_bytecode_cache = SonicBytecodeCache(self.ENV_VERSION, directory=cache_dir or CACHE_DIR)
+        j2_env = jinja2.Environment(loader=j2_loader, trim_blocks=False, bytecode_cache=j2_bytecode_cache)
         j2_env.filters['ipv4'] = self.is_ipv4
         j2_env.filters['ipv6'] = self.is_ipv6
         j2_env.filters['pfx_filter'] = self.pfx_filter
@@ -106,3 +119,15 @@ class TemplateFabric(object):
             else:
                 table[key] = val
         return table
+
+
+def prewarm(template_path = '/usr/share/sonic/templates'):
+    """
+    Compile the templates with the environment of TemplateFabric into the prebuilt bytecode cache.
+    It runs at build time of the docker image
+    :param template_path: path to the templates
+    :return: list of (template name, error string) of templates which failed to compile
+    """
+    if SonicBytecodeCache is None:
+        return []
+    return prewarm_templates(TemplateFabric(template_path, PREBUILT_CACHE_DIR).env, template_path)
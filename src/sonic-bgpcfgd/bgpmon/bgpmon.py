@@ -12,27 +12,39 @@ Description: bgpmon.py -- populating bgp related information in stateDB.
     future, then more can be added into this process.
 
     The script check if there are any bgp activities by monitoring the bgp
-    frr.log file timestamp.  If activity is detected, then it will request bgp
-    neighbor state via vtysh cli interface. This bgp activity monitoring is
-    done periodically (every 15 second). When triggered, it looks specifically
-    for the neighbor state in the json output of show ip bgp neighbors json
-    and update the state DB for each neighbor accordingly.
+    frr.log file timestamp, where bgpd logs the neighbor adjacency changes.
+    If activity is detected, then it will request bgp neighbor state over a
+    persistent connection to the bgpd vty socket (vtysh cli interface is used
+    when the socket is not available). This bgp activity monitoring is
+    done periodically (every second, every 15 seconds without the vty socket
+    or without the log file).
+    When triggered, it looks specifically for the neighbor state in the json
+    output of show bgp summary json and update the state DB for each neighbor
+    accordingly.
     In order to not disturb and hold on to the State DB access too long and
     removal of the stale neighbors (neighbors that was there previously on
     previous get request but no longer there in the current get request), a
     "previous" neighbor dictionary will be kept and used to determine if there
     is a need to perform update or the peer is stale to be removed from the
-    state DB
+    state DB. All changes of a cycle are written with one redis pipeline flush,
+    together with the statistics of the cycle in BGPMON_STATS|bgpmon. The
+    pipeline is sized to hold all the commands of a cycle
 """
 import json
 import os
 import sys
 import syslog
+from collections import OrderedDict
 from swsscommon import swsscommon
 import time
 from sonic_py_common.general import getstatusoutput_noshell
+from bgpcfgd.frr import VtyClient
 
-PIPE_BATCH_MAX_COUNT = 50
+POLL_INTERVAL = 1               # seconds, with the persistent vty connection
+POLL_INTERVAL_VTYSH = 15        # seconds, when vtysh has to be forked
+PEER_CACHE_MAX_SIZE = 65536
+PIPELINE_SIZE = 128             # initial number of commands the pipeline holds before it flushes
+STATS_KEY = "BGPMON_STATS|bgpmon"
 
 class BgpStateGet:
     def __init__(self):
@@ -40,16 +52,30 @@ class BgpStateGet:
         # dic peer_state stores the Neighbor peer state entries
         # set new_peer_l stores the new snapshot of Neighbor peer ip address
         # dic new_peer_state stores the new snapshot of Neighbor peer states
+        # dic peer_state is bounded to PEER_CACHE_MAX_SIZE entries. An evicted
+        # entry is written again to the state DB on the next get request
         self.peer_l = set()
-        self.peer_state = {}
+        self.peer_state = OrderedDict()
         self.new_peer_l = set()
         self.new_peer_state = {}
         self.cached_timestamp = 0
+        self.frr_log_missing = False
         self.db = swsscommon.SonicV2Connector()
         self.db.connect(self.db.STATE_DB, False)
-        self.pipe = swsscommon.RedisPipeline(self.db.get_redis_client(self.db.STATE_DB))
+        self.pipe_size = PIPELINE_SIZE
+        self.pipe = swsscommon.RedisPipeline(self.db.get_redis_client(self.db.STATE_DB), self.pipe_size)
         self.db.delete_all_by_pattern(self.db.STATE_DB, "NEIGH_STATE_TABLE|*" )
         self.MAX_RETRY_ATTEMPTS = 3
+        self.vty = VtyClient("bgpd")
+        self.stats = OrderedDict([
+            ("cycles", 0),
+            ("updates", 0),
+            ("deletes", 0),
+            ("peers", 0),
+            ("last_get_latency_ms", 0),
+            ("last_write_latency_ms", 0),
+            ("last_cycle_time", 0),
+        ])
 
     # A quick way to check if there are anything happening within BGP is to
     # check its log file has any activities. This is by checking its modified
@@ -59,12 +85,14 @@ class BgpStateGet:
     def bgp_activity_detected(self):
         try:
             timestamp = os.stat("/var/log/frr/frr.log").st_mtime
+            self.frr_log_missing = False
             if timestamp != self.cached_timestamp:
                 self.cached_timestamp = timestamp
                 return True
             else:
                 return False
         except (IOError, OSError):
+            self.frr_log_missing = True
             return True
 
     def update_new_peer_states(self, peer_dict):
@@ -75,14 +103,31 @@ class BgpStateGet:
                                          peer_dict["peers"][peer]["remoteAs"],
                                          peer_dict["peers"][peer]["localAs"])
 
+    def get_poll_interval(self):
+        # Without the log file every poll gets the neighbor states
+        if self.frr_log_missing:
+            return POLL_INTERVAL_VTYSH
+        return POLL_INTERVAL if self.vty.connect() else POLL_INTERVAL_VTYSH
+
+    def run_show_command(self, cmd):
+        """ Run the show command over the persistent vty connection, fall back to vtysh """
+        if self.vty.connect():
+            try:
+                rc, output = self.vty.execute(cmd[-1])
+                return rc, output
+            except (IOError, OSError):
+                pass
+        return getstatusoutput_noshell(cmd)
+
     # Get a new snapshot of BGP neighbors and store them in the "new" location
     def get_all_neigh_states(self):
         cmd = ["vtysh", "-c", 'show bgp summary json']
         retry_attempt = 0
+        start = time.time()
 
         while retry_attempt < self.MAX_RETRY_ATTEMPTS:
             try:
-                rc, output = getstatusoutput_noshell(cmd)
+                rc, output = self.run_show_command(cmd)
                 if rc:
                     syslog.syslog(syslog.LOG_ERR, "*ERROR* Failed with rc:{} when execute: {}".format(rc, cmd))
                     return
@@ -97,6 +142,7 @@ class BgpStateGet:
                 for key, value in peer_info.items():
                     if key == "ipv4Unicast" or key == "ipv6Unicast":
                         self.update_new_peer_states(value)
+                self.stats["last_get_latency_ms"] = int((time.time() - start) * 1000)
                 return
 
             except json.JSONDecodeError as decode_error:
@@ -118,7 +164,9 @@ class BgpStateGet:
 
 
     # This method will take the caller's dictionary which contains the peer state operation
-    # That need to be updated in StateDB using Redis pipeline.
+    # That need to be updated in StateDB using Redis pipeline. All the operations of
+    # a cycle and the statistics are sent with one flush of the pipeline, the pipeline
+    # is recreated with a bigger size when it can't hold all of them.
     # The data{} will be cleared at the end of this method before returning to caller.
     def flush_pipe(self, data):
         """Dump each entry in data{} into State DB via redis pipeline.
@@ -133,33 +181,53 @@ class BgpStateGet:
                 ...
             }
         """
+        start = time.time()
+        if len(data) + 1 > self.pipe_size:
+            # The pipeline flushes by itself when it is full
+            self.pipe_size = max(len(data) + 1, self.pipe_size * 2)
+            self.pipe = swsscommon.RedisPipeline(self.db.get_redis_client(self.db.STATE_DB), self.pipe_size)
         for key, value in data.items():
             if value is None:
                 # delete case
                 command = swsscommon.RedisCommand()
                 command.formatDEL(key)
                 self.pipe.push(command)
+                self.stats["deletes"] += 1
             else:
                 # Add or Modify case
                 command = swsscommon.RedisCommand()
                 command.formatHSET(key, value)
                 self.pipe.push(command)
+                self.stats["updates"] += 1
 
+        self.stats["cycles"] += 1
+        self.stats["peers"] = len(self.new_peer_l)
+        self.stats["last_cycle_time"] = int(start)
+        command = swsscommon.RedisCommand()
+        command.formatHSET(STATS_KEY, {name: str(value) for name, value in self.stats.items()})
+        self.pipe.push(command)
         self.pipe.flush()
+        self.stats["last_write_latency_ms"] = int((time.time() - start) * 1000)
         data.clear()
 
+    def set_peer_state(self, peer, state):
+        self.peer_state[peer] = state
+        self.peer_state.move_to_end(peer)
+        while len(self.peer_state) > PEER_CACHE_MAX_SIZE:
+            self.peer_state.popitem(last=False)
+
     def update_neigh_states(self):
         data = {}
         for peer in self.new_peer_l:
             key = "NEIGH_STATE_TABLE|%s" % peer
             if peer in self.peer_l:
                 # only update the entry if state changed
-                if self.peer_state[peer] != self.new_peer_state[peer][0]:
+                if self.peer_state.get(peer) != self.new_peer_state[peer][0]:
                     # state changed. Update state DB for this entry
                     state = self.new_peer_state[peer][0]
                     peerType = "i-BGP" if self.new_peer_state[peer][1] == self.new_peer_state[peer][2] else "e-BGP"
                     data[key] = {'state':state, 'peerType':peerType}
-                    self.peer_state[peer] = state
+                    self.set_peer_state(peer, state)
                 # remove this neighbor from old set since it is accounted for
                 self.peer_l.remove(peer)
             else:
@@ -167,9 +235,7 @@ class BgpStateGet:
                 state = self.new_peer_state[peer][0]
                 peerType = "i-BGP" if self.new_peer_state[peer][1] == self.new_peer_state[peer][2] else "e-BGP"
                 data[key] = {'state':state, 'peerType':peerType}
-                self.peer_state[peer] = state
-            if len(data) > PIPE_BATCH_MAX_COUNT:
-                self.flush_pipe(data)
+                self.set_peer_state(peer, state)
         # Check for stale state entries to be cleaned up
         for peer in self.peer_l:
             # remove this from the stateDB and the current neighbor state entry
@@ -177,11 +243,8 @@ class BgpStateGet:
             data[del_key] = None
             if peer in self.peer_state:
                 del self.peer_state[peer]
-            if len(data) > PIPE_BATCH_MAX_COUNT:
-                self.flush_pipe(data)
-        # If anything in the pipeline not yet flushed, flush them now
-        if len(data) > 0:
-            self.flush_pipe(data)
+        # Flush all the changes of the cycle at once, the statistics are written every cycle
+        self.flush_pipe(data)
         # Save the new set
         self.peer_l = self.new_peer_l.copy()
 
@@ -197,7 +260,7 @@ def main():
 
     # periodically obtain the new neighbor information and update if necessary
     while True:
-        time.sleep(15)
+        time.sleep(bgp_state_get.get_poll_interval())
         if bgp_state_get.bgp_activity_detected():
             bgp_state_get.get_all_neigh_states()
             bgp_state_get.update_neigh_states()
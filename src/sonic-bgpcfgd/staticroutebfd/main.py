@@ -18,6 +18,7 @@ CONFIG_DB_NAME = "CONFIG_DB"
 APPL_DB_NAME = "APPL_DB"
 STATE_DB_NAME = "STATE_DB"
 
+LOOPBACK_INTERFACE_TABLE_NAME = "LOOPBACK_INTERFACE"
 INTERFACE_TABLE_NAME = "INTERFACE"
 PORTCHANNEL_INTERFACE_TABLE_NAME = "PORTCHANNEL_INTERFACE"
 STATIC_ROUTE_TABLE_NAME = "STATIC_ROUTE"
@@ -95,6 +96,15 @@ def check_ip(ip):
             valid = False
     return valid, is_ipv4, v
 
+def join_table_keys(table, separator):
+    """
+    Convert keys of a table read by ConfigDBConnector back to strings
+    :param table: dict of key -> data, multi-part keys are tuples
+    :param separator: key separator of the db the table was read from
+    :return: dict of key string without table name -> data
+    """
+    return {separator.join(key) if isinstance(key, tuple) else key: data for key, data in table.items()}
+
 class StaticRouteBfd(object):
 
     SELECT_TIMEOUT = 1000
@@ -110,6 +120,10 @@ class StaticRouteBfd(object):
         #interface, portchannel_interface and loopback_interface share same table, assume name is unique
         #assume only one ipv4  and/or one ipv6 for each interface
         self.local_db[LOCAL_INTERFACE_TABLE] = defaultdict(dict)
+        #interface name -> keys in LOCAL_BFD_PENDING_TABLE waiting for ip of that interface
+        self.bfd_pending_intf = defaultdict(set)
+        #static route appl_db writes held back during reconciliation, key -> (deleted, data)
+        self.srt_appl_db_pending = None
 
         self.config_db  = swsscommon.DBConnector(CONFIG_DB_NAME, 0, True)
         self.appl_db = swsscommon.DBConnector(APPL_DB_NAME, 0, True)
@@ -217,9 +231,15 @@ class StaticRouteBfd(object):
 
         return False, ""
 
+    def add_bfd_pending(self, intf, nh_ip, bfd_key):
+        pending_key = intf + "_" + bfd_key
+        self.set_local_db(LOCAL_BFD_PENDING_TABLE, pending_key, [intf, nh_ip, bfd_key])
+        self.bfd_pending_intf[intf].add(pending_key)
+
     def update_bfd_pending(self, if_name):
         del_list=[]
-        for k, v in self.local_db[LOCAL_BFD_PENDING_TABLE].items():
+        for k in self.bfd_pending_intf.get(if_name, set()):
+            v = self.get_local_db(LOCAL_BFD_PENDING_TABLE, k)
             if len(v) == 3 and v[0] == if_name:
                 intf, nh_ip, bfd_key = v[0], v[1], v[2]
                 valid, local_addr = self.find_interface_ip(intf, nh_ip)
@@ -241,63 +261,67 @@ class StaticRouteBfd(object):
 
         for k in del_list:
             self.local_db[LOCAL_BFD_PENDING_TABLE].pop(k)
+            self.bfd_pending_intf[if_name].discard(k)
+        if if_name in self.bfd_pending_intf and len(self.bfd_pending_intf[if_name]) == 0:
+            del self.bfd_pending_intf[if_name]
 
-    def strip_table_name(self, key, splitter):
-        return key.split(splitter, 1)[1]
+    def load_db_snapshot(self):
+        """
+        Read all tables needed by reconciliation
+        :return: dict of (db name, table name) -> {key: data}
+        """
+        snapshot = {}
+        #one scan of CONFIG_DB, entries are read in pipeline
+        config_db = swsscommon.ConfigDBPipeConnector()
+        config_db.connect()
+        config = config_db.get_config()
+        for table in [LOOPBACK_INTERFACE_TABLE_NAME, INTERFACE_TABLE_NAME, PORTCHANNEL_INTERFACE_TABLE_NAME, STATIC_ROUTE_TABLE_NAME]:
+            snapshot[(CONFIG_DB_NAME, table)] = join_table_keys(config.get(table, {}), config_db.KEY_SEPARATOR)
+
+        #APPL_DB is too big to scan, only read bfd session table from APPL_DB and STATE_DB
+        for db_name in [APPL_DB_NAME, STATE_DB_NAME]:
+            db = swsscommon.ConfigDBConnector()
+            db.db_connect(db_name)
+            snapshot[(db_name, BFD_SESSION_TABLE_NAME)] = join_table_keys(db.get_table(BFD_SESSION_TABLE_NAME), db.KEY_SEPARATOR)
+        return snapshot
 
     def reconciliation(self):
-        #to use SonicV2Connector get_all method, DBConnector doesn't have get_all
-        db = swsscommon.SonicV2Connector()
-        db.connect(db.CONFIG_DB)
-        db.connect(db.APPL_DB)
-        db.connect(db.STATE_DB)
+        snapshot = self.load_db_snapshot()
 
         #MUST keep the restore sequene
         #restore interface(loopback/interface/portchannel_interface) tables
 
         #restore interface tables
         log_info("restore interface table -->")
-        keys = db.keys(db.CONFIG_DB, "LOOPBACK_INTERFACE|*")
-        for key in keys:
-            key_new = self.strip_table_name(key, "|")
-            self.interface_set_handler(key_new, "")
-        keys = db.keys(db.CONFIG_DB, "INTERFACE|*")
-        for key in keys:
-            key_new = self.strip_table_name(key, "|")
-            self.interface_set_handler(key_new, "")
-        keys = db.keys(db.CONFIG_DB, "PORTCHANNEL_INTERFACE|*")
-        for key in keys:
-            key_new = self.strip_table_name(key, "|")
-            self.interface_set_handler(key_new, "")
+        for table in [LOOPBACK_INTERFACE_TABLE_NAME, INTERFACE_TABLE_NAME, PORTCHANNEL_INTERFACE_TABLE_NAME]:
+            for key in snapshot[(CONFIG_DB_NAME, table)]:
+                self.interface_set_handler(key, "")
 
         #restore bfd session table, static route won't create bfd session if it is already in appl_db
         log_info("restore bfd session table -->")
-        keys = db.keys(db.APPL_DB, "BFD_SESSION_TABLE:*")
-        for key in keys:
-            data = db.get_all(db.APPL_DB, key)
-            key_new = self.strip_table_name(key, ":")
-            self.set_local_db(LOCAL_BFD_TABLE, key_new, data)
-
-        #restore static route table
-        log_info("restore static route table -->")
-        keys = db.keys(db.CONFIG_DB, "STATIC_ROUTE|*")
-        for key in keys:
-            data = db.get_all(db.CONFIG_DB, key)
-            key_new = self.strip_table_name(key, "|")
-            log_debug("SRT_BFD: restore static route from config_db, key %s, data %s"%(key, str(data)))
-            self.static_route_set_handler(key_new, data)
-
-        #clean up local bfd table, remove non static route bfd session
-        log_info("cleanup bfd session table -->")
-        self.cleanup_local_bfd_table()
-
-        #restore bfd state table
-        log_info("restore bfd state table -->")
-        keys = db.keys(db.STATE_DB, "BFD_SESSION_TABLE|*")
-        for key in keys:
-            data = db.get_all(db.STATE_DB, key)
-            key_new = self.strip_table_name(key, "|")
-            self.bfd_state_set_handler(key_new, data)
+        for key, data in snapshot[(APPL_DB_NAME, BFD_SESSION_TABLE_NAME)].items():
+            self.set_local_db(LOCAL_BFD_TABLE, key, data)
+
+        #static routes are written to appl_db once after all bfd states are restored,
+        #instead of once for each nexthop becoming UP
+        self.srt_appl_db_pending = {}
+        try:
+            #restore static route table
+            log_info("restore static route table -->")
+            for key, data in snapshot[(CONFIG_DB_NAME, STATIC_ROUTE_TABLE_NAME)].items():
+                log_debug("SRT_BFD: restore static route from config_db, key %s, data %s"%(key, str(data)))
+                self.static_route_set_handler(key, data)
+
+            #clean up local bfd table, remove non static route bfd session
+            log_info("cleanup bfd session table -->")
+            self.cleanup_local_bfd_table()
+
+            #restore bfd state table
+            log_info("restore bfd state table -->")
+            for key, data in snapshot[(STATE_DB_NAME, BFD_SESSION_TABLE_NAME)].items():
+                self.bfd_state_set_handler(key, data)
+        finally:
+            self.flush_static_route_appl_db()
 
     def cleanup_local_bfd_table(self):
         kl=[]
@@ -476,7 +500,7 @@ class StaticRouteBfd(object):
                 valid, local_addr = self.find_interface_ip(intf, nh_ip)
                 if not valid:
                     #interface IP is not available yet, put this request to cache
-                    self.set_local_db(LOCAL_BFD_PENDING_TABLE, intf+"_"+bfd_key, [intf, nh_ip, bfd_key])
+                    self.add_bfd_pending(intf, nh_ip, bfd_key)
                     self.append_to_nh_table_entry(nh_key, vrf + "|" + ip_prefix)
                     log_warn("bfd_pending: cannot find ip for interface: %s, postpone bfd session creation" %intf)
                     continue
@@ -583,13 +607,31 @@ class StaticRouteBfd(object):
                 self.remove_from_local_db(LOCAL_SRT_TABLE, srt_key)
 
     def set_static_route_into_appl_db(self, key, data):
+        if self.srt_appl_db_pending is not None:
+            deleted, _ = self.srt_appl_db_pending.get(key, (False, None))
+            self.srt_appl_db_pending[key] = (deleted, data.copy())
+            return
         fvs = swsscommon.FieldValuePairs(list(data.items()))
         self.static_route_appl_tbl.set(key, fvs)
         log_debug("SRT_BFD: set static route to appl_db, key %s, data %s"%(key, str(data)))
 
     def del_static_route_from_appl_db(self, key):
+        if self.srt_appl_db_pending is not None:
+            self.srt_appl_db_pending[key] = (True, None)
+            return
         self.static_route_appl_tbl.delete(key)
 
+    def flush_static_route_appl_db(self):
+        pending = self.srt_appl_db_pending
+        self.srt_appl_db_pending = None
+        if pending is None:
+            return
+        for key, (deleted, data) in pending.items():
+            if deleted:
+                self.del_static_route_from_appl_db(key)
+            if data is not None:
+                self.set_static_route_into_appl_db(key, data)
+
     def reconstruct_static_route_config(self, original_config, reachable_nexthops):
         arg_list    = lambda v: [x.strip() for x in v.split(',')] if len(v.strip()) != 0 else None
         bkh_list    = arg_list(original_config['blackhole']) if 'blackhole' in original_config else None
@@ -4,6 +4,7 @@ from bgpcfgd.directory import Directory
 from bgpcfgd.template import TemplateFabric
 from copy import deepcopy
 from . import swsscommon_test
+from .util import get_cfg_mgr
 
 
 with patch.dict("sys.modules", swsscommon=swsscommon_test):
@@ -364,15 +365,7 @@ def test___set_prepare_config_disabled_multiple_peers():
         {"PEER_V4", "PEER_V4_DEPLOYMENT_ID_0", "PEER_V4_DEPLOYMENT_ID_1", "PEER_V6", "PEER_V6_DEPLOYMENT_ID_0", "PEER_V6_DEPLOYMENT_ID_1"})
 
 def test__get_available_peer_groups():
-    cfg_mgr = MagicMock()
-    common_objs = {
-        'directory': Directory(),
-        'cfg_mgr': cfg_mgr,
-        'tf': TemplateFabric(),
-        'constants': global_constants,
-    }
-    m = BBRMgr(common_objs, "CONFIG_DB", "BGP_BBR")
-    m.cfg_mgr.get_text = MagicMock(return_value=[
+    cfg_mgr = get_cfg_mgr([
         '  neighbor PEER_V4 peer-group',
         '  neighbor PEER_V6 peer-group',
         '  address-family ipv4',
@@ -389,5 +382,12 @@ def test__get_available_peer_groups():
         '  exit-address-family',
         '     ',
     ])
+    common_objs = {
+        'directory': Directory(),
+        'cfg_mgr': cfg_mgr,
+        'tf': TemplateFabric(),
+        'constants': global_constants,
+    }
+    m = BBRMgr(common_objs, "CONFIG_DB", "BGP_BBR")
     res = m._BBRMgr__get_available_peer_groups()
     assert res == {"PEER_V4", "PEER_V6"}
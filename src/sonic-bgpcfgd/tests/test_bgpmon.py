@@ -0,0 +1,95 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from . import swsscommon_test
+
+sonic_py_common_mock = MagicMock()
+with patch.dict("sys.modules", swsscommon=swsscommon_test, sonic_py_common=sonic_py_common_mock,
+                **{"sonic_py_common.general": sonic_py_common_mock.general}):
+    import bgpmon.bgpmon
+
+
+def get_summary(peers):
+    return json.dumps({"ipv4Unicast": {"peers": {
+        peer: {"state": state, "remoteAs": remote_as, "localAs": 65100} for peer, (state, remote_as) in peers.items()
+    }}})
+
+def get_bgpmon(summary):
+    m = bgpmon.bgpmon.BgpStateGet()
+    m.vty = MagicMock()
+    m.vty.connect = MagicMock(return_value=True)
+    m.vty.execute = MagicMock(return_value=(0, summary))
+    m.pipe = MagicMock()
+    m.flush_pipe = MagicMock(wraps=m.flush_pipe)
+    return m
+
+def test_update_neigh_states():
+    m = get_bgpmon(get_summary({"10.0.0.1": ("Established", 65200), "10.0.0.3": ("Active", 65100)}))
+    m.get_all_neigh_states()
+    m.vty.execute.assert_called_with("show bgp summary json")
+    m.update_neigh_states()
+    m.flush_pipe.assert_called_once()
+    # All the changes and the statistics are sent with one flush
+    assert m.pipe.push.call_count == 3
+    m.pipe.flush.assert_called_once()
+    assert m.stats["updates"] == 2
+    assert dict(m.peer_state) == {"10.0.0.1": "Established", "10.0.0.3": "Active"}
+
+    # Only changes are written
+    m.vty.execute.return_value = (0, get_summary({"10.0.0.1": ("Established", 65200), "10.0.0.5": ("Idle", 65200)}))
+    m.get_all_neigh_states()
+    m.update_neigh_states()
+    assert m.stats["updates"] == 3
+    assert m.stats["deletes"] == 1
+    assert m.stats["peers"] == 2
+    assert dict(m.peer_state) == {"10.0.0.1": "Established", "10.0.0.5": "Idle"}
+
+    # Nothing changed, only the statistics are written
+    m.pipe.reset_mock()
+    m.get_all_neigh_states()
+    m.update_neigh_states()
+    assert m.flush_pipe.call_count == 3
+    assert m.pipe.push.call_count == 1
+    m.pipe.flush.assert_called_once()
+    assert m.stats["cycles"] == 3
+
+def test_vtysh_fallback():
+    m = get_bgpmon("")
+    m.vty.connect.return_value = False
+    output = (0, get_summary({"10.0.0.1": ("Established", 65200)}))
+    with patch.object(bgpmon.bgpmon, "getstatusoutput_noshell", MagicMock(return_value=output)) as mocked:
+        m.get_all_neigh_states()
+        mocked.assert_called_with(["vtysh", "-c", "show bgp summary json"])
+    assert m.new_peer_l == {"10.0.0.1"}
+    assert m.get_poll_interval() == bgpmon.bgpmon.POLL_INTERVAL_VTYSH
+
+def test_peer_cache_bounded():
+    m = get_bgpmon("")
+    with patch.object(bgpmon.bgpmon, "PEER_CACHE_MAX_SIZE", 2):
+        for peer in ["10.0.0.1", "10.0.0.2", "10.0.0.3"]:
+            m.set_peer_state(peer, "Established")
+    assert list(m.peer_state) == ["10.0.0.2", "10.0.0.3"]
+
+def test_pipeline_sized_to_batch():
+    m = get_bgpmon(get_summary({"10.0.0.1": ("Established", 65200), "10.0.0.3": ("Active", 65100),
+                                "10.0.0.5": ("Idle", 65200)}))
+    m.pipe_size = 2
+    pipe = MagicMock()
+    with patch.object(bgpmon.bgpmon.swsscommon, "RedisPipeline", MagicMock(return_value=pipe)) as mocked:
+        m.get_all_neigh_states()
+        m.update_neigh_states()
+        # 3 peers and the statistics fit in the pipeline, they are sent with one flush
+        assert mocked.call_args[0][1] == 4
+    assert m.pipe is pipe
+    assert pipe.push.call_count == 4
+    pipe.flush.assert_called_once()
+
+def test_frr_log_missing():
+    m = get_bgpmon("")
+    with patch.object(bgpmon.bgpmon.os, "stat", MagicMock(side_effect=OSError)):
+        assert m.bgp_activity_detected()
+        assert m.get_poll_interval() == bgpmon.bgpmon.POLL_INTERVAL_VTYSH
+    with patch.object(bgpmon.bgpmon.os, "stat", MagicMock(return_value=MagicMock(st_mtime=1))):
+        assert m.bgp_activity_detected()
+        assert not m.bgp_activity_detected()
+        assert m.get_poll_interval() == bgpmon.bgpmon.POLL_INTERVAL
@@ -205,3 +205,40 @@ def test_from_canonical():
     c = ConfigMgr(frr)
     raw = c.from_canonical(canonical)
     assert raw == expected
+
+def test_update_incremental():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value="ip prefix-list PL seq 10 permit 10.0.0.0/8 le 32\nroute-map RM permit 10\n set tag 1\n")
+    frr.write = MagicMock(return_value=True)
+    frr.restart_peer_groups = MagicMock(return_value=True)
+    c = ConfigMgr(frr)
+    c.update()
+    assert frr.get_config.call_count == 1
+    c.push_list(["no ip prefix-list PL", "ip prefix-list PL seq 10 permit 20.0.0.0/8 le 32"])
+    assert c.commit()
+    c.update()
+    assert frr.get_config.call_count == 1
+    assert c.get_prefix_list("ip", "PL") == ["ip prefix-list PL seq 10 permit 20.0.0.0/8 le 32"]
+    assert c.get_text() == ["route-map RM permit 10", " set tag 1", "ip prefix-list PL seq 10 permit 20.0.0.0/8 le 32", "     "]
+    # The model can't follow the change, the config is read again
+    c.push_list(["route-map RM permit 10", " set tag 2"])
+    assert c.commit()
+    c.update()
+    assert frr.get_config.call_count == 2
+    # Failed commit
+    frr.write = MagicMock(return_value=False)
+    c.push("ip prefix-list PL seq 20 permit any")
+    assert not c.commit()
+    c.update()
+    assert frr.get_config.call_count == 3
+
+def test_update_resync_interval():
+    frr = MagicMock()
+    frr.get_config = MagicMock(return_value="")
+    c = ConfigMgr(frr)
+    c.update()
+    c.update()
+    assert frr.get_config.call_count == 1
+    c.sync_time -= ConfigMgr.RESYNC_INTERVAL
+    c.update()
+    assert frr.get_config.call_count == 2
@@ -2,6 +2,7 @@ from unittest.mock import MagicMock, patch
 
 import os
 from bgpcfgd.directory import Directory
+from bgpcfgd.running_config import RunningConfig
 from bgpcfgd.template import TemplateFabric
 from . import swsscommon_test
 from .util import load_constants
@@ -38,7 +39,10 @@ def constructor(check_internal=False):
         cfg_mgr.changes += cfg + "\n"
     def get_config():
         return cfg_mgr.changes
+    def get_neighbor_route_maps(direction):
+        return RunningConfig(cfg_mgr.changes).get_neighbor_route_maps(direction)
     cfg_mgr.get_text = get_text
+    cfg_mgr.get_neighbor_route_maps = get_neighbor_route_maps
     cfg_mgr.update = update
     cfg_mgr.push = push
     cfg_mgr.get_config = get_config
@@ -58,6 +62,8 @@ def constructor(check_internal=False):
 @patch('bgpcfgd.managers_device_global.log_debug')
 def test_isolate_device(mocked_log_info):
     m = constructor()
+    # The route-maps are found in the model of the running config
+    m.cfg_mgr.get_text = MagicMock(side_effect=AssertionError("running config text must not be scanned"))
     res = m.set_handler("STATE", {"tsa_enabled": "true"})
     assert res, "Expect True return value for set_handler"
     mocked_log_info.assert_called_with("DeviceGlobalCfgMgr::Done")
@@ -55,3 +55,39 @@ def test_directory(mocked_log_err):
     # Test remove_slot() with nonexist table
     directory.remove_slot("db_name", "table_nonexist")
     mocked_log_err.assert_called_with("Directory: Can't remove slot 'db_name__table_nonexist'. The slot doesn't exist")
+
+def test_subscribe_notify():
+    directory = Directory()
+    calls = []
+    handler1 = lambda: calls.append("handler1")
+    handler2 = lambda: calls.append("handler2")
+    directory.subscribe([("db", "table1", "localhost/bgp_asn"), ("db", "table2", "")], handler1)
+    directory.subscribe([("db", "table1", "localhost/bgp_asn")], handler2)
+
+    # Dependencies of handler1 are not satisfied yet
+    directory.put("db", "table1", "localhost", {"bgp_asn": "65100"})
+    assert calls == ["handler2"]
+
+    # Dependencies of handler1 became satisfied
+    calls.clear()
+    directory.put("db", "table2", "key", {})
+    assert calls == ["handler1"]
+
+    # A key outside of the subscribed paths
+    calls.clear()
+    directory.put("db", "table1", "other", {})
+    assert calls == []
+
+    # Subscribed subtree changed, each handler is run once
+    calls.clear()
+    directory.put("db", "table1", "localhost", {"bgp_asn": "65200"})
+    assert calls == ["handler1", "handler2"]
+
+    # Removed dependency
+    calls.clear()
+    directory.remove("db", "table2", "key")
+    directory.remove_slot("db", "table2")
+    directory.put("db", "table1", "localhost", {"bgp_asn": "65300"})
+    assert calls == ["handler2"]
+    directory.put("db", "table2", "key", {})
+    assert calls == ["handler2", "handler1"]
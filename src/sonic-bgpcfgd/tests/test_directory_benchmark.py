@@ -0,0 +1,45 @@
+import time
+
+from bgpcfgd.directory import Directory
+
+
+def run_benchmark(n_puts=10000, n_subscribers=50):
+    """
+    Put n_puts keys into a Directory with n_subscribers subscribed managers.
+    :return: a tuple: number of handler calls, time spent in seconds
+    """
+    directory = Directory()
+    deps = [
+        ("CONFIG_DB", "DEVICE_METADATA", "localhost/bgp_asn"),
+        ("CONFIG_DB", "LOOPBACK_INTERFACE", "Loopback0"),
+        ("LOCAL", "local_addresses", ""),
+        ("LOCAL", "interfaces", ""),
+    ]
+    calls = [0]
+    def get_handler():
+        # The same work as Manager.on_deps_change() does with an empty set_queue
+        def handler():
+            calls[0] += 1
+            directory.available_deps(deps)
+        return handler
+    for i in range(n_subscribers):
+        directory.subscribe(deps, get_handler())
+    directory.put("CONFIG_DB", "DEVICE_METADATA", "localhost", {"bgp_asn": "65100"})
+    directory.put("CONFIG_DB", "LOOPBACK_INTERFACE", "Loopback0", {})
+    directory.put("LOCAL", "local_addresses", "10.1.0.32", {})
+    start = time.time()
+    for i in range(n_puts):
+        directory.put("CONFIG_DB", "LOOPBACK_INTERFACE", "Loopback%d|10.1.%d.%d/32" % (i + 1, i // 256, i % 256), {})
+        directory.put("LOCAL", "interfaces", "Ethernet%d" % i, {})
+    return calls[0], time.time() - start
+
+def test_directory_benchmark():
+    calls, _ = run_benchmark()
+    # Once the dependencies are satisfied only the puts into a watched slot
+    # run the handlers, and each handler only once per put
+    assert calls == 50 * 10000
+
+if __name__ == "__main__":
+    for n_subscribers in [1, 10, 50, 100]:
+        calls, duration = run_benchmark(n_subscribers=n_subscribers)
+        print("subscribers=%d puts=%d handler_calls=%d time=%.3fs" % (n_subscribers, 2 * 10000, calls, duration))
@@ -1,4 +1,6 @@
 from unittest.mock import patch
+import socket
+import threading
 import bgpcfgd.frr
 import pytest
 
@@ -66,3 +68,112 @@ def test_restart_peer_groups_fail(mocked_log_crit):
     res = f.restart_peer_groups(["pg_1", "pg_2"])
     assert not res, "Expect False return value"
     mocked_log_crit.assert_called_with("Can't restart bgp peer-group 'pg_2'. rc='1', out='some output', err='some error'")
+
+class FakeVtyDaemon(object):
+    """ vty socket server, accepting the commands which start with one of the prefixes """
+    def __init__(self, path, prefixes, failed=(), running_config=None):
+        self.prefixes = prefixes
+        self.running_config = running_config
+        self.failed = failed
+        self.commands = []
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen(1)
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def serve(self):
+        conn, _ = self.server.accept()
+        buffer = b''
+        while True:
+            data = conn.recv(4096)
+            if not data:
+                break
+            buffer += data
+            while b'\0' in buffer:
+                command, buffer = buffer.split(b'\0', 1)
+                command = command.decode().strip()
+                self.commands.append(command)
+                if command in self.failed:
+                    rc = 13
+                elif command in ("enable", "configure terminal", "end", "exit", "show running-config") or command.startswith(self.prefixes):
+                    rc = 0
+                else:
+                    rc = 2
+                reply = ""
+                if command == "show running-config":
+                    reply = self.running_config or "running config of %s\n" % self.prefixes[0]
+                conn.sendall(reply.encode() + b'\0\0\0' + bytes([rc]))
+        conn.close()
+
+
+@pytest.fixture
+def vty_daemons(tmp_path):
+    with patch.object(bgpcfgd.frr.VtyClient, 'SOCKET_PATH', str(tmp_path / '%s.vty')):
+        yield tmp_path
+
+def test_split_blocks():
+    text = "router bgp 1\n neighbor 1.1.1.1 remote-as 2\n!\nexit\n\nip prefix-list PL seq 5 permit any\n"
+    assert bgpcfgd.frr.FRR.split_blocks(text) == [
+        ["router bgp 1", " neighbor 1.1.1.1 remote-as 2", "exit"],
+        ["ip prefix-list PL seq 5 permit any"],
+    ]
+
+def test_vty_write(vty_daemons):
+    bgpd = FakeVtyDaemon(str(vty_daemons / 'bgpd.vty'), ("router bgp", "neighbor", "route-map", "match"))
+    zebra = FakeVtyDaemon(str(vty_daemons / 'zebra.vty'), ("route-map", "set src"))
+    bgpcfgd.frr.run_command = lambda cmd: pytest.fail("vtysh must not be called")
+    f = bgpcfgd.frr.FRR(["bgpd", "zebra"])
+    f.wait_for_daemons(5)
+    assert f.write("router bgp 1\n neighbor 1.1.1.1 remote-as 2\nroute-map RM permit 10\n match tag 1\n set src 1.1.1.1")
+    assert bgpd.commands == ["enable", "configure terminal", "router bgp 1", "neighbor 1.1.1.1 remote-as 2",
+                             "route-map RM permit 10", "match tag 1", "set src 1.1.1.1", "end"]
+    # The router bgp block is not sent to zebra
+    assert zebra.commands == ["enable", "configure terminal", "router bgp 1",
+                              "route-map RM permit 10", "match tag 1", "set src 1.1.1.1", "end"]
+    assert f.get_config() == "running config of router bgp\n!\nrunning config of route-map\n!\n"
+
+def test_merge_config():
+    bgpd = ("Building configuration...\n\nCurrent configuration:\n!\nfrr version 8.5\nhostname sonic\n!\n"
+            "ip prefix-list PL seq 5 permit any\n!\n"
+            "route-map RM permit 10\n match tag 1\nexit\n!\n"
+            "router bgp 1\n neighbor 1.1.1.1 remote-as 2\n !\n address-family ipv4 unicast\n"
+            "  neighbor 1.1.1.1 activate\n exit-address-family\nexit\n!\nend\n")
+    zebra = ("Building configuration...\n\nCurrent configuration:\n!\nfrr version 8.5\nhostname sonic\n!\n"
+             "ip prefix-list PL seq 5 permit any\n!\n"
+             "route-map RM permit 10\n match tag 1\n set src 1.1.1.1\nexit\n!\n"
+             "ip route 0.0.0.0/0 10.0.0.1\n!\nend\n")
+    assert bgpcfgd.frr.FRR.merge_config([bgpd, zebra]).split('\n') == [
+        "frr version 8.5", "!", "hostname sonic", "!",
+        "ip prefix-list PL seq 5 permit any", "!",
+        "route-map RM permit 10", " match tag 1", " set src 1.1.1.1", "exit", "!",
+        "router bgp 1", " neighbor 1.1.1.1 remote-as 2", " address-family ipv4 unicast",
+        "  neighbor 1.1.1.1 activate", " exit-address-family", "exit", "!",
+        "ip route 0.0.0.0/0 10.0.0.1", "!", "",
+    ]
+
+@patch('bgpcfgd.frr.log_err')
+def test_vty_write_fail(mocked_log_err, vty_daemons):
+    FakeVtyDaemon(str(vty_daemons / 'bgpd.vty'), ("router bgp", "neighbor"), failed=("neighbor 1.1.1.1 remote-as 2",))
+    f = bgpcfgd.frr.FRR(["bgpd"])
+    assert not f.write("router bgp 1\n neighbor 1.1.1.1 remote-as 2\n neighbor 1.1.1.1 shutdown")
+    assert not f.write("unknown command")
+    assert mocked_log_err.call_count == 2
+
+@patch('bgpcfgd.frr.log_err')
+def test_vty_write_configure_fail(mocked_log_err, vty_daemons):
+    bgpd = FakeVtyDaemon(str(vty_daemons / 'bgpd.vty'), ("router bgp", "neighbor"), failed=("configure terminal",))
+    f = bgpcfgd.frr.FRR(["bgpd"])
+    assert not f.write("router bgp 1\n neighbor 1.1.1.1 remote-as 2")
+    # The configuration is not sent out of the configuration mode
+    assert bgpd.commands == ["enable", "configure terminal", "end"]
+    assert mocked_log_err.call_count == 1
+
+@patch('bgpcfgd.frr.log_crit')
+def test_vty_restart_peer_groups(mocked_log_crit, vty_daemons):
+    bgpd = FakeVtyDaemon(str(vty_daemons / 'bgpd.vty'), ("clear bgp",), failed=("clear bgp peer-group pg_2 soft in",))
+    f = bgpcfgd.frr.FRR(["bgpd"])
+    assert not f.restart_peer_groups(["pg_2", "pg_1"])
+    assert bgpd.commands == ["enable", "clear bgp peer-group pg_1 soft in", "clear bgp peer-group pg_2 soft in"]
+    mocked_log_crit.assert_called_with("Can't restart bgp peer-group 'pg_2'. rc='13', out=''")
@@ -0,0 +1,110 @@
+from unittest.mock import MagicMock, patch
+
+from . import swsscommon_test
+
+with patch.dict("sys.modules", swsscommon=swsscommon_test):
+    import bgpcfgd.runner
+    from bgpcfgd.runner import Runner
+
+
+class FakeSubscriber(object):
+    def __init__(self, table_name, events):
+        self.table_name = table_name
+        self.events = list(events)
+
+    def pop(self):
+        return self.events.pop(0) if self.events else ("", "", ())
+
+    def getDbConnector(self):
+        return MagicMock(getDbId=MagicMock(return_value=4))
+
+    def getTableName(self):
+        return self.table_name
+
+
+def get_runner(events):
+    cfg_mgr = MagicMock()
+    cfg_mgr.commit = MagicMock(return_value=True)
+    runner = Runner(cfg_mgr)
+    runner.subscribers = {FakeSubscriber("TABLE", events)}
+    handler = MagicMock()
+    runner.callbacks[4]["TABLE"].append(handler)
+    return runner, handler
+
+def test_coalescing():
+    SET = bgpcfgd.runner.swsscommon.SET_COMMAND
+    DEL = bgpcfgd.runner.swsscommon.DEL_COMMAND
+    runner, handler = get_runner([
+        ("key1", SET, (("a", "1"),)),
+        ("key2", SET, (("a", "1"),)),
+        ("key1", SET, (("a", "2"),)),
+        ("key2", DEL, ()),
+        ("key3", DEL, ()),
+        ("key3", SET, (("a", "3"),)),
+        ("key3", SET, (("a", "4"),)),
+        ("key4", DEL, ()),
+        ("key4", DEL, ()),
+        ("key5", SET, (("a", "5"),)),
+        ("key5", SET, (("a", "6"),)),
+        ("key5", DEL, ()),
+    ])
+    events = []
+    runner.collect_events(events)
+    runner.process_events(events)
+    # Only consecutive events of a key are merged, the order of the events is kept
+    assert [call.args for call in handler.call_args_list] == [
+        ("key1", SET, {"a": "1"}),
+        ("key2", SET, {"a": "1"}),
+        ("key1", SET, {"a": "2"}),
+        ("key2", DEL, {}),
+        ("key3", DEL, {}),
+        ("key3", SET, {"a": "4"}),
+        ("key4", DEL, {}),
+        ("key5", DEL, {}),
+    ]
+    runner.cfg_manager.commit.assert_called_once()
+    assert runner.stats == {
+        "events_received": 12,
+        "events_coalesced": 4,
+        "commits": 1,
+        "commit_failures": 0,
+    }
+
+@patch.object(bgpcfgd.runner, 'log_crit')
+def test_commit_failure(mocked_log_crit):
+    runner, _ = get_runner([("key1", bgpcfgd.runner.swsscommon.SET_COMMAND, ())])
+    runner.cfg_manager.commit = MagicMock(return_value=False)
+    events = []
+    runner.collect_events(events)
+    runner.process_events(events)
+    assert runner.stats["commit_failures"] == 1
+    mocked_log_crit.assert_called_with("Runner::commit was unsuccessful")
+
+def test_export_stats():
+    runner, _ = get_runner([])
+    runner.stats_table = MagicMock()
+    runner.export_stats()
+    runner.stats_table.set.assert_called_once()
+    assert runner.stats_table.set.call_args.args[0] == "runner"
+    # Not more often than STATS_INTERVAL
+    runner.export_stats()
+    runner.stats_table.set.assert_called_once()
+    assert runner.stats_pending
+
+def test_export_stats_when_idle():
+    runner, _ = get_runner([])
+    runner.stats_table = MagicMock()
+    runner.stats_time = bgpcfgd.runner.time.time()
+    runner.export_stats()
+    runner.stats_table.set.assert_not_called()
+    # The counters of the last batch are written when no events arrive
+    def select(timeout):
+        bgpcfgd.runner.g_run = False
+        return runner.selector.TIMEOUT, None
+    runner.selector = MagicMock(select=select)
+    try:
+        runner.run()
+    finally:
+        bgpcfgd.runner.g_run = True
+    runner.stats_table.set.assert_called_once()
+    assert not runner.stats_pending
@@ -0,0 +1,98 @@
+from bgpcfgd.running_config import RunningConfig
+
+
+running_config = """!
+ip prefix-list PL_V4 seq 10 permit 10.0.0.0/8 le 32
+ip prefix-list PL_V4 seq 20 permit 20.0.0.0/8 le 32
+ipv6 prefix-list PL_V6 seq 10 permit fc00::/7 le 128
+bgp community-list standard COMM permit 123:123
+!
+route-map RM permit 10
+ match ip address prefix-list PL_V4
+ match community COMM
+exit
+!
+route-map RM permit 65535
+ set community 1010:1010 additive
+exit
+!
+router bgp 65100
+ neighbor PEER_V4 peer-group
+ neighbor PEER_V6 peer-group
+ address-family ipv4 unicast
+  neighbor PEER_V4 route-map RM in
+ exit-address-family
+exit
+!
+"""
+
+def test_parse():
+    c = RunningConfig(running_config)
+    assert c.get_prefix_list('ip', 'PL_V4') == ['ip prefix-list PL_V4 seq 10 permit 10.0.0.0/8 le 32',
+                                                'ip prefix-list PL_V4 seq 20 permit 20.0.0.0/8 le 32']
+    assert c.get_prefix_list('ipv6', 'PL_V6') == ['ipv6 prefix-list PL_V6 seq 10 permit fc00::/7 le 128']
+    assert c.get_prefix_list('ipv6', 'PL_V4') == []
+    assert c.get_community_list('COMM') == ['bgp community-list standard COMM permit 123:123']
+    assert c.get_route_map('RM') == {
+        'route-map RM permit 10': ['match ip address prefix-list PL_V4', 'match community COMM'],
+        'route-map RM permit 65535': ['set community 1010:1010 additive'],
+    }
+    assert c.get_peer_groups() == {'PEER_V4', 'PEER_V6'}
+    assert c.get_neighbor_route_maps('in') == [('PEER_V4', 'RM')]
+    assert c.get_neighbor_route_maps('out') == []
+    assert c.get_paths()[-2:] == [['router bgp 65100', 'address-family ipv4 unicast'],
+                                  ['router bgp 65100', 'address-family ipv4 unicast', 'neighbor PEER_V4 route-map RM in']]
+    assert c.get_lines()[-3:] == ['router bgp 65100', ' neighbor PEER_V4 peer-group', ' neighbor PEER_V6 peer-group',
+                                  ' address-family ipv4 unicast', '  neighbor PEER_V4 route-map RM in'][-3:]
+
+def test_apply_prefix_and_community_lists():
+    c = RunningConfig(running_config)
+    assert c.apply("no ip prefix-list PL_V4\n"
+                   "ip prefix-list PL_V4 seq 10 permit 30.0.0.0/8 le 32\n"
+                   "ipv6 prefix-list PL_V6 seq 10 permit fd00::/8 le 128\n"
+                   "no bgp community-list standard COMM\n"
+                   "bgp community-list standard COMM permit 456:456\n")
+    assert c.get_prefix_list('ip', 'PL_V4') == ['ip prefix-list PL_V4 seq 10 permit 30.0.0.0/8 le 32']
+    assert c.get_prefix_list('ipv6', 'PL_V6') == ['ipv6 prefix-list PL_V6 seq 10 permit fd00::/8 le 128']
+    assert c.get_community_list('COMM') == ['bgp community-list standard COMM permit 456:456']
+    assert 'ip prefix-list PL_V4 seq 20 permit 20.0.0.0/8 le 32' not in c.get_lines()
+
+def test_apply_route_map_and_peer_groups():
+    c = RunningConfig(running_config)
+    assert c.apply("route-map RM permit 20\n"
+                   " match ipv6 address prefix-list PL_V6\n"
+                   "no route-map RM permit 10\n"
+                   "router bgp 65100 vrf Vrf1\n"
+                   " neighbor PEER_V6_NEW peer-group\n"
+                   " address-family ipv4\n"
+                   "  neighbor PEER_V6_NEW route-map RM in\n"
+                   " exit-address-family\n")
+    assert c.get_route_map('RM') == {
+        'route-map RM permit 65535': ['set community 1010:1010 additive'],
+        'route-map RM permit 20': ['match ipv6 address prefix-list PL_V6'],
+    }
+    assert c.get_peer_groups() == {'PEER_V4', 'PEER_V6', 'PEER_V6_NEW'}
+    assert c.get_neighbor_route_maps('in') == [('PEER_V4', 'RM'), ('PEER_V6_NEW', 'RM')]
+    assert '  neighbor PEER_V6_NEW route-map RM in' in c.get_lines()
+    assert c.apply("no route-map RM")
+    assert c.get_route_map('RM') == {}
+
+def test_apply_stale():
+    c = RunningConfig(running_config)
+    # The previous value of 'set community' is replaced by FRR
+    assert not c.apply("route-map RM permit 65535\n set community 2020:2020 additive")
+    assert c.stale
+    assert not c.apply("ip prefix-list PL seq 5 permit any")
+    # FRR stores the prefix-list entry with a sequence number
+    c = RunningConfig(running_config)
+    assert not c.apply("ip prefix-list PL_V4 permit 30.0.0.0/8 le 32")
+    # The previous remote-as of the neighbor is replaced by FRR
+    c = RunningConfig(running_config + "router bgp 65200\n neighbor 10.0.0.1 remote-as 65300\n")
+    assert not c.apply("router bgp 65200\n neighbor 10.0.0.1 remote-as 65400")
+    # FRR removes the address-family commands of the neighbor too
+    c = RunningConfig(running_config)
+    assert not c.apply("router bgp 65100\n no neighbor PEER_V6 peer-group")
+    assert not RunningConfig(running_config).apply("no ip route 10.0.0.0/8 10.1.1.1")
+    # Commands nested into a removed node
+    c = RunningConfig(running_config)
+    assert not c.apply("no route-map RM permit 10\n match community COMM")
@@ -1088,3 +1088,15 @@ def test_set_bfd_true():
         ]
     )
 
+
+def test_expiry_index_update():
+    mgr = constructor()
+    mgr.db_name = "APPL_DB"
+    mgr.expiry_index = MagicMock()
+    mgr.skip_appl_del = MagicMock(return_value=False)
+    mgr.cfg_mgr.push_list = MagicMock(return_value=True)
+    data = {"nexthop": "10.0.0.1", "refresh": "true"}
+    mgr.set_handler("vrfRED:10.1.0.0/24", data)
+    mgr.expiry_index.on_set.assert_called_once_with("vrfRED:10.1.0.0/24", data)
+    mgr.del_handler("vrfRED:10.1.0.0/24")
+    mgr.expiry_index.on_del.assert_called_once_with("vrfRED:10.1.0.0/24")
@@ -0,0 +1,77 @@
+import time
+from unittest.mock import patch
+
+from staticroutebfd.main import *
+from swsscommon import swsscommon
+
+
+@patch('swsscommon.swsscommon.DBConnector.__init__')
+@patch('swsscommon.swsscommon.ProducerStateTable.__init__')
+@patch('swsscommon.swsscommon.Table.__init__')
+def constructor(mock_db, mock_producer, mock_tbl):
+    mock_db.return_value = None
+    mock_producer.return_value = None
+    mock_tbl.return_value = None
+
+    return StaticRouteBfd()
+
+def get_snapshot(n_routes, n_intfs, n_nh_per_route):
+    """
+    Build the tables read by reconciliation: n_routes static routes with bfd enabled,
+    each using n_nh_per_route nexthops spread over n_intfs interfaces, all bfd sessions UP
+    """
+    intf_tbl = {}
+    bfd_state_tbl = {}
+    for i in range(n_intfs):
+        intf_tbl["Ethernet%d|192.168.%d.1/24" % (i * 4, i)] = {}
+        bfd_state_tbl["default|default|192.168.%d.2" % i] = {"state": "Up"}
+    srt_tbl = {}
+    for i in range(n_routes):
+        nh_idx = [(i + j) % n_intfs for j in range(n_nh_per_route)]
+        srt_tbl["default|10.%d.%d.0/24" % (i // 256, i % 256)] = {
+            "nexthop": ",".join(["192.168.%d.2" % j for j in nh_idx]),
+            "ifname": ",".join(["Ethernet%d" % (j * 4) for j in nh_idx]),
+            "bfd": "true",
+        }
+    return {
+        (CONFIG_DB_NAME, LOOPBACK_INTERFACE_TABLE_NAME): {},
+        (CONFIG_DB_NAME, INTERFACE_TABLE_NAME): intf_tbl,
+        (CONFIG_DB_NAME, PORTCHANNEL_INTERFACE_TABLE_NAME): {},
+        (CONFIG_DB_NAME, STATIC_ROUTE_TABLE_NAME): srt_tbl,
+        (APPL_DB_NAME, BFD_SESSION_TABLE_NAME): {},
+        (STATE_DB_NAME, BFD_SESSION_TABLE_NAME): bfd_state_tbl,
+    }
+
+def run_benchmark(n_routes=10000, n_intfs=32, n_nh_per_route=4):
+    """
+    Run restart reconciliation of n_routes bfd enabled static routes
+    :return: a tuple: number of bfd session writes, number of static route writes, time spent in seconds
+    """
+    dut = constructor()
+    snapshot = get_snapshot(n_routes, n_intfs, n_nh_per_route)
+    dut.load_db_snapshot = lambda: snapshot
+    writes = {"bfd": 0, "srt": 0}
+    class StaticRouteTable(object):
+        def set(self, key, fvs):
+            writes["srt"] += 1
+        def delete(self, key):
+            writes["srt"] += 1
+    def bfd_app_set(key, data):
+        writes["bfd"] += 1
+    dut.set_bfd_session_into_appl_db = bfd_app_set
+    dut.static_route_appl_tbl = StaticRouteTable()
+    start = time.time()
+    dut.reconciliation()
+    return writes["bfd"], writes["srt"], time.time() - start
+
+def test_static_rt_bfd_reconciliation_benchmark():
+    bfd_writes, srt_writes, _ = run_benchmark()
+    # one bfd session per nexthop, and each route is written to appl_db once
+    # no matter how many of its nexthops come UP during the restore
+    assert bfd_writes == 32
+    assert srt_writes == 10000
+
+if __name__ == "__main__":
+    for n_routes in [1000, 10000]:
+        bfd_writes, srt_writes, duration = run_benchmark(n_routes=n_routes)
+        print("routes=%d bfd_writes=%d route_writes=%d time=%.3fs" % (n_routes, bfd_writes, srt_writes, duration))
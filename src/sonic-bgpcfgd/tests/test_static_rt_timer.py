@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+from . import swsscommon_test
+
+with patch.dict("sys.modules", swsscommon=swsscommon_test):
+    import bgpcfgd.static_rt_timer
+    from bgpcfgd.static_rt_timer import StaticRouteTimer, StaticRouteExpiryIndex
+
+
+class FakeApplDb(object):
+    APPL_DB = "APPL_DB"
+
+    def __init__(self, routes, scan_count):
+        self.routes = routes
+        self.scan_count = scan_count
+        self.reads = 0
+
+    def scan(self, db_name, cursor, match, count):
+        if cursor == 0:
+            self.scan_keys = sorted(k for k in self.routes if k.startswith(match[:-1]))
+        batch = self.scan_keys[cursor:cursor + self.scan_count]
+        cursor += self.scan_count
+        return (cursor if cursor < len(self.scan_keys) else 0), batch
+
+    def get_all(self, db_name, key):
+        self.reads += 1
+        return dict(self.routes.get(key, {}))
+
+
+class FakePipe(object):
+    def __init__(self, db):
+        self.db = db
+        self.commands = []
+        self.flushes = 0
+
+    def push(self, command):
+        self.commands.append(command.args)
+
+    def flush(self):
+        for op, key, data in self.commands:
+            if op == "DEL":
+                self.db.routes.pop(key, None)
+            else:
+                self.db.routes[key].update(data)
+        self.commands = []
+        self.flushes += 1
+
+
+class FakeRedisCommand(object):
+    def formatHSET(self, key, data):
+        self.args = ("HSET", key, data)
+
+    def formatDEL(self, key):
+        self.args = ("DEL", key, None)
+
+
+def get_timer(routes, use_index=False, scan_count=2):
+    m = StaticRouteTimer(use_index)
+    m.db = FakeApplDb(routes, scan_count)
+    m.pipe = FakePipe(m.db)
+    return m
+
+def get_routes():
+    return {
+        "STATIC_ROUTE:1.1.1.0/24": {"nexthop": "10.0.0.1", "refresh": "true"},
+        "STATIC_ROUTE:2.2.2.0/24": {"nexthop": "10.0.0.1", "refresh": "false"},
+        "STATIC_ROUTE:vrf1:3.3.3.0/24": {"nexthop": "10.0.0.1", "expiry": "false"},
+        "STATIC_ROUTE:4.4.4.0/24": {"nexthop": "10.0.0.1"},
+        "STATIC_ROUTE:5.5.5.0/24": {"nexthop": "10.0.0.1", "refresh": "true"},
+    }
+
+@patch.object(bgpcfgd.static_rt_timer.swsscommon, "RedisCommand", FakeRedisCommand)
+def test_alarm_scan():
+    m = get_timer(get_routes())
+    m.alarm()
+    assert m.db.routes == {
+        "STATIC_ROUTE:1.1.1.0/24": {"nexthop": "10.0.0.1", "refresh": "false"},
+        "STATIC_ROUTE:vrf1:3.3.3.0/24": {"nexthop": "10.0.0.1", "expiry": "false"},
+        "STATIC_ROUTE:5.5.5.0/24": {"nexthop": "10.0.0.1", "refresh": "false"},
+    }
+    # one pipeline flush per SCAN batch
+    assert m.pipe.flushes == 3
+    assert not m.index_ready
+    m.alarm()
+    assert list(m.db.routes) == ["STATIC_ROUTE:vrf1:3.3.3.0/24"]
+
+@patch.object(bgpcfgd.static_rt_timer.swsscommon, "RedisCommand", FakeRedisCommand)
+def test_alarm_index():
+    m = get_timer(get_routes(), use_index=True)
+    m.timer = 60
+    # the first alarm is a full sweep which fills the index
+    with patch.object(bgpcfgd.static_rt_timer.time, "time", MagicMock(return_value=1000)):
+        m.alarm()
+    assert m.index_ready
+    assert len(m.index) == 2
+
+    # the route refreshed by the REST API is not examined when it is not due
+    m.db.routes["STATIC_ROUTE:1.1.1.0/24"]["refresh"] = "true"
+    with patch.object(bgpcfgd.static_rt_timer.time, "time", MagicMock(return_value=1030)):
+        m.index.on_set("1.1.1.0/24", m.db.routes["STATIC_ROUTE:1.1.1.0/24"])
+        m.index.on_set("6.6.6.0/24", {"nexthop": "10.0.0.1", "expiry": "false"})
+        reads = m.db.reads
+        m.alarm()
+    assert m.db.reads == reads
+    assert len(m.db.routes) == 3
+
+    with patch.object(bgpcfgd.static_rt_timer.time, "time", MagicMock(return_value=1070)):
+        m.alarm()
+    assert m.db.reads == reads + 1
+    assert set(m.db.routes) == {"STATIC_ROUTE:1.1.1.0/24", "STATIC_ROUTE:vrf1:3.3.3.0/24"}
+
+    with patch.object(bgpcfgd.static_rt_timer.time, "time", MagicMock(return_value=1100)):
+        m.alarm()
+    assert m.db.routes["STATIC_ROUTE:1.1.1.0/24"]["refresh"] == "false"
+    with patch.object(bgpcfgd.static_rt_timer.time, "time", MagicMock(return_value=1200)):
+        m.alarm()
+    assert list(m.db.routes) == ["STATIC_ROUTE:vrf1:3.3.3.0/24"]
+    assert len(m.index) == 0
+
+def test_expiry_index():
+    index = StaticRouteExpiryIndex(5)
+    index.schedule("STATIC_ROUTE:1.1.1.0/24", 100)
+    index.schedule("STATIC_ROUTE:2.2.2.0/24", 101)
+    index.schedule("STATIC_ROUTE:3.3.3.0/24", 112)
+    # a refreshed route moves to the bucket of the new refresh time
+    index.schedule("STATIC_ROUTE:2.2.2.0/24", 120)
+    assert index.pop_due(104) == []
+    assert index.pop_due(105) == ["STATIC_ROUTE:1.1.1.0/24"]
+    index.on_del("3.3.3.0/24")
+    assert index.pop_due(200) == ["STATIC_ROUTE:2.2.2.0/24"]
+    assert len(index) == 0
@@ -1,8 +1,10 @@
 import os
 import json
+from unittest.mock import patch
 
+import pytest
 
-from bgpcfgd.template import TemplateFabric
+from bgpcfgd.template import TemplateFabric, prewarm
 from bgpcfgd.config import ConfigMgr
 from .util import load_constants_dir_mappings
 
@@ -164,3 +166,14 @@ def test_sentinel_pg():
 def test_sentinel_instance():
     test_data = load_tests("sentinels", "instance.conf")
     run_tests("sentinel_instance", *test_data)
+
+def test_prewarm(tmp_path):
+    pytest.importorskip('template_cache')
+    cache_dir = str(tmp_path)
+    with patch('bgpcfgd.template.PREBUILT_CACHE_DIR', cache_dir):
+        prewarm(TEMPLATE_PATH)
+    # The templates are compiled under the names bgpcfgd renders them by
+    tf = TemplateFabric(TEMPLATE_PATH, cache_dir)
+    tf.from_file("bgpd/templates/general/peer-group.conf.j2")
+    tf.from_file("bgpd/tsa/bgpd.tsa.isolate.conf.j2")
+    assert tf.env.bytecode_cache.get_stats() == {'hits': 2, 'misses': 0}
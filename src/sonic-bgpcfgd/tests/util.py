@@ -1,5 +1,8 @@
 import os
 import yaml
+from unittest.mock import MagicMock
+
+from bgpcfgd.config import ConfigMgr
 
 CONSTANTS_PATH = os.path.abspath('../../files/image_config/constants/constants.yml')
 
@@ -18,3 +21,15 @@ def load_constants(constants = CONSTANTS_PATH):
         data = yaml.safe_load(f)
     assert "constants" in data, "'constants' key not found in constants.yml"
     return data
+
+def get_cfg_mgr(config):
+    """
+    Create ConfigMgr with FRR running config 'config'. The running config can be read only through
+    the model of the running config, reading the config text fails the test
+    :param config: list of lines of the running config
+    """
+    frr = MagicMock()
+    frr.get_config.return_value = "\n".join(config)
+    cfg_mgr = ConfigMgr(frr)
+    cfg_mgr.get_text = MagicMock(side_effect=AssertionError("running config text must not be scanned"))
+    return cfg_mgr
@@ -1,12 +1,15 @@
 from __future__ import print_function
 
+import hashlib
 import ipaddress
 import math
 import os
+import pickle
 import sys
 import json
 import jinja2
 import subprocess
+import tempfile
 from collections import defaultdict
 
 from lxml import etree as ET
@@ -14,7 +17,8 @@ from lxml.etree import QName
 
 from natsort import natsorted, ns as natsortns
 
-from portconfig import get_port_config, get_fabric_port_config, get_fabric_monitor_config
+from secure_cache import make_cache_dir, open_cache_file
+from portconfig import get_port_config, get_fabric_port_config, get_fabric_monitor_config, db_connect_configdb, PLATFORM_ROOT_PATH
 from sonic_py_common.interface import backplane_prefix
 from sonic_py_common.multi_asic import is_multi_asic
 
@@ -59,6 +63,9 @@ dualtor_cable_types = ["active-active", "active-standby"]
 # Default Virtual Network Index (VNI)
 vni_default = 8000
 
+# Directory of the parse_xml_cached() results cache
+PARSE_CACHE_DIR = os.environ.get('SONIC_MINIGRAPH_CACHE_DIR', '/run/sonic-minigraph-cache')
+
 # Defination of custom acl table types
 acl_table_type_defination = {
     'BMCDATA': {
@@ -1503,7 +1510,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     fabric_port_config_file -- fabric port config file name
      """
 
-    root = ET.parse(filename).getroot()
+    root = get_xml_root(filename)
 
     u_neighbors = None
     u_devices = None
@@ -1580,9 +1587,8 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
 
     (ports, alias_map, alias_asic_map) = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
 
-    port_names_map.update(ports)
-    port_alias_map.update(alias_map)
-    port_alias_asic_map.update(alias_asic_map)
+    # The maps are global, drop the ports of a previous parse in the same process
+    _set_port_maps(ports, alias_map, alias_asic_map)
 
     # Get the local device node from DeviceMetadata
     local_devices = parse_asic_meta_get_devices(root)
@@ -2314,7 +2320,7 @@ def parse_device_desc_xml(filename):
 def parse_asic_sub_role(filename, asic_name):
     if not os.path.isfile(filename):
         return None
-    root = ET.parse(filename).getroot()
+    root = get_xml_root(filename)
     for child in root:
         if child.tag == str(QName(ns, "MetadataDeclaration")):
             sub_role, _, _, _, _, _= parse_asic_meta(child, asic_name)
@@ -2322,7 +2328,7 @@ def parse_asic_sub_role(filename, asic_name):
 
 def parse_asic_switch_type(filename, asic_name):
     if os.path.isfile(filename):
-        root = ET.parse(filename).getroot()
+        root = get_xml_root(filename)
         for child in root:
             if child.tag == str(QName(ns, "MetadataDeclaration")):
                 _, _, switch_type, _, _, _ = parse_asic_meta(child, asic_name)
@@ -2345,6 +2351,128 @@ port_names_map = {}
 port_alias_map = {}
 port_alias_asic_map = {}
 
+def _set_port_maps(ports, alias_map, alias_asic_map):
+    """ Replace the content of the global port maps """
+    for port_map, content in ((port_names_map, ports), (port_alias_map, alias_map), (port_alias_asic_map, alias_asic_map)):
+        port_map.clear()
+        port_map.update(content)
+
+# Parsed document of the last minigraph file, see get_xml_root()
+_xml_root_cache = {}
+
+def get_xml_root(filename):
+    """ Return the root element of the minigraph xml file.
+
+    The document is parsed once per process and shared by parse_xml(),
+    parse_asic_sub_role() and parse_asic_switch_type(), which are called
+    several times per file on multi-asic devices. The parsed document is
+    re-read if the file has been modified.
+    Callers must not modify the returned tree.
+    """
+    st = os.stat(filename)
+    key = (os.path.realpath(filename), st.st_mtime, st.st_size)
+    root = _xml_root_cache.get(key)
+    if root is None:
+        root = ET.parse(filename).getroot()
+        _xml_root_cache.clear()
+        _xml_root_cache[key] = root
+    return root
+
+def _get_file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime, st.st_size)
+
+# Keys of parse_xml_cached() results computed by this process, see _get_parse_cache_key()
+_parse_cache_keys = {}
+
+def _get_parse_cache_key(filename, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file):
+    """ Compute the key of the parse_xml() results in the cache.
+
+    The key covers the minigraph content, the arguments and every other input
+    of parse_xml(): the port config files, the platform device directory, the
+    dns template, the PORT table of config DB (read by get_port_config() when
+    no port config file is given) and the parser code itself.
+    The key is computed once per process for the same minigraph file and arguments.
+    """
+    args = (filename, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+    memo_key = (args, _get_file_signature(filename))
+    key = _parse_cache_keys.get(memo_key)
+    if key is not None:
+        return key
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        h.update(f.read())
+    deps = [repr((platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)),
+            os.environ.get("CFGGEN_UNIT_TESTING", ""),
+            _get_file_signature(os.path.abspath(__file__)),
+            _get_file_signature("/usr/share/sonic/templates/dns.j2")]
+    for path in [port_config_file, hwsku_config_file, fabric_port_config_file]:
+        if path:
+            deps.append(_get_file_signature(path))
+    if platform:
+        for dir_path, dir_names, file_names in os.walk(os.path.join(PLATFORM_ROOT_PATH, platform)):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                deps.append(_get_file_signature(os.path.join(dir_path, file_name)))
+    if not port_config_file:
+        config_db = db_connect_configdb(asic_name)
+        if config_db is not None:
+            deps.append(json.dumps(config_db.get_table("PORT"), sort_keys=True))
+    h.update(repr(deps).encode())
+    key = h.hexdigest()
+    _parse_cache_keys[memo_key] = key
+    return key
+
+def parse_xml_cached(filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None, fabric_port_config_file=None, cache_dir=PARSE_CACHE_DIR):
+    """ Parse minigraph xml file, reusing the results of a previous parse.
+
+    Same as parse_xml(), the results are stored in cache_dir keyed by a hash
+    of all inputs of the parse, so that repeated invocations for the same
+    minigraph (e.g. once per asic namespace) do not parse it again.
+    """
+    if not cache_dir:
+        return parse_xml(filename, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+
+    key = _get_parse_cache_key(filename, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+    cache_file = os.path.join(cache_dir, key + '.pickle')
+    try:
+        with open_cache_file(cache_file) as f:
+            entry = pickle.load(f)
+        _set_port_maps(entry['port_names_map'], entry['port_alias_map'], entry['port_alias_asic_map'])
+        return entry['results']
+    except (IOError, OSError, EOFError, ValueError, KeyError, pickle.UnpicklingError):
+        pass
+
+    results = parse_xml(filename, platform, port_config_file, asic_name, hwsku_config_file, fabric_port_config_file)
+    entry = {
+        'results': results,
+        'port_names_map': port_names_map,
+        'port_alias_map': port_alias_map,
+        'port_alias_asic_map': port_alias_asic_map
+    }
+    tmp_file = None
+    try:
+        if not make_cache_dir(cache_dir):
+            return results
+        fd, tmp_file = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=2)
+        os.rename(tmp_file, cache_file)
+        tmp_file = None
+    except (IOError, OSError, pickle.PicklingError):
+        # The cache is an optimization only
+        pass
+    finally:
+        if tmp_file is not None:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+    return results
+
 
 def print_parse_xml(filename):
     results = parse_xml(filename)
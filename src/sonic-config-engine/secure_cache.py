@@ -0,0 +1,57 @@
+"""
+Helpers for the on-disk caches of sonic-cfggen.
+
+Cache files hold code (jinja2 bytecode) or pickled objects which are loaded
+by root, so a cache directory or file is only used if it is owned by the
+current user (or root) and not writable by group or others.
+"""
+
+import errno
+import os
+import stat
+
+
+def is_secure_path(st):
+    """
+    Check whether the file of the os.stat() result st is owned by the current
+    user or root, and not writable by group or others
+    """
+    return st.st_uid in (0, os.getuid()) and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def make_cache_dir(directory):
+    """
+    Create the cache directory accessible by the current user only, if it
+    doesn't exist.
+    Return:
+        True if the directory can be used as cache directory
+    """
+    try:
+        os.makedirs(directory, 0o700)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            return False
+    try:
+        st = os.lstat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and is_secure_path(st)
+
+
+def open_cache_file(path):
+    """
+    Open the cache file for reading.
+    Raise:
+        OSError if the file or its directory is not owned by the current
+        user or is writable by group or others
+    """
+    st = os.lstat(os.path.dirname(path) or '.')
+    if not stat.S_ISDIR(st.st_mode) or not is_secure_path(st):
+        raise OSError(errno.EPERM, 'Insecure cache directory', os.path.dirname(path))
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    f = os.fdopen(fd, 'rb')
+    st = os.fstat(f.fileno())
+    if not stat.S_ISREG(st.st_mode) or not is_secure_path(st):
+        f.close()
+        raise OSError(errno.EPERM, 'Insecure cache file', path)
+    return f
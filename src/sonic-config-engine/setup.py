@@ -50,6 +50,8 @@ py_modules = [
     'minigraph',
     'openconfig_acl',
     'portconfig',
+    'secure_cache',
+    'template_cache',
 ]
 if sys.version_info.major == 3:
     # Python 3-only modules
@@ -0,0 +1,131 @@
+"""
+On-disk jinja2 bytecode cache shared by sonic-cfggen and bgpcfgd.
+
+Compiled templates are stored in a tmpfs directory, so that a template is
+lexed and compiled once per boot instead of once per process. A read-only
+prebuilt directory, populated at image build time, is consulted on a miss.
+The tmpfs directory is under /run, which only root can write to.
+"""
+
+import hashlib
+import os
+import tempfile
+
+import jinja2
+
+from secure_cache import make_cache_dir, open_cache_file
+
+CACHE_DIR = os.environ.get('SONIC_J2_CACHE_DIR', '/run/sonic-j2-cache')
+PREBUILT_CACHE_DIR = '/usr/share/sonic/j2-cache'
+CACHE_SUFFIX = '.cache'
+
+
+class SonicBytecodeCache(jinja2.BytecodeCache):
+    """
+    Bytecode cache keyed by template name, path and mtime plus a version
+    string identifying the jinja2 environment (options and filter set) the
+    template was compiled with.
+    """
+    def __init__(self, version, directory=CACHE_DIR, prebuilt_directory=PREBUILT_CACHE_DIR):
+        self.version = version
+        self.directory = directory
+        self.prebuilt_directory = prebuilt_directory
+        self.hits = 0
+        self.misses = 0
+
+    def get_cache_key(self, name, filename=None):
+        mtime = None
+        if filename is not None:
+            try:
+                mtime = os.path.getmtime(filename)
+            except OSError:
+                pass
+        key = '|'.join([self.version, name, filename or '', repr(mtime)])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _get_cache_path(self, directory, bucket):
+        return os.path.join(directory, bucket.key + CACHE_SUFFIX)
+
+    def load_bytecode(self, bucket):
+        for directory in (self.directory, self.prebuilt_directory):
+            if not directory:
+                continue
+            try:
+                f = open_cache_file(self._get_cache_path(directory, bucket))
+            except (IOError, OSError):
+                continue
+            with f:
+                try:
+                    bucket.load_bytecode(f)
+                except (EOFError, ValueError, TypeError):
+                    # Truncated or corrupted cache file
+                    bucket.reset()
+            if bucket.code is not None:
+                self.hits += 1
+                return
+        self.misses += 1
+
+    def dump_bytecode(self, bucket):
+        if not self.directory:
+            return
+        tmp_path = None
+        try:
+            if not make_cache_dir(self.directory):
+                return
+            # Write to a temporary file first, concurrent readers never see partial content
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                bucket.write_bytecode(f)
+            os.rename(tmp_path, self._get_cache_path(self.directory, bucket))
+            tmp_path = None
+        except (IOError, OSError):
+            # The cache is an optimization only, keep rendering without it
+            pass
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            if filename.endswith(CACHE_SUFFIX):
+                try:
+                    os.remove(os.path.join(self.directory, filename))
+                except OSError:
+                    pass
+
+    def get_stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+def prewarm_templates(env, template_dir, get_basename_env=None):
+    """
+    Compile every *.j2 template found under template_dir with env, so that
+    the compiled code ends up in the bytecode cache of env.
+    The cache key includes the name a template is looked up by and the file it
+    resolves to. Templates are loaded by their path relative to template_dir,
+    which is the name bgpcfgd and includes look them up by. sonic-cfggen -t
+    looks a template up by its base name, with the directory of the template
+    in the search path: when get_basename_env is given, every template is also
+    loaded by its base name with the environment get_basename_env(directory of
+    the template) returns.
+    Return:
+        list of (template name, error string) of templates which failed to compile
+    """
+    failed = []
+    for root, _, filenames in os.walk(template_dir):
+        for filename in sorted(filenames):
+            if not filename.endswith('.j2'):
+                continue
+            name = os.path.relpath(os.path.join(root, filename), template_dir)
+            try:
+                env.get_template(name)
+                if get_basename_env is not None:
+                    get_basename_env(root).get_template(filename)
+            except jinja2.TemplateError as e:
+                failed.append((name, str(e)))
+    return failed
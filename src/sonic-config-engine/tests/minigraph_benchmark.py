@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+"""minigraph_benchmark.py
+
+Benchmark of minigraph parsing and template rendering on synthetic
+topologies of configurable scale.
+
+A minigraph and the matching port_config.ini file(s) are generated for the
+requested number of ports, PortChannels, VLANs, BGP sessions, ACLs, link
+metadata entries and asics. Then the time of every parse_* stage of
+minigraph.parse_xml(), of the end-to-end parse_xml() and of rendering the
+given jinja2 templates with the parse results is measured, and reported as
+json together with the peak RSS of the process.
+
+Examples:
+    python tests/minigraph_benchmark.py --ports 128 --portchannels 32 --bgp-sessions 64
+    python tests/minigraph_benchmark.py --asics 4 --output result.json
+"""
+
+from __future__ import print_function
+
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from importlib.machinery import SourceFileLoader
+
+from lxml.etree import QName
+
+CONFIG_ENGINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..')
+sys.path.insert(0, CONFIG_ENGINE_DIR)
+
+import minigraph
+
+NS_A = 'http://schemas.datacontract.org/2004/07/Microsoft.Search.Autopilot.Evolution'
+HWSKU = 'Synthetic-SKU'
+PORT_SPEED = '100000'
+LANES_PER_PORT = 4
+
+
+def _ports_of_asic(args, asic):
+    """ Return the (name, alias, asic_port_name) of the front panel ports of the asic """
+    ports_per_asic = args.ports // max(args.asics, 1)
+    first = asic * ports_per_asic
+    ports = []
+    for i in range(first, first + ports_per_asic):
+        asic_port_name = 'Eth%d-ASIC%d' % (i - first, asic) if args.asics else None
+        ports.append(('Ethernet%d' % (i * LANES_PER_PORT), 'etp%d' % (i + 1), asic_port_name))
+    return ports
+
+
+def generate_port_config(args, asic=0):
+    lines = []
+    if args.asics:
+        lines.append('# name lanes alias index asic_port_name role')
+    else:
+        lines.append('# name lanes alias index')
+    for name, alias, asic_port_name in _ports_of_asic(args, asic):
+        index = int(name[len('Ethernet'):]) // LANES_PER_PORT
+        lanes = ','.join(str(index * LANES_PER_PORT + lane) for lane in range(LANES_PER_PORT))
+        line = '%s %s %s %d' % (name, lanes, alias, index)
+        if args.asics:
+            line += ' %s Ext' % asic_port_name
+        lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def _device(d_type, hostname, address, hwsku):
+    return ('<Device i:type="%s"><ElementType>%s</ElementType>'
+            '<Address xmlns:b="Microsoft.Search.Autopilot.NetMux"><b:IPPrefix>%s</b:IPPrefix></Address>'
+            '<Hostname>%s</Hostname><HwSku>%s</HwSku></Device>' % (d_type, d_type, address, hostname, hwsku))
+
+
+def _link(start_device, start_port, end_device, end_port):
+    return ('<DeviceLinkBase i:type="DeviceInterfaceLink"><ElementType>DeviceInterfaceLink</ElementType>'
+            '<Bandwidth>%s</Bandwidth><EndDevice>%s</EndDevice><EndPort>%s</EndPort>'
+            '<StartDevice>%s</StartDevice><StartPort>%s</StartPort></DeviceLinkBase>'
+            % (PORT_SPEED, end_device, end_port, start_device, start_port))
+
+
+def _device_property(name, value):
+    return ('<a:DeviceProperty><a:Name>%s</a:Name><a:Reference i:nil="true"/>'
+            '<a:Value>%s</a:Value></a:DeviceProperty>' % (name, value))
+
+
+def _loopback(name, prefix):
+    return ('<a:LoopbackIPInterface><Name>%s</Name><AttachTo>Loopback0</AttachTo>'
+            '<a:Prefix xmlns:b="Microsoft.Search.Autopilot.Evolution"><b:IPPrefix>%s</b:IPPrefix></a:Prefix>'
+            '<a:PrefixStr>%s</a:PrefixStr></a:LoopbackIPInterface>' % (name, prefix, prefix))
+
+
+def _generate_dpg(args, hostname, ports, asic_index, sessions, links):
+    """ Generate the DeviceDataPlaneInfo of hostname. Fill sessions and links
+    with the BGP sessions and links of its PortChannels and VLANs.
+    """
+    # Ports are referenced by asic port name inside of an asic, by alias otherwise
+    ref = [asic_port_name or alias for _, alias, asic_port_name in ports]
+    n_asics = max(args.asics, 1)
+    n_pcs = args.portchannels // n_asics
+    n_vlans = args.vlans // n_asics
+    n_sessions = args.bgp_sessions // n_asics
+    members = max(1, min(args.portchannel_members, len(ref) // max(n_pcs, 1)))
+
+    pcs = []
+    ipintfs = []
+    used = 0
+    for i in range(n_pcs):
+        if used + members > len(ref):
+            break
+        pc_name = 'PortChannel%d' % (asic_index * 1000 + i + 1)
+        pc_members = ref[used:used + members]
+        used += members
+        pcs.append('<PortChannel><Name>%s</Name><AttachTo>%s</AttachTo><SubInterface/></PortChannel>'
+                   % (pc_name, ';'.join(pc_members)))
+        idx = asic_index * 1000 + i
+        v4 = '10.%d.%d.%d' % (idx // 32768, (idx // 128) % 256, (idx % 128) * 2)
+        v6 = 'fc00::%x:%x' % (idx, 1)
+        ipintfs.append('<IPInterface><Name i:nil="true"/><AttachTo>%s</AttachTo><Prefix>%s/31</Prefix></IPInterface>' % (pc_name, v4))
+        ipintfs.append('<IPInterface><Name i:nil="true"/><AttachTo>%s</AttachTo><Prefix>%s/126</Prefix></IPInterface>' % (pc_name, v6))
+        neighbor = 'ARISTA%02dT%d' % (idx + 1, 2 if args.asics else 1)
+        for j, member in enumerate(pc_members):
+            links.append(_link(neighbor, 'Ethernet%d' % (j + 1), hostname, member))
+        if len(sessions) < n_sessions * (asic_index + 1):
+            peer_v4 = '10.%d.%d.%d' % (idx // 32768, (idx // 128) % 256, (idx % 128) * 2 + 1)
+            sessions.append((hostname, v4, neighbor, peer_v4))
+
+    vlans = []
+    free_ports = ref[used:]
+    per_vlan = max(1, len(free_ports) // max(n_vlans, 1))
+    for i in range(n_vlans):
+        vlan_members = free_ports[i * per_vlan:(i + 1) * per_vlan] or free_ports[-1:]
+        if not vlan_members:
+            break
+        vlan_id = 1000 + asic_index * 1000 + i
+        subnet = '192.%d.%d.1/24' % (168 + (vlan_id // 256) % 64, vlan_id % 256)
+        vlans.append('<VlanInterface><Name>Vlan%d</Name><AttachTo>%s</AttachTo>'
+                     '<DhcpRelays>192.0.0.1;192.0.0.2</DhcpRelays><Dhcpv6Relays>fc02:2000::1</Dhcpv6Relays>'
+                     '<VlanID>%d</VlanID><Tag>%d</Tag><Subnets>%s</Subnets></VlanInterface>'
+                     % (vlan_id, ';'.join(vlan_members), vlan_id, vlan_id, subnet))
+        ipintfs.append('<IPInterface><Name i:nil="true"/><AttachTo>Vlan%d</AttachTo><Prefix>%s</Prefix></IPInterface>' % (vlan_id, subnet))
+        for member in vlan_members:
+            links.append(_link('Server%d' % len(links), 'eth0', hostname, member))
+
+    # Remaining sessions are routed, without a local interface
+    while len(sessions) < n_sessions * (asic_index + 1):
+        idx = len(sessions)
+        sessions.append((hostname, '10.255.%d.%d' % (idx // 128, (idx % 128) * 2),
+                         'ARISTA%02dT%d' % (idx + 1, 2 if args.asics else 1),
+                         '10.255.%d.%d' % (idx // 128, (idx % 128) * 2 + 1)))
+
+    acls = []
+    pc_names = [pc.split('<Name>')[1].split('</Name>')[0] for pc in pcs]
+    for i in range(args.acls // n_asics):
+        acls.append('<AclInterface><AttachTo>%s</AttachTo><InAcl>DataAcl%d</InAcl><Type>DataPlane</Type></AclInterface>'
+                    % (';'.join(pc_names or ref[:1]), asic_index * 1000 + i))
+    acls.append('<AclInterface><AttachTo>SNMP</AttachTo><InAcl>SNMP_ACL</InAcl><Type>SNMP</Type></AclInterface>')
+    acls.append('<AclInterface><AttachTo>SSH</AttachTo><InAcl>SSH_ONLY</InAcl><Type>SSH</Type></AclInterface>')
+
+    return ('<DeviceDataPlaneInfo><IPSecTunnels/>'
+            '<LoopbackIPInterfaces xmlns:a="%s">%s%s</LoopbackIPInterfaces>'
+            '<ManagementIPInterfaces xmlns:a="%s"><a:ManagementIPInterface><Name>HostIP</Name><AttachTo>eth0</AttachTo>'
+            '<a:Prefix xmlns:b="Microsoft.Search.Autopilot.Evolution"><b:IPPrefix>10.250.0.10/24</b:IPPrefix></a:Prefix>'
+            '<a:PrefixStr>10.250.0.10/24</a:PrefixStr></a:ManagementIPInterface></ManagementIPInterfaces>'
+            '<ManagementVIPInterfaces xmlns:a="%s"/><MplsInterfaces/><MplsTeInterfaces/><RsvpInterfaces/>'
+            '<Hostname>%s</Hostname><PortChannelInterfaces>%s</PortChannelInterfaces>'
+            '<VlanInterfaces>%s</VlanInterfaces><IPInterfaces>%s</IPInterfaces><DataAcls/>'
+            '<AclInterfaces>%s</AclInterfaces><DownstreamSummaries/></DeviceDataPlaneInfo>'
+            % (NS_A, _loopback('HostIP', '10.1.0.%d/32' % (asic_index + 1)), _loopback('HostIP1', 'fc00:1::%d/128' % (asic_index + 1)),
+               NS_A, NS_A, hostname, ''.join(pcs), ''.join(vlans), ''.join(ipintfs), ''.join(acls)))
+
+
+def generate_minigraph(args):
+    """ Generate the minigraph xml text described by args """
+    hostname = args.hostname
+    dpgs = []
+    sessions = []
+    links = []
+    asic_names = ['ASIC%d' % i for i in range(args.asics)]
+    if args.asics:
+        # Host level data plane info, the asic ones carry the interfaces
+        dpgs.append(_generate_dpg(argparse.Namespace(**dict(vars(args), portchannels=0, vlans=0, bgp_sessions=0, acls=0)),
+                                  hostname, [], 0, [], []))
+        for i, asic_name in enumerate(asic_names):
+            dpgs.append(_generate_dpg(args, asic_name, _ports_of_asic(args, i), i, sessions, links))
+        # External links are declared between the device and the neighbors, by port alias
+        alias_map = dict((asic_port_name, alias) for i in range(args.asics) for _, alias, asic_port_name in _ports_of_asic(args, i))
+        links = [link.replace('<EndDevice>%s</EndDevice>' % asic_name, '<EndDevice>%s</EndDevice>' % hostname)
+                 for link in links for asic_name in asic_names if '<EndDevice>%s</EndDevice>' % asic_name in link]
+        for asic_port_name, alias in alias_map.items():
+            links = [link.replace('<EndPort>%s</EndPort>' % asic_port_name, '<EndPort>%s</EndPort>' % alias) for link in links]
+    else:
+        dpgs.append(_generate_dpg(args, hostname, _ports_of_asic(args, 0), 0, sessions, links))
+
+    peering = []
+    routers = []
+    neighbors = set()
+    for start_router, start_peer, end_router, end_peer in sessions:
+        peering.append('<BGPSession><StartRouter>%s</StartRouter><StartPeer>%s</StartPeer><EndRouter>%s</EndRouter>'
+                       '<EndPeer>%s</EndPeer><Multihop>1</Multihop><HoldTime>180</HoldTime><KeepAliveTime>60</KeepAliveTime></BGPSession>'
+                       % (start_router, start_peer, end_router, end_peer))
+        neighbors.add(end_router)
+    for router in [hostname] + asic_names:
+        peers = ''.join('<BGPPeer><Address>%s</Address><RouteMapIn i:nil="true"/><RouteMapOut i:nil="true"/><Vrf i:nil="true"/></BGPPeer>'
+                        % end_peer for start_router, _, _, end_peer in sessions if start_router == router)
+        routers.append('<a:BGPRouterDeclaration><a:ASN>65100</a:ASN><a:Hostname>%s</a:Hostname><a:Peers>%s</a:Peers>'
+                       '<a:RouteMaps/></a:BGPRouterDeclaration>' % (router, peers))
+    for neighbor in sorted(neighbors):
+        routers.append('<a:BGPRouterDeclaration><a:ASN>64600</a:ASN><a:Hostname>%s</a:Hostname><a:RouteMaps/></a:BGPRouterDeclaration>' % neighbor)
+
+    devices = [_device('SpineRouter' if args.asics else 'LeafRouter', hostname, '10.1.0.32/32', HWSKU)]
+    for i, asic_name in enumerate(asic_names):
+        devices.append(_device('Asic', asic_name, '0.0.0.0/0', HWSKU))
+    for i, neighbor in enumerate(sorted(neighbors)):
+        devices.append(_device('LeafRouter', neighbor, '10.2.%d.%d/32' % (i // 256, i % 256), 'Arista-VM'))
+
+    linkmetas = []
+    external_ports = [alias for i in range(max(args.asics, 1)) for _, alias, _ in _ports_of_asic(args, i)]
+    for alias in external_ports[:args.linkmetas]:
+        linkmetas.append('<a:LinkMetadata><a:Name i:nil="true"/><a:Properties>%s%s</a:Properties>'
+                         '<a:Key>Neighbor:Ethernet1;%s:%s</a:Key></a:LinkMetadata>'
+                         % (_device_property('AutoNegotiation', 'True'), _device_property('FECDisabled', 'False'), hostname, alias))
+
+    device_metas = ['<a:DeviceMetadata><a:Name>%s</a:Name><a:Properties>%s%s%s%s</a:Properties></a:DeviceMetadata>'
+                    % (hostname, _device_property('DeploymentId', '1'), _device_property('NtpResources', '10.0.10.1;10.0.10.2'),
+                       _device_property('SyslogResources', '10.0.10.5;10.0.10.6'), _device_property('TacacsServer', '10.0.10.7'))]
+    for asic_name in asic_names:
+        device_metas.append('<a:DeviceMetadata><a:Name>%s</a:Name><a:Properties>%s</a:Properties></a:DeviceMetadata>'
+                            % (asic_name, _device_property('SubRole', 'FrontEnd')))
+
+    interfaces = ''.join('<a:EthernetInterface><ElementType>DeviceInterface</ElementType><Index>1</Index>'
+                         '<InterfaceName>%s</InterfaceName><PortName>0</PortName><Speed>%s</Speed></a:EthernetInterface>'
+                         % (alias, PORT_SPEED) for alias in external_ports)
+
+    return ('<DeviceMiniGraph xmlns="Microsoft.Search.Autopilot.Evolution" xmlns:i="http://www.w3.org/2001/XMLSchema-instance">'
+            '<CpgDec><PeeringSessions>%s</PeeringSessions><Routers xmlns:a="%s">%s</Routers></CpgDec>'
+            '<DpgDec>%s</DpgDec>'
+            '<PngDec><DeviceInterfaceLinks>%s</DeviceInterfaceLinks><Devices>%s</Devices></PngDec>'
+            '<LinkMetadataDeclaration><Link xmlns:a="%s">%s</Link></LinkMetadataDeclaration>'
+            '<MetadataDeclaration><Devices xmlns:a="%s">%s</Devices><Properties xmlns:a="%s"/></MetadataDeclaration>'
+            '<DeviceInfos><DeviceInfo><EthernetInterfaces xmlns:a="%s">%s</EthernetInterfaces>'
+            '<ManagementInterfaces xmlns:a="%s"/><HwSku>%s</HwSku></DeviceInfo></DeviceInfos>'
+            '<Hostname>%s</Hostname><HwSku>%s</HwSku></DeviceMiniGraph>\n'
+            % (''.join(peering), NS_A, ''.join(routers), ''.join(dpgs), ''.join(links), ''.join(devices),
+               NS_A, ''.join(linkmetas), NS_A, ''.join(device_metas), NS_A, NS_A, interfaces, NS_A, HWSKU, hostname, HWSKU))
+
+
+def _timed(func, *args, **kwargs):
+    start = time.time()
+    result = func(*args, **kwargs)
+    return result, time.time() - start
+
+
+def _peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def benchmark_stages(filename, port_config_file, asic_name):
+    """ Time every stage of parse_xml() separately, in the order parse_xml() runs them """
+    stages = {}
+    minigraph._xml_root_cache.clear()
+    root, stages['xml_parse'] = _timed(minigraph.get_xml_root, filename)
+    hostname = root.find(str(QName(minigraph.ns, 'Hostname'))).text
+    hwsku = root.find(str(QName(minigraph.ns, 'HwSku'))).text
+    (ports, alias_map, alias_asic_map), stages['port_config'] = _timed(
+        minigraph.get_port_config, hwsku=hwsku, port_config_file=port_config_file, asic_name=asic_name)
+    minigraph.port_names_map.update(ports)
+    minigraph.port_alias_map.update(alias_map)
+    minigraph.port_alias_asic_map.update(alias_asic_map)
+    local_devices, stages['parse_asic_meta_get_devices'] = _timed(minigraph.parse_asic_meta_get_devices, root)
+
+    section_hname = asic_name.upper() if asic_name else hostname
+    dpg_ecmp_content = {}
+    for child in root:
+        tag = QName(child.tag).localname if isinstance(child.tag, str) else None
+        if tag == 'DpgDec':
+            result, stages['parse_dpg'] = _timed(minigraph.parse_dpg, child, section_hname)
+            dpg_ecmp_content = result[14]
+        elif tag == 'CpgDec':
+            _, stages['parse_cpg'] = _timed(minigraph.parse_cpg, child, section_hname, local_devices)
+        elif tag == 'PngDec':
+            if asic_name:
+                _, stages['parse_asic_png'] = _timed(minigraph.parse_asic_png, child, section_hname, hostname)
+            else:
+                _, stages['parse_png'] = _timed(minigraph.parse_png, child, hostname, dpg_ecmp_content)
+        elif tag == 'MetadataDeclaration':
+            if asic_name:
+                _, stages['parse_asic_meta'] = _timed(minigraph.parse_asic_meta, child, section_hname)
+            else:
+                _, stages['parse_meta'] = _timed(minigraph.parse_meta, child, hostname)
+        elif tag == 'LinkMetadataDeclaration':
+            _, stages['parse_linkmeta'] = _timed(minigraph.parse_linkmeta, child, hostname)
+        elif tag == 'DeviceInfos':
+            _, stages['parse_deviceinfo'] = _timed(minigraph.parse_deviceinfo, child, hwsku)
+    return stages
+
+
+def benchmark_parse_xml(filename, port_config_file, asic_name, iterations):
+    """ Time the end-to-end parse_xml(), parsing the document from disk on every iteration """
+    durations = []
+    results = None
+    for _ in range(iterations):
+        minigraph._xml_root_cache.clear()
+        results, duration = _timed(minigraph.parse_xml, filename, port_config_file=port_config_file, asic_name=asic_name)
+        durations.append(duration)
+    return results, {'min': min(durations), 'mean': sum(durations) / len(durations), 'runs': durations}
+
+
+def benchmark_templates(templates, data):
+    """ Time rendering of the templates with the sonic-cfggen jinja2 environment """
+    cfggen = SourceFileLoader('sonic_cfggen', os.path.join(CONFIG_ENGINE_DIR, 'sonic-cfggen')).load_module()
+    report = {}
+    for template_file in templates:
+        template_file = os.path.abspath(template_file)
+        env = cfggen._get_jinja2_env(['/', os.path.dirname(template_file)], cache_dir=None)
+        try:
+            template, compile_time = _timed(env.get_template, os.path.basename(template_file))
+            _, render_time = _timed(template.render, data)
+            report[template_file] = {'compile': compile_time, 'render': render_time}
+        except Exception as e:
+            report[template_file] = {'error': str(e)}
+    return report
+
+
+def run(args):
+    workdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(workdir, 'minigraph.xml')
+        with open(filename, 'w') as f:
+            f.write(generate_minigraph(args))
+        asic_name = 'asic%d' % args.asic_index if args.asics else None
+        port_config_file = os.path.join(workdir, 'port_config.ini')
+        with open(port_config_file, 'w') as f:
+            f.write(generate_port_config(args, args.asic_index if args.asics else 0))
+
+        report = {
+            'parameters': dict((key, value) for key, value in vars(args).items() if key not in ['output', 'template']),
+            'python': platform.python_version(),
+            'minigraph_bytes': os.path.getsize(filename),
+        }
+        report['stages'] = benchmark_stages(filename, port_config_file, asic_name)
+        data, report['parse_xml'] = benchmark_parse_xml(filename, port_config_file, asic_name, args.iterations)
+        report['tables'] = dict((table, len(entries)) for table, entries in data.items() if isinstance(entries, dict))
+        report['peak_rss_kb_after_parse'] = _peak_rss_kb()
+        report['templates'] = benchmark_templates(args.template, data)
+        report['peak_rss_kb'] = _peak_rss_kb()
+        return report
+    finally:
+        shutil.rmtree(workdir)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description="Benchmark minigraph parsing and template rendering on a synthetic topology.")
+    parser.add_argument("--hostname", default="synthetic-switch")
+    parser.add_argument("--ports", type=int, default=64, help="number of front panel ports")
+    parser.add_argument("--portchannels", type=int, default=16, help="number of PortChannels")
+    parser.add_argument("--portchannel-members", type=int, default=2, help="number of members per PortChannel")
+    parser.add_argument("--vlans", type=int, default=4, help="number of VLANs, attached to the ports not in a PortChannel")
+    parser.add_argument("--bgp-sessions", type=int, default=32, help="number of BGP sessions")
+    parser.add_argument("--acls", type=int, default=4, help="number of data plane ACLs")
+    parser.add_argument("--linkmetas", type=int, default=64, help="number of link metadata entries")
+    parser.add_argument("--asics", type=int, default=0, help="number of asics, 0 for a single asic device")
+    parser.add_argument("--asic-index", type=int, default=0, help="asic the configuration is generated for on multi-asic")
+    parser.add_argument("--iterations", type=int, default=5, help="number of end-to-end parse_xml() runs")
+    parser.add_argument("-t", "--template", action='append',
+                        help="template to render with the parse results, the ones of data/ by default")
+    parser.add_argument("-o", "--output", help="json output file, stdout by default")
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    if not args.template:
+        args.template = sorted(glob.glob(os.path.join(CONFIG_ENGINE_DIR, 'data', '*.j2')))
+    report = run(args)
+    output = json.dumps(report, indent=4, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import json
 import subprocess
 import os
+import time
 import tests.common_utils as utils
 
 from unittest import TestCase
@@ -213,6 +214,42 @@ class TestCfgGen(TestCase):
         for key, value in data.items():
             self.assertEqual(output_data[key.replace("key", "jk")], value)
 
+    def test_render_server(self):
+        if not utils.PY3x:
+            return
+        env = dict(os.environ, SONIC_CFGGEN_SOCKET=os.path.join(self.test_dir, 'render.sock'))
+        server = subprocess.Popen(self.script_file + ['--server'], env=env)
+        try:
+            for _ in range(100):
+                if os.path.exists(env['SONIC_CFGGEN_SOCKET']):
+                    break
+                time.sleep(0.1)
+            self.assertTrue(os.path.exists(env['SONIC_CFGGEN_SOCKET']))
+            argument = ['-y', os.path.join(self.test_dir, 'test.yml')]
+            argument += ['-a', '{"key1":"value"}']
+            argument += ['-t', os.path.join(self.test_dir, 'test.j2')]
+            argument += ['-t', os.path.join(self.test_dir, 'test2.j2') + ',' + self.output2_file]
+            # Second round is served with the cached jinja2 environment
+            for _ in range(2):
+                output = subprocess.check_output(self.script_file + argument, env=env).decode()
+                self.assertEqual(output.strip(), 'value1\nvalue2')
+                with open(self.output2_file) as tf:
+                    self.assertEqual(tf.read().strip(), 'value')
+            with self.assertRaises(subprocess.CalledProcessError):
+                subprocess.check_output(self.script_file + ['--unknown'], env=env, stderr=subprocess.STDOUT)
+            # A request failing after it wrote its output is not rendered again in-process
+            os.remove(self.output2_file)
+            with self.assertRaises(subprocess.CalledProcessError) as cm:
+                subprocess.check_output(self.script_file + argument + ['-t', os.path.join(self.test_dir, 'missing.j2')],
+                                        env=env, stderr=subprocess.STDOUT)
+            self.assertIn('in handle', cm.exception.output.decode())
+            self.assertTrue(os.path.exists(self.output2_file))
+        finally:
+            server.terminate()
+            server.wait()
+            if os.path.exists(env['SONIC_CFGGEN_SOCKET']):
+                os.remove(env['SONIC_CFGGEN_SOCKET'])
+
     # FIXME: This test depends heavily on the ordering of the interfaces and
     # it is not at all intuitive what that ordering should be. Could make it
     # more robust by adding better parsing logic.
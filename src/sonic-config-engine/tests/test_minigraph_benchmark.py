@@ -0,0 +1,47 @@
+import tempfile
+
+import minigraph
+
+from unittest import TestCase
+
+from tests import minigraph_benchmark
+
+
+class TestMinigraphBenchmark(TestCase):
+
+    def get_args(self, *argv):
+        args = minigraph_benchmark.get_parser().parse_args(list(argv))
+        args.template = []
+        return args
+
+    def parse(self, args, asic_name=None):
+        with tempfile.NamedTemporaryFile('w', suffix='.xml') as graph, \
+             tempfile.NamedTemporaryFile('w', suffix='.ini') as port_config:
+            graph.write(minigraph_benchmark.generate_minigraph(args))
+            graph.flush()
+            port_config.write(minigraph_benchmark.generate_port_config(args, args.asic_index))
+            port_config.flush()
+            return minigraph.parse_xml(graph.name, port_config_file=port_config.name, asic_name=asic_name)
+
+    def test_generated_topology(self):
+        args = self.get_args('--ports', '32', '--portchannels', '4', '--vlans', '2', '--bgp-sessions', '8', '--acls', '2')
+        results = self.parse(args)
+        self.assertEqual(len(results['PORT']), 32)
+        self.assertEqual(len(results['PORTCHANNEL']), 4)
+        self.assertEqual(len(results['VLAN']), 2)
+        self.assertEqual(len(results['BGP_NEIGHBOR']), 8)
+        self.assertIn('DATAACL1', results['ACL_TABLE'])
+
+    def test_generated_multi_asic_topology(self):
+        args = self.get_args('--asics', '2', '--ports', '32', '--portchannels', '4', '--bgp-sessions', '4', '--asic-index', '1')
+        results = self.parse(args, asic_name='asic1')
+        self.assertEqual(len(results['PORT']), 16)
+        self.assertEqual(len(results['PORTCHANNEL']), 2)
+        self.assertEqual(results['DEVICE_METADATA']['localhost']['sub_role'], 'FrontEnd')
+
+    def test_report(self):
+        report = minigraph_benchmark.run(self.get_args('--ports', '16', '--iterations', '1'))
+        for stage in ['xml_parse', 'parse_dpg', 'parse_cpg', 'parse_png', 'parse_meta', 'parse_linkmeta', 'parse_deviceinfo']:
+            self.assertIn(stage, report['stages'])
+        self.assertEqual(len(report['parse_xml']['runs']), 1)
+        self.assertGreater(report['peak_rss_kb'], 0)
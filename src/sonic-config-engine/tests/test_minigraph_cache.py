@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+
+import minigraph
+
+from unittest import TestCase, mock
+
+
+class TestMinigraphCache(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.sample_graph = os.path.join(self.test_dir, 'simple-sample-graph-case.xml')
+        self.port_config = os.path.join(self.test_dir, 't0-sample-port-config.ini')
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_xml_root_reused(self):
+        root = minigraph.get_xml_root(self.sample_graph)
+        self.assertIs(minigraph.get_xml_root(self.sample_graph), root)
+
+    def test_parse_xml_cached(self):
+        expected = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config)
+
+        results = minigraph.parse_xml_cached(self.sample_graph, port_config_file=self.port_config, cache_dir=self.cache_dir)
+        self.assertEqual(results, expected)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # Served from the cache
+        results = minigraph.parse_xml_cached(self.sample_graph, port_config_file=self.port_config, cache_dir=self.cache_dir)
+        self.assertEqual(results, expected)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # Different arguments are cached separately
+        minigraph.parse_xml_cached(self.sample_graph, port_config_file=self.port_config, asic_name=None,
+                                   hwsku_config_file=self.port_config, cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_parse_xml_cached_corrupted_entry(self):
+        expected = minigraph.parse_xml_cached(self.sample_graph, port_config_file=self.port_config, cache_dir=self.cache_dir)
+        for filename in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, filename), 'wb') as f:
+                f.write(b'garbage')
+        results = minigraph.parse_xml_cached(self.sample_graph, port_config_file=self.port_config, cache_dir=self.cache_dir)
+        self.assertEqual(results, expected)
+
+    def test_parse_xml_cached_insecure_entry(self):
+        expected = minigraph.parse_xml_cached(self.sample_graph, port_config_file=self.port_config, cache_dir=self.cache_dir)
+        # Cache entry writable by others is not loaded
+        for filename in os.listdir(self.cache_dir):
+            os.chmod(os.path.join(self.cache_dir, filename), 0o666)
+        with mock.patch('minigraph.pickle.load') as mock_load:
+            results = minigraph.parse_xml_cached(self.sample_graph, port_config_file=self.port_config, cache_dir=self.cache_dir)
+            mock_load.assert_not_called()
+        self.assertEqual(results, expected)
+
+    def test_parse_cache_key_computed_once(self):
+        with mock.patch('minigraph.db_connect_configdb', return_value=None) as mock_connect:
+            key = minigraph._get_parse_cache_key(self.sample_graph, None, None, 'asic-key-test', None, None)
+            self.assertEqual(minigraph._get_parse_cache_key(self.sample_graph, None, None, 'asic-key-test', None, None), key)
+            mock_connect.assert_called_once_with('asic-key-test')
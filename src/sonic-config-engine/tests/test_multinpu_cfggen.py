@@ -3,6 +3,7 @@ import json
 import os
 import shutil
 import subprocess
+import time
 import unittest
 import yaml
 import tests.common_utils as utils
@@ -129,6 +130,33 @@ class TestMultiNpuCfgGen(TestCase):
             output = self.run_script_for_asic(argument, asic, self.port_config[asic])
             self.assertEqual(output.strip(), 'value1\nvalue2')
 
+    def test_render_server_namespaces(self):
+        if not utils.PY3x:
+            return
+        argument = ['-m', self.sample_graph, '--print-data']
+        expected = [self.run_script(argument + ['-p', self.port_config[asic], '-n', 'asic{}'.format(asic)], validateYang=False)
+                    for asic in range(2)]
+        env = dict(os.environ, SONIC_CFGGEN_SOCKET=os.path.join(self.test_dir, 'render-multi-npu.sock'))
+        server = subprocess.Popen(self.script_file + ['--server'], env=env)
+        try:
+            for _ in range(100):
+                if os.path.exists(env['SONIC_CFGGEN_SOCKET']):
+                    break
+                time.sleep(0.1)
+            self.assertTrue(os.path.exists(env['SONIC_CFGGEN_SOCKET']))
+            # The server renders the namespaces back to back, the ports of one
+            # asic must not leak into the next one
+            for asic in [0, 1, 0]:
+                output = subprocess.check_output(self.script_file + argument + ['-p', self.port_config[asic], '-n', 'asic{}'.format(asic)],
+                                                 env=env, stderr=subprocess.STDOUT).decode()
+                self.assertNotIn('Warning: ignore interface', output)
+                self.assertEqual(output, expected[asic])
+        finally:
+            server.terminate()
+            server.wait()
+            if os.path.exists(env['SONIC_CFGGEN_SOCKET']):
+                os.remove(env['SONIC_CFGGEN_SOCKET'])
+
     def test_metadata_tacacs(self):
         argument = ['-m', self.sample_graph, '-p', self.sample_port_config, '--var-json', "TACPLUS_SERVER"]
         output = json.loads(self.run_script(argument))
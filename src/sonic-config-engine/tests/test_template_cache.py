@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import time
+
+import jinja2
+
+from unittest import TestCase
+
+from template_cache import SonicBytecodeCache, prewarm_templates
+
+
+class TestTemplateCache(TestCase):
+
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.prebuilt_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.template_dir, 'sub'))
+        self.write_template('test.j2', '{% include "sub/inc.j2" %}-{{ key1 }}')
+        self.write_template(os.path.join('sub', 'inc.j2'), '{{ key2 }}')
+        self.write_template('broken.j2', '{% if %}')
+
+    def tearDown(self):
+        for directory in [self.template_dir, self.cache_dir, self.prebuilt_dir]:
+            shutil.rmtree(directory)
+
+    def write_template(self, name, content):
+        with open(os.path.join(self.template_dir, name), 'w') as f:
+            f.write(content)
+
+    def get_env(self, version='test-1', directory=None, prebuilt_directory=None, paths=None):
+        cache = SonicBytecodeCache(version, directory=directory or self.cache_dir,
+                                   prebuilt_directory=prebuilt_directory or self.prebuilt_dir)
+        return jinja2.Environment(loader=jinja2.FileSystemLoader(paths or [self.template_dir]), bytecode_cache=cache)
+
+    def render(self, env):
+        return env.get_template('test.j2').render({'key1': 'value1', 'key2': 'value2'})
+
+    def test_hit_and_miss(self):
+        env = self.get_env()
+        self.assertEqual(self.render(env), 'value2-value1')
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 0, 'misses': 2})
+
+        env = self.get_env()
+        self.assertEqual(self.render(env), 'value2-value1')
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 2, 'misses': 0})
+
+        # A different environment version never reuses the compiled code
+        env = self.get_env(version='test-2')
+        self.render(env)
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 0, 'misses': 2})
+
+    def test_invalidation_on_change(self):
+        self.render(self.get_env())
+        path = os.path.join(self.template_dir, 'test.j2')
+        self.write_template('test.j2', '{{ key1 }}')
+        mtime = time.time() + 10
+        os.utime(path, (mtime, mtime))
+
+        env = self.get_env()
+        self.assertEqual(self.render(env), 'value1')
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 0, 'misses': 1})
+
+    def test_corrupted_cache_file(self):
+        self.render(self.get_env())
+        for filename in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, filename), 'wb') as f:
+                f.write(b'garbage')
+
+        env = self.get_env()
+        self.assertEqual(self.render(env), 'value2-value1')
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 0, 'misses': 2})
+
+    def test_prewarm(self):
+        env = self.get_env(directory=self.prebuilt_dir)
+        failed = prewarm_templates(env, self.template_dir)
+        self.assertEqual([name for name, _ in failed], ['broken.j2'])
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 0, 'misses': 3})
+
+        # Runtime cache is empty, the prebuilt cache serves the templates
+        env = self.get_env()
+        self.assertEqual(self.render(env), 'value2-value1')
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 2, 'misses': 0})
+
+    def test_prewarm_by_basename(self):
+        # sonic-cfggen -t <template_dir>/sub/inc.j2 looks the template up by its base name
+        sub_dir = os.path.join(self.template_dir, 'sub')
+        paths = [self.template_dir, sub_dir]
+        prewarm_templates(self.get_env(directory=self.prebuilt_dir), self.template_dir)
+        env = self.get_env(paths=paths)
+        env.get_template('inc.j2')
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 0, 'misses': 1})
+
+        get_env = lambda directory: self.get_env(directory=self.prebuilt_dir, paths=[self.template_dir, directory])
+        failed = prewarm_templates(self.get_env(directory=self.prebuilt_dir), self.template_dir, get_env)
+        self.assertEqual([name for name, _ in failed], ['broken.j2'])
+        # Drop the runtime cache written by the miss above
+        self.get_env().bytecode_cache.clear()
+        env = self.get_env(paths=paths)
+        self.assertEqual(env.get_template('inc.j2').render({'key2': 'value2'}), 'value2')
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 1, 'misses': 0})
+
+    def test_clear(self):
+        env = self.get_env()
+        self.render(env)
+        self.assertTrue(os.listdir(self.cache_dir))
+        env.bytecode_cache.clear()
+        self.assertFalse(os.listdir(self.cache_dir))
+
+    def test_insecure_cache(self):
+        self.render(self.get_env())
+        # Cache file writable by others is not loaded
+        for filename in os.listdir(self.cache_dir):
+            os.chmod(os.path.join(self.cache_dir, filename), 0o666)
+        env = self.get_env()
+        self.render(env)
+        self.assertEqual(env.bytecode_cache.get_stats(), {'hits': 0, 'misses': 2})
+
+        # Cache directory writable by others is neither loaded from nor written to
+        insecure_dir = os.path.join(self.cache_dir, 'insecure')
+        os.mkdir(insecure_dir)
+        os.chmod(insecure_dir, 0o777)
+        env = self.get_env(directory=insecure_dir)
+        self.render(env)
+        self.assertFalse(os.listdir(insecure_dir))
+
+        # Cache directory is created accessible by the owner only
+        new_dir = os.path.join(self.cache_dir, 'new')
+        self.render(self.get_env(directory=new_dir))
+        self.assertEqual(os.stat(new_dir).st_mode & 0o777, 0o700)
+        self.assertTrue(os.listdir(new_dir))
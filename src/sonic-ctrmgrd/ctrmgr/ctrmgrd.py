@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
 import datetime
+import heapq
 import inspect
+import itertools
 import json
 import os
 import sys
@@ -178,15 +180,27 @@ class MainServer:
         Call handler on update
     """
 
-    SELECT_TIMEOUT = 1000
+    SELECT_TIMEOUT = 1000           # milliseconds
+    LOOP_LATENCY_LOG_MS = 1000      # log loop iterations taking longer
 
     def __init__(self):
         """ Constructor """
         self.db_connectors = {}
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
-        self.timer_handlers = defaultdict(list)
+        self.timers = []    # heap of (ts, seq, handler, args)
+        self.timer_seq = itertools.count()  # keeps registration order for same ts
         self.subscribers = set()
+        self.counters = {
+                "loops": 0,
+                "messages": 0,
+                "timers": 0,
+                "loop_latency_ms": 0,
+                "max_loop_latency_ms": 0,
+                "backlog": 0,
+                "max_backlog": 0,
+                "max_timer_lag_ms": 0
+                }
 
     def register_db(self, db_name):
         """ Get DB connector, if not there """
@@ -198,7 +212,7 @@ class MainServer:
         """ Register timer based handler.
             The handler will be called on/after give timestamp, ts
         """
-        self.timer_handlers[ts].append((handler, args))
+        heapq.heappush(self.timers, (ts, next(self.timer_seq), handler, args))
 
 
     def register_handler(self, db_name, table_name, handler):
@@ -246,24 +260,78 @@ class MainServer:
         tbl.set(key, list(data.items()))
 
 
+    def get_counters(self):
+        """ Return counters of the main loop """
+        return dict(self.counters)
+
+
+    def run_timers(self):
+        """ Call handlers of expired timers.
+            Return select timeout in milliseconds until the next timer
+        """
+        ct_ts = datetime.datetime.now()
+        while self.timers and self.timers[0][0] <= ct_ts:
+            ts, _, handler, args = heapq.heappop(self.timers)
+            lag_ms = int((ct_ts - ts).total_seconds() * 1000)
+            self.counters["timers"] += 1
+            self.counters["max_timer_lag_ms"] = max(
+                    self.counters["max_timer_lag_ms"], lag_ms)
+            if args is None:
+                handler()
+            else:
+                handler(*args)
+
+        if not self.timers:
+            return MainServer.SELECT_TIMEOUT
+        remaining = self.timers[0][0] - datetime.datetime.now()
+        # Round up, so the timer has expired on wakeup
+        timeout = -(-remaining // datetime.timedelta(milliseconds=1))
+        return min(max(timeout, 0), MainServer.SELECT_TIMEOUT)
+
+
+    def drain_subscribers(self):
+        """ Pop all pending messages of all subscribers and call
+            the handlers. Return count of messages
+        """
+        count = 0
+        for subscriber in self.subscribers:
+            while True:
+                key, op, fvs = subscriber.pop()
+                if not key:
+                    break
+                count += 1
+                if subscriber.getTableName() == FEATURE_TABLE and key in DISABLED_FEATURE_SET:
+                    continue
+                log_debug("Received message : '%s'" % str((key, op, fvs)))
+                for callback in (self.callbacks
+                        [subscriber.getDbConnector().getDbName()]
+                        [subscriber.getTableName()]):
+                    callback(key, op, dict(fvs))
+        return count
+
+
+    def update_counters(self, start, backlog):
+        """ Update counters with an iteration which processed
+            backlog messages, started at start
+        """
+        latency_ms = int((datetime.datetime.now() - start).total_seconds() * 1000)
+        self.counters["loops"] += 1
+        self.counters["messages"] += backlog
+        self.counters["loop_latency_ms"] = latency_ms
+        self.counters["max_loop_latency_ms"] = max(
+                self.counters["max_loop_latency_ms"], latency_ms)
+        self.counters["backlog"] = backlog
+        self.counters["max_backlog"] = max(
+                self.counters["max_backlog"], backlog)
+        if latency_ms > MainServer.LOOP_LATENCY_LOG_MS:
+            log_info("Loop took {} ms for {} messages".format(
+                latency_ms, backlog))
+
+
     def run(self):
         """ Main loop """
         while True:
-            timeout = MainServer.SELECT_TIMEOUT
-            ct_ts = datetime.datetime.now()
-            while self.timer_handlers:
-                k = sorted(self.timer_handlers.keys())[0]
-                if k <= ct_ts:
-                    lst = self.timer_handlers[k]
-                    del self.timer_handlers[k]
-                    for fn in lst:
-                        if fn[1] is None:
-                            fn[0]()
-                        else:
-                            fn[0](*fn[1])
-                else:
-                    timeout = (k - ct_ts).seconds
-                    break
+            timeout = self.run_timers()
 
             state, _ = self.selector.select(timeout)
             if state == self.selector.TIMEOUT:
@@ -275,17 +343,9 @@ class MainServer:
                     log_debug("Skipped Exception; Received error from select")
                     return
 
-            for subscriber in self.subscribers:
-                key, op, fvs = subscriber.pop()
-                if not key:
-                    continue
-                if subscriber.getTableName() == FEATURE_TABLE and key in DISABLED_FEATURE_SET:
-                    continue
-                log_debug("Received message : '%s'" % str((key, op, fvs)))
-                for callback in (self.callbacks
-                        [subscriber.getDbConnector().getDbName()]
-                        [subscriber.getTableName()]):
-                    callback(key, op, dict(fvs))
+            start = datetime.datetime.now()
+            backlog = self.drain_subscribers()
+            self.update_counters(start, backlog)
 
 
 
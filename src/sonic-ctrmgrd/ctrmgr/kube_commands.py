@@ -16,6 +16,7 @@ import urllib.request
 import base64
 from urllib.parse import urlparse
 
+import docker
 import yaml
 import requests
 from sonic_py_common import device_info
@@ -32,6 +33,9 @@ K8S_CA_URL = "https://{}:{}/api/v1/namespaces/default/configmaps/kube-root-ca.cr
 AME_CRT = "/etc/sonic/credentials/restapiserver.crt"
 AME_KEY = "/etc/sonic/credentials/restapiserver.key"
 
+# Docker engine client, kept across calls to reuse the connection
+docker_client = None
+
 def log_debug(m):
     msg = "{}: {}".format(inspect.stack()[1][3], m)
     print(msg)
@@ -84,18 +88,18 @@ def _run_command(cmd, timeout=5):
 
 def kube_read_labels():
     """ Read current labels on node and return as dict. """
-    KUBECTL_GET_CMD = "kubectl --kubeconfig {} get nodes {} --show-labels --no-headers |tr -s ' ' | cut -f6 -d' '"
+    KUBECTL_GET_CMD = "kubectl --kubeconfig {} get nodes {} -o jsonpath='{{.metadata.labels}}'"
 
     labels = {}
     ret, out, _ = _run_command(KUBECTL_GET_CMD.format(
         KUBE_ADMIN_CONF, get_device_name()))
 
     if ret == 0:
-        lst = out.split(",")
-
-        for label in lst:
-            tmp = label.split("=")
-            labels[tmp[0]] = tmp[1]
+        try:
+            labels = {to_str(k): to_str(v) for (k, v) in json.loads(out).items()}
+        except (ValueError, AttributeError) as e:
+            log_error("Failed to parse node labels '{}': {}".format(out, str(e)))
+            ret = -1
 
     # log_debug("{} kube labels {} ret={}".format(
         # "Applied" if ret == 0 else "Failed to apply",
@@ -106,6 +110,7 @@ def kube_read_labels():
 
 def kube_write_labels(set_labels):
     """ Set given set_labels.
+        All changed labels are written by one command.
     """
     KUBECTL_SET_CMD = "kubectl --kubeconfig {} label --overwrite nodes {} {}"
 
@@ -115,28 +120,14 @@ def kube_write_labels(set_labels):
                 format(str(set_labels)))
         return ret
 
-    del_label_str = ""
     add_label_str = ""
     for (name, val) in set_labels.items():
-        skip = False
-        if name in node_labels:
-            if val != node_labels[name]:
-                # label value can't be modified. Remove it first
-                # and then add
-                del_label_str += "{}- ".format(name)
-            else:
-                # Already exists with same value.
-                skip = True
-        if not skip:
-            # Add label
+        if node_labels.get(name) != val:
+            # Add label; --overwrite modifies an existing value
             add_label_str += "{}={} ".format(name, val)
 
 
     if add_label_str:
-        # First remove if any
-        if del_label_str:
-            (ret, _, _) = _run_command(KUBECTL_SET_CMD.format(
-            KUBE_ADMIN_CONF, get_device_name(), del_label_str.strip()))
         (ret, _, _) = _run_command(KUBECTL_SET_CMD.format(
             KUBE_ADMIN_CONF, get_device_name(), add_label_str.strip()))
 
@@ -412,34 +403,67 @@ def kube_reset_master(force):
 
     return (ret, err)
 
+def _get_docker_client():
+    """ Return docker engine client, connect if needed """
+    global docker_client
+
+    if docker_client is None:
+        docker_client = docker.from_env()
+    return docker_client
+
+
+def _docker_error(msg, e):
+    """ Return error message for the exception raised by docker client.
+        Drop the client on connection failure to reconnect on next call.
+    """
+    global docker_client
+
+    if not isinstance(e, docker.errors.APIError):
+        docker_client = None
+    return "{}. Err: {}".format(msg, str(e))
+
+
+def _split_tag(tag):
+    """ Split image tag into repo & version """
+    repo, _, version = tag.rpartition(":")
+    if "/" in version:
+        # No version; the colon is the registry port
+        return (tag, "")
+    return (repo, version)
+
+
 def _do_tag(docker_id, image_ver):
     err = ""
     out = ""
     ret = 1
-    status, _, err = _run_command("docker ps |grep {}".format(docker_id))
-    if status == 0:
-        _, image_item, err = _run_command("docker inspect {} |jq -r .[].Image".format(docker_id))
-        if image_item:
-            image_id = image_item.split(":")[1][:12]
-            _, image_info, err = _run_command("docker images |grep {}".format(image_id))
-            if image_info:
-                # Only need the docker repo name without acr domain
-                image_rep = image_info.split()[0].split("/")[-1]
-                tag_res, _, err = _run_command("docker tag {} {}:latest".format(image_id, image_rep))
-                if tag_res == 0:
-                    out = "docker tag {} {}:latest successfully".format(image_id, image_rep)
-                    ret = 0
-                else:
-                    err = "Failed to tag {}:{} to latest. Err: {}".format(image_rep, image_ver, err)
+    try:
+        client = _get_docker_client()
+        container = client.containers.get(docker_id)
+    except docker.errors.NotFound:
+        container = None
+    except Exception as e:
+        err = _docker_error("Error happens when get container {}".format(docker_id), e)
+        return (ret, out, err)
+
+    if container is None or container.status != "running":
+        out = "New version {} is not running.".format(image_ver)
+        return (-1, out, err)
+
+    try:
+        image = client.images.get(container.attrs["Image"])
+        image_id = image.id.split(":")[-1][:12]
+        if image.tags:
+            # Only need the docker repo name without acr domain
+            image_rep = _split_tag(image.tags[0])[0].split("/")[-1]
+            if image.tag(image_rep, "latest"):
+                out = "docker tag {} {}:latest successfully".format(image_id, image_rep)
+                ret = 0
             else:
-                err = "Failed to docker images |grep {} to get image repo. Err: {}".format(image_id, err)
+                err = "Failed to tag {}:{} to latest".format(image_rep, image_ver)
         else:
-            err = "Failed to inspect container:{} to get image id. Err: {}".format(docker_id, err)
-    elif err:
-        err = "Error happens when execute docker ps |grep {}. Err: {}".format(docker_id, err)
-    else:
-        out = "New version {} is not running.".format(image_ver)
-        ret = -1
+            err = "Failed to get image repo of {}".format(image_id)
+    except Exception as e:
+        err = _docker_error("Failed to tag image of container:{} to latest".format(docker_id), e)
 
     return (ret, out, err)
 
@@ -447,23 +471,18 @@ def _remove_container(feat):
     err = ""
     out = ""
     ret = 0
-    _, feat_status, err = _run_command("docker inspect {} |jq -r .[].State.Running".format(feat))
-    if feat_status:
-        if feat_status == 'true':
+    try:
+        container = _get_docker_client().containers.get(feat)
+        if container.attrs["State"]["Running"]:
             err = "Feature {} container is running, it's unexpected".format(feat)
             ret = 1
         else:
-            rm_res, _, err = _run_command("docker rm {}".format(feat))
-            if rm_res == 0:
-                out = "Remove origin local {} container successfully".format(feat)
-            else:
-                err = "Failed to docker rm {}. Err: {}".format(feat, err)
-                ret = 1
-    elif err.startswith("Error: No such object"):
+            container.remove()
+            out = "Remove origin local {} container successfully".format(feat)
+    except docker.errors.NotFound:
         out = "Origin local {} container has been removed before".format(feat)
-        err = ""
-    else:
-        err = "Failed to docker inspect {} |jq -r .[].State.Running. Err: {}".format(feat, err)
+    except Exception as e:
+        err = _docker_error("Failed to remove container {}".format(feat), e)
         ret = 1
 
     return (ret, out, err)
@@ -489,24 +508,36 @@ def _do_clean(feat, current_version, last_version):
     ret = 0
     IMAGE_ID = "image_id"
     REPO = "repo"
-    _, image_info, err = _run_command("docker images |grep {} |grep -v latest |awk '{{print $1,$2,$3}}'".format(feat))
-    if image_info:
-        remote_image_version_dict = {}
-        local_image_version_dict = {}
-        for info in image_info.split("\n"):
-            rep, version, image_id = info.split()
-            if len(rep.split("/")) == 1:
-                local_image_version_dict[version] = {IMAGE_ID: image_id, REPO: rep}
-            else:
-                remote_image_version_dict[version] = {IMAGE_ID: image_id, REPO: rep}
+    remote_image_version_dict = {}
+    local_image_version_dict = {}
+    try:
+        client = _get_docker_client()
+        for image in client.images.list():
+            image_id = image.id.split(":")[-1][:12]
+            for tag in image.tags:
+                rep, version = _split_tag(tag)
+                if feat not in rep or "latest" in tag:
+                    continue
+                if len(rep.split("/")) == 1:
+                    local_image_version_dict[version] = {IMAGE_ID: image_id, REPO: rep}
+                else:
+                    remote_image_version_dict[version] = {IMAGE_ID: image_id, REPO: rep}
+    except Exception as e:
+        err = _docker_error("Failed to list {} images".format(feat), e)
+        return 1, out, err
 
-        if current_version in remote_image_version_dict:
-            image_prefix = remote_image_version_dict[current_version][REPO]
-            del remote_image_version_dict[current_version]
-        else:
-            out = "Current version {} doesn't exist.".format(current_version)
-            ret = 0
-            return ret, out, err
+    if not (remote_image_version_dict or local_image_version_dict):
+        err = "Failed to find {} images".format(feat)
+        return 1, out, err
+
+    if current_version in remote_image_version_dict:
+        image_prefix = remote_image_version_dict[current_version][REPO]
+        del remote_image_version_dict[current_version]
+    else:
+        out = "Current version {} doesn't exist.".format(current_version)
+        return ret, out, err
+
+    try:
         # should be only one item in local_image_version_dict
         for k, v in local_image_version_dict.items():
             local_version, local_repo, local_image_id = k, v[REPO], v[IMAGE_ID]
@@ -514,34 +545,25 @@ def _do_clean(feat, current_version, last_version):
             # and tag the local version to kube version for fallback preparation
             # and remove the local version
             if local_version in remote_image_version_dict:
-                tag_res, _, err = _run_command("docker rmi {}:{} && docker tag {} {}:{} && docker rmi {}:{}".format(
-                image_prefix, local_version, local_image_id, image_prefix, local_version, local_repo, local_version))
+                client.images.remove("{}:{}".format(image_prefix, local_version))
+                client.images.get(local_image_id).tag(image_prefix, local_version)
             # if there is no kube image with same version, just remove the local version
-            else:
-                tag_res, _, err = _run_command("docker rmi {}:{}".format(local_repo, local_version))
-            if tag_res == 0:
-                msg = "Tag {} local version images successfully".format(feat)
-                log_debug(msg)
-            else:
-                ret = 1
-                err = "Failed to tag {} local version images. Err: {}".format(feat, err)
+            client.images.remove("{}:{}".format(local_repo, local_version))
+            log_debug("Tag {} local version images successfully".format(feat))
             return ret, out, err
+    except Exception as e:
+        err = _docker_error("Failed to tag {} local version images".format(feat), e)
+        return 1, out, err
 
-        if last_version in remote_image_version_dict:
-            del remote_image_version_dict[last_version]
+    if last_version in remote_image_version_dict:
+        del remote_image_version_dict[last_version]
 
-        image_id_remove_list = [item[IMAGE_ID] for item in remote_image_version_dict.values()]
-        if image_id_remove_list:
-            clean_res, _, err = _run_command("docker rmi {} --force".format(" ".join(image_id_remove_list)))
-        else:
-            clean_res = 0
-        if clean_res == 0:
-            out = "Clean {} old version images successfully".format(feat)
-        else:
-            err = "Failed to clean {} old version images. Err: {}".format(feat, err)
-            ret = 1
-    else:
-        err = "Failed to docker images |grep {} |awk '{{print $3}}'. Error: {}".format(feat, err)
+    try:
+        for image_id in sorted({item[IMAGE_ID] for item in remote_image_version_dict.values()}):
+            client.images.remove(image_id, force=True)
+        out = "Clean {} old version images successfully".format(feat)
+    except Exception as e:
+        err = _docker_error("Failed to clean {} old version images".format(feat), e)
         ret = 1
 
     return ret, out, err
@@ -1,11 +1,16 @@
+import datetime
 import os
 import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sonic_py_common.general import load_module_from_source
 
 from . import common_test
 
+load_module_from_source("docker",
+        os.path.join(os.path.dirname(os.path.realpath(__file__)), "mock_docker.py"))
+
 sys.path.append("ctrmgr")
 import ctrmgrd
 import ctrmgr.ctrmgr_iptables
@@ -577,3 +582,38 @@ class TestContainerStartup(object):
             ret = common_test.check_kube_actions()
             assert ret == 0
         self.clear()
+
+
+    @patch("ctrmgrd.swsscommon.DBConnector")
+    @patch("ctrmgrd.swsscommon.Select")
+    @patch("ctrmgrd.swsscommon.SubscriberStateTable")
+    def test_main_server(self, mock_subs, mock_select, mock_conn):
+        server = ctrmgrd.MainServer()
+        calls = []
+        now = datetime.datetime.now()
+
+        # Expired timers are called in timestamp order, then in registration order
+        server.register_timer(now - datetime.timedelta(seconds=1), calls.append, ("b",))
+        server.register_timer(now - datetime.timedelta(seconds=2), calls.append, ("a",))
+        server.register_timer(now - datetime.timedelta(seconds=1), calls.append, ("c",))
+        server.register_timer(now + datetime.timedelta(milliseconds=500), calls.append, ("d",))
+        timeout = server.run_timers()
+        assert calls == ["a", "b", "c"]
+        assert 0 < timeout <= 500
+        assert server.get_counters()["timers"] == 3
+        assert server.get_counters()["max_timer_lag_ms"] >= 2000
+
+        # Pending messages of a subscriber are drained at once
+        subscriber = MagicMock()
+        subscriber.pop.side_effect = [("Ethernet0", "SET", ()), ("Ethernet4", "SET", ()), ("", "", ())]
+        subscriber.getTableName.return_value = "PORT"
+        subscriber.getDbConnector.return_value.getDbName.return_value = ctrmgrd.CONFIG_DB_NAME
+        server.subscribers.add(subscriber)
+        server.callbacks[ctrmgrd.CONFIG_DB_NAME]["PORT"].append(lambda key, op, data: calls.append(key))
+        start = datetime.datetime.now()
+        backlog = server.drain_subscribers()
+        server.update_counters(start, backlog)
+        assert calls[3:] == ["Ethernet0", "Ethernet4"]
+        assert server.get_counters()["backlog"] == 2
+        assert server.get_counters()["max_backlog"] == 2
+        assert server.get_counters()["messages"] == 2
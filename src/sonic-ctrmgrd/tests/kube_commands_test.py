@@ -5,9 +5,13 @@ import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sonic_py_common.general import load_module_from_source
 
 from . import common_test
 
+load_module_from_source("docker",
+        os.path.join(os.path.dirname(os.path.realpath(__file__)), "mock_docker.py"))
+
 sys.path.append("ctrmgr")
 import kube_commands
 
@@ -27,8 +31,8 @@ read_labels_test_data = {
         common_test.DESCR: "read labels",
         common_test.RETVAL: 0,
         common_test.PROC_CMD: ["\
-kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | cut -f6 -d' '".format(KUBE_ADMIN_CONF)],
-        common_test.PROC_OUT: ["foo=bar,hello=world"],
+kubectl --kubeconfig {} get nodes none -o jsonpath='{{.metadata.labels}}'".format(KUBE_ADMIN_CONF)],
+        common_test.PROC_OUT: ['{"foo":"bar","hello":"world"}'],
         common_test.POST: {
             "foo": "bar",
             "hello": "world"
@@ -40,7 +44,7 @@ kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | c
         common_test.TRIGGER_THROW: True,
         common_test.RETVAL: -1,
         common_test.PROC_CMD: ["\
-kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | cut -f6 -d' '".format(KUBE_ADMIN_CONF)],
+kubectl --kubeconfig {} get nodes none -o jsonpath='{{.metadata.labels}}'".format(KUBE_ADMIN_CONF)],
         common_test.POST: {
         },
         common_test.PROC_KILLED: 1
@@ -49,7 +53,7 @@ kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | c
         common_test.DESCR: "read labels fail",
         common_test.RETVAL: -1,
         common_test.PROC_CMD: ["\
-kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | cut -f6 -d' '".format(KUBE_ADMIN_CONF)],
+kubectl --kubeconfig {} get nodes none -o jsonpath='{{.metadata.labels}}'".format(KUBE_ADMIN_CONF)],
         common_test.PROC_OUT: [""],
         common_test.PROC_ERR: ["command failed"],
         common_test.POST: {
@@ -64,22 +68,20 @@ write_labels_test_data = {
         common_test.RETVAL: 0,
         common_test.ARGS: { "foo": "bar", "hello": "World!", "test": "ok" },
         common_test.PROC_CMD: [
-"kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | cut -f6 -d' '".format(KUBE_ADMIN_CONF),
-"kubectl --kubeconfig {} label --overwrite nodes none hello-".format(
-    KUBE_ADMIN_CONF),
+"kubectl --kubeconfig {} get nodes none -o jsonpath='{{.metadata.labels}}'".format(KUBE_ADMIN_CONF),
 "kubectl --kubeconfig {} label --overwrite nodes none hello=World! test=ok".format(
     KUBE_ADMIN_CONF)
  ],
-        common_test.PROC_OUT: ["foo=bar,hello=world", "", ""]
+        common_test.PROC_OUT: ['{"foo":"bar","hello":"world"}', ""]
     },
     1: {
         common_test.DESCR: "write labels: skip as no change",
         common_test.RETVAL: 0,
         common_test.ARGS: { "foo": "bar", "hello": "world" },
         common_test.PROC_CMD: [
-"kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | cut -f6 -d' '".format(KUBE_ADMIN_CONF)
+"kubectl --kubeconfig {} get nodes none -o jsonpath='{{.metadata.labels}}'".format(KUBE_ADMIN_CONF)
  ],
-        common_test.PROC_OUT: ["foo=bar,hello=world"]
+        common_test.PROC_OUT: ['{"foo":"bar","hello":"world"}']
     },
     2: {
         common_test.DESCR: "write labels",
@@ -87,7 +89,7 @@ write_labels_test_data = {
         common_test.ARGS: { "any": "thing" },
         common_test.RETVAL: -1,
         common_test.PROC_CMD: [
-"kubectl --kubeconfig {} get nodes none --show-labels --no-headers |tr -s ' ' | cut -f6 -d' '".format(KUBE_ADMIN_CONF)
+"kubectl --kubeconfig {} get nodes none -o jsonpath='{{.metadata.labels}}'".format(KUBE_ADMIN_CONF)
 ],
         common_test.PROC_ERR: ["read failed"]
     }
@@ -213,98 +215,70 @@ none".format(KUBE_ADMIN_CONF),
     }
 }
 
+# Docker mock data: containers by id/name, images as (id, tags),
+# docker calls expected and docker calls which fail
+DOCKER_CONTAINERS = "docker_containers"
+DOCKER_IMAGES = "docker_images"
+DOCKER_CALLS = "docker_calls"
+DOCKER_FAIL = "docker_fail"
+
+IMAGE_SNMP = "sha256:5425bcbd23c54270d9de028c09634f8e9a014e9351387160c133ccf3a53ab3dc"
+TELEMETRY_REPO = "sonick8scue.azurecr.io/docker-sonic-telemetry"
+
 tag_latest_test_data = {
     0: {
         common_test.DESCR: "Tag latest successfuly and remove origin local container",
         common_test.RETVAL: 0,
         common_test.ARGS: ["snmp", "123456", "v1"],
-        common_test.PROC_CMD: [
-            "docker ps |grep 123456",
-            "docker inspect 123456 |jq -r .[].Image",
-            "docker images |grep 5425bcbd23c5",
-            "docker tag 5425bcbd23c5 snmp:latest",
-            "docker inspect snmp |jq -r .[].State.Running",
-            "docker rm snmp"
-        ],
-        common_test.PROC_OUT: [
-            "",
-            "sha256:5425bcbd23c54270d9de028c09634f8e9a014e9351387160c133ccf3a53ab3dc",
-            "acr.io/snmp v1 5425bcbd23c5",
-            "",
-            "false",
-            ""
+        DOCKER_CONTAINERS: {
+            "123456": {"status": "running", "image": IMAGE_SNMP},
+            "snmp": {"status": "exited", "image": ""}
+        },
+        DOCKER_IMAGES: [(IMAGE_SNMP, ["acr.io/snmp:v1"])],
+        DOCKER_CALLS: [
+            "tag 5425bcbd23c5 snmp:latest",
+            "rm snmp"
         ]
     },
     1: {
         common_test.DESCR: "Tag latest successfuly and origin local container has been removed before",
         common_test.RETVAL: 0,
         common_test.ARGS: ["snmp", "123456", "v1"],
-        common_test.PROC_CMD: [
-            "docker ps |grep 123456",
-            "docker inspect 123456 |jq -r .[].Image",
-            "docker images |grep 5425bcbd23c5",
-            "docker tag 5425bcbd23c5 snmp:latest",
-            "docker inspect snmp |jq -r .[].State.Running",
-            "docker rm snmp"
-        ],
-        common_test.PROC_OUT: [
-            "",
-            "sha256:5425bcbd23c54270d9de028c09634f8e9a014e9351387160c133ccf3a53ab3dc",
-            "acr.io/snmp v1 5425bcbd23c5",
-            "",
-            "",
-            ""
-        ],
-        common_test.PROC_ERR: [
-            "",
-            "",
-            "",
-            "",
-            "Error: No such object",
-            ""
+        DOCKER_CONTAINERS: {
+            "123456": {"status": "running", "image": IMAGE_SNMP}
+        },
+        DOCKER_IMAGES: [(IMAGE_SNMP, ["acr.io/snmp:v1"])],
+        DOCKER_CALLS: [
+            "tag 5425bcbd23c5 snmp:latest"
         ]
     },
     2: {
         common_test.DESCR: "Tag a unstable container",
         common_test.RETVAL: -1,
         common_test.ARGS: ["snmp", "123456", "v1"],
-        common_test.PROC_CMD: [
-            "docker ps |grep 123456"
-        ],
-        common_test.PROC_CODE: [
-            1
-        ]
+        DOCKER_CONTAINERS: {
+            "123456": {"status": "exited", "image": IMAGE_SNMP}
+        },
+        DOCKER_CALLS: []
     },
     3: {
         common_test.DESCR: "Docker error",
         common_test.RETVAL: 1,
         common_test.ARGS: ["snmp", "123456", "v1"],
-        common_test.PROC_CMD: [
-            "docker ps |grep 123456"
-        ],
-        common_test.PROC_ERR: [
-            "err"
-        ]
+        DOCKER_FAIL: ["get 123456"],
+        DOCKER_CALLS: []
     },
     4: {
         common_test.DESCR: "Find local container is still running",
         common_test.RETVAL: 1,
         common_test.ARGS: ["snmp", "123456", "v1"],
-        common_test.PROC_CMD: [
-            "docker ps |grep 123456",
-            "docker inspect 123456 |jq -r .[].Image",
-            "docker images |grep 5425bcbd23c5",
-            "docker tag 5425bcbd23c5 snmp:latest",
-            "docker inspect snmp |jq -r .[].State.Running",
-            "docker rm snmp"
-        ],
-        common_test.PROC_OUT: [
-            "",
-            "sha256:5425bcbd23c54270d9de028c09634f8e9a014e9351387160c133ccf3a53ab3dc",
-            "acr.io/snmp v1 5425bcbd23c5",
-            "",
-            "true",
-            ""
+        DOCKER_CONTAINERS: {
+            "123456": {"status": "running", "image": IMAGE_SNMP},
+            "snmp": {"status": "running", "image": ""}
+        },
+        DOCKER_IMAGES: [(IMAGE_SNMP, ["acr.io/snmp:v1"])],
+        DOCKER_CALLS: [
+            "tag 5425bcbd23c5 snmp:latest"
         ]
     }
 }
@@ -313,108 +287,141 @@ clean_image_test_data = {
     0: {
         common_test.DESCR: "Clean image successfuly(kube to kube)",
         common_test.RETVAL: 0,
-        common_test.ARGS: ["snmp", "20201231.84", "20201231.74"],
-        common_test.PROC_CMD: [
-            "docker images |grep snmp |grep -v latest |awk '{print $1,$2,$3}'",
-            "docker rmi 744d3a09062f --force"
-        ],
-        common_test.PROC_OUT: [
-            "sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.74 507f8d28bf6e\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.96 744d3a09062f\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.84 507f8d28bf6e",
-            ""
+        common_test.ARGS: ["telemetry", "20201231.84", "20201231.74"],
+        DOCKER_IMAGES: [
+            ("sha256:507f8d28bf6e", [TELEMETRY_REPO + ":20201231.74", TELEMETRY_REPO + ":20201231.84"]),
+            ("sha256:744d3a09062f", [TELEMETRY_REPO + ":20201231.96"]),
+            ("sha256:8f3b6e1a2c4d", ["docker-sonic-snmp:latest"])
         ],
-        common_test.PROC_CODE: [
-            0,
-            0
+        DOCKER_CALLS: [
+            "rmi 744d3a09062f --force"
         ]
     },
     1: {
         common_test.DESCR: "Clean image failed(delete image failed)",
         common_test.RETVAL: 1,
-        common_test.ARGS: ["snmp", "20201231.84", "20201231.74"],
-        common_test.PROC_CMD: [
-            "docker images |grep snmp |grep -v latest |awk '{print $1,$2,$3}'",
-            "docker rmi 744d3a09062f --force"
-        ],
-        common_test.PROC_OUT: [
-            "sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.74 507f8d28bf6e\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.96 744d3a09062f\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.84 507f8d28bf6e",
-            ""
+        common_test.ARGS: ["telemetry", "20201231.84", "20201231.74"],
+        DOCKER_IMAGES: [
+            ("sha256:507f8d28bf6e", [TELEMETRY_REPO + ":20201231.74", TELEMETRY_REPO + ":20201231.84"]),
+            ("sha256:744d3a09062f", [TELEMETRY_REPO + ":20201231.96"])
         ],
-        common_test.PROC_CODE: [
-            0,
-            1
-        ]
+        DOCKER_FAIL: ["rmi 744d3a09062f --force"],
+        DOCKER_CALLS: []
     },
     2: {
         common_test.DESCR: "Clean image failed(no image found)",
         common_test.RETVAL: 1,
-        common_test.ARGS: ["snmp", "20201231.84", "20201231.74"],
-        common_test.PROC_CMD: [
-            "docker images |grep snmp |grep -v latest |awk '{print $1,$2,$3}'"
-        ],
-        common_test.PROC_OUT: [
-            ""
-        ]
+        common_test.ARGS: ["telemetry", "20201231.84", "20201231.74"],
+        DOCKER_IMAGES: [],
+        DOCKER_CALLS: []
     },
     3: {
         common_test.DESCR: "Clean image failed(current image doesn't exist)",
         common_test.RETVAL: 0,
-        common_test.ARGS: ["snmp", "20201231.84", "20201231.74"],
-        common_test.PROC_CMD: [
-            "docker images |grep snmp |grep -v latest |awk '{print $1,$2,$3}'",
-            ""
-        ],
-        common_test.PROC_OUT: [
-            "sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.74 507f8d28bf6e\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.96 744d3a09062f",
-            ""
+        common_test.ARGS: ["telemetry", "20201231.84", "20201231.74"],
+        DOCKER_IMAGES: [
+            ("sha256:507f8d28bf6e", [TELEMETRY_REPO + ":20201231.74"]),
+            ("sha256:744d3a09062f", [TELEMETRY_REPO + ":20201231.96"])
         ],
-        common_test.PROC_CODE: [
-            0
-        ]
+        DOCKER_CALLS: []
     },
     4: {
         common_test.DESCR: "Clean image successfuly(local to kube)",
         common_test.RETVAL: 0,
-        common_test.ARGS: ["snmp", "20201231.84", ""],
-        common_test.PROC_CMD: [
-            "docker images |grep snmp |grep -v latest |awk '{print $1,$2,$3}'",
-            "docker rmi docker-sonic-telemetry:20201231.74"
+        common_test.ARGS: ["telemetry", "20201231.84", ""],
+        DOCKER_IMAGES: [
+            ("sha256:507f8d28bf6e", ["docker-sonic-telemetry:20201231.74", TELEMETRY_REPO + ":20201231.84"])
         ],
-        common_test.PROC_OUT: [
-            "docker-sonic-telemetry 20201231.74 507f8d28bf6e\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.84 507f8d28bf6e",
-            ""
-        ],
-        common_test.PROC_CODE: [
-            0,
-            0
+        DOCKER_CALLS: [
+            "rmi docker-sonic-telemetry:20201231.74"
         ]
     },
     5: {
         common_test.DESCR: "Clean image successfuly(local to dry-kube to kube)",
         common_test.RETVAL: 0,
-        common_test.ARGS: ["snmp", "20201231.84", "20201231.74"],
-        common_test.PROC_CMD: [
-            "docker images |grep snmp |grep -v latest |awk '{print $1,$2,$3}'",
-            "docker rmi sonick8scue.azurecr.io/docker-sonic-telemetry:20201231.74 && docker tag 507f8d28bf6e sonick8scue.azurecr.io/docker-sonic-telemetry:20201231.74 && docker rmi docker-sonic-telemetry:20201231.74"
+        common_test.ARGS: ["telemetry", "20201231.84", "20201231.74"],
+        DOCKER_IMAGES: [
+            ("sha256:507f8d28bf6e", ["docker-sonic-telemetry:20201231.74"]),
+            ("sha256:507f8d28bf6f", [TELEMETRY_REPO + ":20201231.74"]),
+            ("sha256:507f8d28bf6a", [TELEMETRY_REPO + ":20201231.84"])
         ],
-        common_test.PROC_OUT: [
-            "docker-sonic-telemetry 20201231.74 507f8d28bf6e\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.74 507f8d28bf6f\n\
-             sonick8scue.azurecr.io/docker-sonic-telemetry 20201231.84 507f8d28bf6g",
-            ""
-        ],
-        common_test.PROC_CODE: [
-            0,
-            0
+        DOCKER_CALLS: [
+            "rmi {}:20201231.74".format(TELEMETRY_REPO),
+            "tag 507f8d28bf6e {}:20201231.74".format(TELEMETRY_REPO),
+            "rmi docker-sonic-telemetry:20201231.74"
         ]
     },
 }
 
+
+class mock_docker_image:
+    def __init__(self, client, image_id, tags):
+        self.client = client
+        self.id = image_id
+        self.tags = tags
+
+
+    def tag(self, repository, tag):
+        self.client.call("tag {} {}:{}".format(self.id.split(":")[-1][:12], repository, tag))
+        return True
+
+
+class mock_docker_container:
+    def __init__(self, client, name, data):
+        self.client = client
+        self.name = name
+        self.status = data["status"]
+        self.attrs = {"Image": data["image"], "State": {"Running": data["status"] == "running"}}
+
+
+    def remove(self):
+        self.client.call("rm {}".format(self.name))
+
+
+class mock_docker_client:
+    """ Mocks the subset of docker client used by kube_commands """
+    def __init__(self, ct_data):
+        self.ct_data = ct_data
+        self.calls = []
+        self.containers = MagicMock()
+        self.containers.get.side_effect = self.get_container
+        self.images = MagicMock()
+        self.images.list.side_effect = self.list_images
+        self.images.get.side_effect = self.get_image
+        self.images.remove.side_effect = self.remove_image
+
+
+    def call(self, cmd):
+        if cmd in self.ct_data.get(DOCKER_FAIL, []):
+            raise kube_commands.docker.errors.APIError("{} failed".format(cmd))
+        self.calls.append(cmd)
+
+
+    def get_container(self, name):
+        if "get {}".format(name) in self.ct_data.get(DOCKER_FAIL, []):
+            raise kube_commands.docker.errors.DockerException("connection refused")
+        containers = self.ct_data.get(DOCKER_CONTAINERS, {})
+        if name not in containers:
+            raise kube_commands.docker.errors.NotFound("No such container: {}".format(name))
+        return mock_docker_container(self, name, containers[name])
+
+
+    def list_images(self):
+        return [mock_docker_image(self, image_id, tags)
+                for (image_id, tags) in self.ct_data.get(DOCKER_IMAGES, [])]
+
+
+    def get_image(self, name):
+        for image in self.list_images():
+            if image.id == name or image.id.split(":")[-1].startswith(name) or name in image.tags:
+                return image
+        raise kube_commands.docker.errors.NotFound("No such image: {}".format(name))
+
+
+    def remove_image(self, name, force=False):
+        self.call("rmi {}{}".format(name, " --force" if force else ""))
+
+
 class TestKubeCommands(object):
 
     def init(self):
@@ -563,24 +570,33 @@ clusters:\n\
             if common_test.RETVAL in ct_data:
                 assert ret == ct_data[common_test.RETVAL]
 
-    @patch("kube_commands.subprocess.Popen")
-    def test_tag_latest(self, mock_subproc):
-        common_test.set_kube_mock(mock_subproc)
-
+    @patch("kube_commands.docker.from_env")
+    def test_tag_latest(self, mock_docker):
         for (i, ct_data) in tag_latest_test_data.items():
             common_test.do_start_test("tag:latest", i, ct_data)
+            client = mock_docker_client(ct_data)
+            mock_docker.return_value = client
+            kube_commands.docker_client = None
 
             ret = kube_commands.tag_latest(*ct_data[common_test.ARGS])
             if common_test.RETVAL in ct_data:
                 assert ret == ct_data[common_test.RETVAL]
+            assert client.calls == ct_data[DOCKER_CALLS]
+            # Client is dropped on connection failure only
+            assert (kube_commands.docker_client is None) == (DOCKER_FAIL in ct_data)
 
-    @patch("kube_commands.subprocess.Popen")
-    def test_clean_image(self, mock_subproc):
-        common_test.set_kube_mock(mock_subproc)
-
+    @patch("kube_commands.docker.from_env")
+    def test_clean_image(self, mock_docker):
         for (i, ct_data) in clean_image_test_data.items():
             common_test.do_start_test("clean:image", i, ct_data)
+            client = mock_docker_client(ct_data)
+            mock_docker.return_value = client
+            kube_commands.docker_client = None
 
             ret = kube_commands.clean_image(*ct_data[common_test.ARGS])
             if common_test.RETVAL in ct_data:
                 assert ret == ct_data[common_test.RETVAL]
+            assert client.calls == ct_data[DOCKER_CALLS]
+
+        # Client is kept across calls
+        assert kube_commands.docker_client is client
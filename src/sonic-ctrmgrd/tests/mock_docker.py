@@ -1,2 +1,13 @@
 def from_env():
     return None
+
+
+class errors:
+    class DockerException(Exception):
+        pass
+
+    class APIError(DockerException):
+        pass
+
+    class NotFound(APIError):
+        pass
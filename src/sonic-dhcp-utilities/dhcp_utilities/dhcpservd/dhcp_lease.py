@@ -1,10 +1,11 @@
+import os
 import signal
 import syslog
 import threading
 import time
 from abc import abstractmethod
-from collections import deque
 from datetime import datetime
+from swsscommon import swsscommon
 
 DHCP_SERVER_IPV4_LEASE = "DHCP_SERVER_IPV4_LEASE"
 KEA_LEASE_FILE_PATH = "/tmp/kea-lease.csv"
@@ -29,6 +30,12 @@ class LeaseHanlder(object):
         self.lease_update_interval = lease_update_interval
         self.last_update_time = None
         self.lock = threading.Lock()
+        # Leases currently in STATE_DB, loaded from STATE_DB on the first update
+        self.lease_index = None
+        # Pipeline to STATE_DB, created on the first update and reused by the following ones
+        self.pipe = None
+        self.update_event = threading.Event()
+        self.worker = None
 
     @abstractmethod
     def _read(self):
@@ -44,88 +51,144 @@ class LeaseHanlder(object):
         """
         raise NotImplementedError
 
+    def start_worker(self):
+        """
+        Start thread which updates lease table when it's notified by notify_update()
+        """
+        if self.worker is not None:
+            return
+        self.worker = threading.Thread(target=self._worker_loop, name="LeaseUpdateWorker")
+        self.worker.daemon = True
+        self.worker.start()
+
+    def notify_update(self):
+        """
+        Request an update of lease table. Safe to be called in signal handler, several requests received
+        before the worker handles them are merged into one update
+        """
+        self.update_event.set()
+
+    def _worker_loop(self):
+        while True:
+            self.update_event.wait()
+            self.update_event.clear()
+            try:
+                self.update_lease()
+            except Exception as err:
+                syslog.syslog(syslog.LOG_ERR, "Failed to update lease: {}".format(err))
+
     def update_lease(self):
         """
         Update lease table in STATE_DB
         """
         last_update_time = self.last_update_time
         curr_time = datetime.now()
-        # If the time since the last update is less than self.lease_update_interval, then wait for a
-        # self.lease_update_interval
-        if last_update_time is not None and (curr_time - last_update_time).seconds < self.lease_update_interval:
-            time.sleep(self.lease_update_interval)
-            if self.last_update_time != last_update_time:
-                # Means lease has been updated during sleep, no need to update this lease
-                return
+        # If the time since the last update is less than self.lease_update_interval, then wait until
+        # self.lease_update_interval passed, leases changed during the wait are included in this update
+        if last_update_time is not None and (curr_time - last_update_time).total_seconds() < self.lease_update_interval:
+            time.sleep(self.lease_update_interval - (curr_time - last_update_time).total_seconds())
+            self.update_event.clear()
         if not self.lock.acquire(False):
             return
-        new_lease = self._read()
-        # Store old lease key
-        old_lease_table = self.db_connector.get_state_db_table(DHCP_SERVER_IPV4_LEASE)
-        old_lease_key = set(old_lease_table.keys())
+        try:
+            self._write_lease_diff(self._read())
+        finally:
+            self.last_update_time = datetime.now()
+            self.lock.release()
 
+    def _write_lease_diff(self, new_lease):
+        """
+        Write the difference between new lease and lease in STATE_DB with one redis pipeline flush
+        Args:
+            new_lease: Dict of lease read from lease file
+        """
+        if self.lease_index is None:
+            self.lease_index = self.db_connector.get_state_db_table(DHCP_SERVER_IPV4_LEASE)
+        if self.pipe is None:
+            self.pipe = swsscommon.RedisPipeline(self.db_connector.state_db)
+        pipe = self.pipe
+        unix_time = datetime.now().timestamp()
         # 1.1 If start time equal to end time or lease expired, means lease has been released
         #     1.1.1 If current lease table has this old lease, delete it
         #     1.1.2 Else skip
-        # 1.2 Else, means lease valid, save it.
+        # 1.2 Else, means lease valid, save it if it's changed.
+        # 2. Delete old lease not in new lease set
+        for key in list(self.lease_index.keys()):
+            value = new_lease.get(key)
+            if value is None or value["lease_start"] == value["lease_end"] or unix_time >= int(value["lease_end"]):
+                command = swsscommon.RedisCommand()
+                command.formatDEL("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key))
+                pipe.push(command)
+                del self.lease_index[key]
         for key, value in new_lease.items():
-            unix_time = datetime.now().timestamp()
             if value["lease_start"] == value["lease_end"] or unix_time >= int(value["lease_end"]):
-                if key in old_lease_key:
-                    self.db_connector.state_db.delete("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key))
                 continue
-            new_key = "{}|{}".format(DHCP_SERVER_IPV4_LEASE, key)
-            for k, v in new_lease[key].items():
-                self.db_connector.state_db.hset(new_key, k, v)
-        # Delete old lease not in new lease set
-        for key in old_lease_key:
-            if key not in new_lease.keys():
-                # Delete entry
-                self.db_connector.state_db.delete("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key))
-        self.last_update_time = datetime.now()
-        self.lock.release()
+            if self.lease_index.get(key) == value:
+                continue
+            command = swsscommon.RedisCommand()
+            command.formatHSET("{}|{}".format(DHCP_SERVER_IPV4_LEASE, key), value)
+            pipe.push(command)
+            self.lease_index[key] = dict(value)
+        pipe.flush()
 
 
 class KeaDhcp4LeaseHandler(LeaseHanlder):
     def __init__(self, db_connector, lease_file=KEA_LEASE_FILE_PATH):
         LeaseHanlder.__init__(self, db_connector)
         self.lease_file = lease_file
+        # Position of lease file read so far, the file is re-read from the beginning when kea-lfc
+        # replaces it (inode changed) or truncates it
+        self.lease_file_inode = None
+        self.lease_file_offset = 0
+        # Newest row of each client in lease file, mac address -> (ip, valid_lifetime, lease_end)
+        self.lease_rows = {}
 
     def register(self):
         """
-        Register callback function of signal
+        Register callback function of signal, lease is updated by a worker thread
         """
+        self.start_worker()
         signal.signal(signal.SIGUSR1, self._update_lease)
 
-    def _read(self):
-        # Read lease file generated by kea-dhcp4
+    def _tail_lease_file(self):
+        """
+        Read rows appended to lease file since the last read into self.lease_rows
+        """
         try:
             with open(self.lease_file, "r", encoding="utf-8") as fb:
-                dq = deque(fb)
+                stat = os.fstat(fb.fileno())
+                if stat.st_ino != self.lease_file_inode or stat.st_size < self.lease_file_offset:
+                    self.lease_file_inode = stat.st_ino
+                    self.lease_file_offset = 0
+                    self.lease_rows = {}
+                fb.seek(self.lease_file_offset)
+                content = fb.read()
         except FileNotFoundError as err:
             syslog.syslog(syslog.LOG_ERR, "Cannot find lease file: {}".format(self.lease_file))
             raise err
 
+        # Only rows with line end are complete, the last row without line end is being written by kea-dhcp4
+        # and is read again on the next read
+        complete_len = content.rfind("\n") + 1
+        self.lease_file_offset += len(content[:complete_len].encode("utf-8"))
+        for row in content[:complete_len].split("\n"):
+            splits = row.split(",")
+            # Skip header and empty row
+            if len(splits) < 5 or splits[0] == "address":
+                continue
+            self.lease_rows[splits[1]] = (splits[0], splits[3], splits[4])
+
+    def _read(self):
+        # Read lease file generated by kea-dhcp4
+        self._tail_lease_file()
         fdb_info = self._get_fdb_info()
         new_lease = {}
         # Get newest lease information of each client
-        while dq:
-            last_row = dq.pop()
-            splits = last_row.split(",")
-            # Skip header
-            if splits[0] == "address":
-                break
-            ip_str = splits[0]
-            mac_address = splits[1]
-            valid_lifetime = splits[3]
-            lease_end = splits[4]
-
+        for mac_address, (ip_str, valid_lifetime, lease_end) in self.lease_rows.items():
             if mac_address not in fdb_info:
                 syslog.syslog(syslog.LOG_WARNING, "Cannot not find {} in fdb table".format(mac_address))
                 continue
             new_key = "{}|{}".format(fdb_info[mac_address], mac_address)
-            if new_key in new_lease:
-                continue
             new_lease[new_key] = {
                 "lease_start": str(int(lease_end) - int(valid_lifetime)),
                 "lease_end": lease_end,
@@ -150,4 +213,4 @@ class KeaDhcp4LeaseHandler(LeaseHanlder):
         return ret
 
     def _update_lease(self, signum, frame):
-        self.update_lease()
+        self.notify_update()
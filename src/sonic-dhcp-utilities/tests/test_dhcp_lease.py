@@ -79,30 +79,74 @@ def test_update_kea_lease(mock_swsscommon_dbconnector_init, mock_swsscommon_tabl
         "Vlan1000|10:70:fd:b6:13:18": {}
     }
     with patch.object(swsscommon.Table, "getKeys"), \
-         patch.object(swsscommon.DBConnector, "hset") as mock_hset, \
+         patch.object(swsscommon, "RedisPipeline") as mock_pipeline, \
+         patch.object(swsscommon, "RedisCommand") as mock_command, \
          patch.object(KeaDhcp4LeaseHandler, "_read", MagicMock(return_value=tested_lease)), \
          patch.object(DhcpDbConnector, "get_state_db_table",
                       return_value=mock_lease_table), \
-         patch.object(swsscommon.DBConnector, "delete") as mock_delete, \
          patch("time.sleep", return_value=None) as mock_sleep:
         db_connector = DhcpDbConnector()
         kea_lease_handler = KeaDhcp4LeaseHandler(db_connector)
         kea_lease_handler.update_lease()
+        command = mock_command.return_value
         # Verify that old key was deleted
-        mock_delete.assert_has_calls([
+        command.formatDEL.assert_has_calls([
+            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|aa:bb:cc:dd:ee:ff"),
             call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:00"),
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:17"),
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|aa:bb:cc:dd:ee:ff")
+            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:17")
         ])
         # Verify that lease has been updated, to be noted that lease for "192.168.0.2" didn't been updated because
         # lease_start equals to lease_end
-        mock_hset.assert_has_calls([
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18", "lease_start", "1697607205"),
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18", "lease_end", "1697610805"),
-            call("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18", "ip", "193.168.0.132")
-        ])
+        command.formatHSET.assert_called_once_with("DHCP_SERVER_IPV4_LEASE|Vlan1000|10:70:fd:b6:13:18", {
+            "lease_start": "1697607205",
+            "lease_end": "1697610805",
+            "ip": "193.168.0.132"
+        })
+        # All changes are written with one flush
+        assert mock_pipeline.return_value.push.call_count == 4
+        mock_pipeline.return_value.flush.assert_called_once_with()
+        command.reset_mock()
         kea_lease_handler.update_lease()
         mock_sleep.assert_called_once_with(2)
+        # Nothing changed since the last update
+        command.formatHSET.assert_not_called()
+        command.formatDEL.assert_not_called()
+        # The pipeline is reused by the following updates
+        mock_pipeline.assert_called_once_with(db_connector.state_db)
+
+
+def test_read_kea_lease_incremental(mock_swsscommon_dbconnector_init, tmp_path):
+    lease_file = tmp_path / "kea-lease.csv"
+    with open("tests/test_data/kea-lease.csv", "r") as fb:
+        content = fb.read()
+    lease_file.write_text(content)
+    with patch.object(KeaDhcp4LeaseHandler, "_get_fdb_info", return_value=expected_fdb_info):
+        db_connector = DhcpDbConnector()
+        kea_lease_handler = KeaDhcp4LeaseHandler(db_connector, lease_file=str(lease_file))
+        assert kea_lease_handler._read() == expected_lease
+        # Appended row is read on top of the rows read before
+        with open(str(lease_file), "a") as fb:
+            fb.write("192.168.0.3,10:70:fd:b6:13:00,,3600,1697610805,1,0,0,,0,,0\n")
+        lease = kea_lease_handler._read()
+        assert lease["Vlan1000|10:70:fd:b6:13:00"] == {
+            "lease_start": "1697607205",
+            "lease_end": "1697610805",
+            "ip": "192.168.0.3"
+        }
+        # Row being written by kea-dhcp4 is not read until it's complete
+        with open(str(lease_file), "a") as fb:
+            fb.write("192.168.0.4,10:70:fd:b6:13:17,,3600,17")
+        assert kea_lease_handler._read()["Vlan1000|10:70:fd:b6:13:17"] == expected_lease["Vlan1000|10:70:fd:b6:13:17"]
+        with open(str(lease_file), "a") as fb:
+            fb.write("01000915,1,0,0,,0,,0\n")
+        assert kea_lease_handler._read()["Vlan1000|10:70:fd:b6:13:17"] == {
+            "lease_start": "1700997315",
+            "lease_end": "1701000915",
+            "ip": "192.168.0.4"
+        }
+        # Truncated file is read from the beginning
+        lease_file.write_text(content.split("\n")[0] + "\n")
+        assert kea_lease_handler._read() == {}
 
 
 def test_no_implement(mock_swsscommon_dbconnector_init):
@@ -62,6 +62,22 @@ def g_run_command(table, command, use_bgpd_client, daemons, ignore_fail = False)
             return False
     return True
 
+def g_run_command_batch(table, cmd_list):
+    """Run a list of (command, daemons, ignore_fail) and return per-command success.
+       vtysh commands are sent to FRR daemons through bgpd client as one batch.
+    """
+    if bgpd_client is None or not all(cmd.startswith('vtysh ') for cmd, _, _ in cmd_list):
+        return [g_run_command(table, cmd, True, daemons, ignore_fail) for cmd, daemons, ignore_fail in cmd_list]
+    syslog.syslog(syslog.LOG_DEBUG, "execute {} commands in batch for table {}.".format(len(cmd_list), table))
+    results = bgpd_client.run_vtysh_batch([(table, cmd, daemons) for cmd, daemons, _ in cmd_list])
+    for idx, (cmd, _, ignore_fail) in enumerate(cmd_list):
+        if not results[idx]:
+            if ignore_fail:
+                results[idx] = True
+            else:
+                syslog.syslog(syslog.LOG_ERR, 'command execution failure. Command: "{}"'.format(cmd))
+    return results
+
 def extract_cmd_daemons(cmd_str):
     # daemon list could be given within brackets at head of input lines
     dm_mark = re.match(r'\[(?P<daemons>.+)\]', cmd_str)
@@ -75,6 +91,8 @@ def extract_cmd_daemons(cmd_str):
 class BgpdClientMgr(threading.Thread):
     VTYSH_MARK = 'vtysh '
     PROXY_SERVER_ADDR = '/etc/frr/bgpd_client_sock'
+    # max number of command lines written to daemon before reading replies
+    MAX_PIPELINE_CMDS = 256
     ALL_DAEMONS = ['bgpd', 'zebra', 'staticd', 'bfdd', 'ospfd', 'pimd']
     TABLE_DAEMON = {
             'DEVICE_METADATA': ['bgpd'],
@@ -170,6 +188,27 @@ class BgpdClientMgr(threading.Thread):
         msg_buf.close()
         return (ret_code, reply_msg)
     @staticmethod
+    def __get_replies(sock, count):
+        # each reply is terminated by 3 bytes of 0 and 1 byte of return code
+        replies = []
+        msg_buf = b''
+        while len(replies) < count:
+            msg_end = msg_buf.find(b'\0\0\0')
+            if msg_end >= 0 and len(msg_buf) > msg_end + 3:
+                replies.append((msg_buf[msg_end + 3], msg_buf[:msg_end].decode(errors = 'replace')))
+                msg_buf = msg_buf[msg_end + 4:]
+                continue
+            try:
+                rd_msg = sock.recv(16384)
+            except socket.timeout:
+                syslog.syslog(syslog.LOG_ERR, 'socket reading timeout')
+                break
+            if len(rd_msg) == 0:
+                syslog.syslog(syslog.LOG_ERR, 'socket closed by frr daemon')
+                break
+            msg_buf += rd_msg
+        return replies
+    @staticmethod
     def __send_data(sock, data):
         if isinstance(data, str):
             data = bytes(data, 'utf-8')
@@ -220,6 +259,11 @@ class BgpdClientMgr(threading.Thread):
         self.proxy_running = True
         self.lock = threading.Lock()
         self.proxy_sock = self.__create_proxy_socket()
+        # daemon ==> set of configured lines with their context, only loaded during startup
+        self.running_config = None
+        # daemon ==> set of contexts changed by commands sent after running config was loaded
+        self.changed_contexts = {}
+        self.skipped_cmd_cnt = 0
         self.cmd_to_daemon = []
         for pat, daemons in self.VTYSH_CMD_DAEMON:
             try:
@@ -272,12 +316,40 @@ class BgpdClientMgr(threading.Thread):
                 ret_val = True
             resp += reply
         return (ret_val, resp)
-    def run_vtysh_command(self, table, command, daemons):
+    def __proc_command_list(self, cmd_list, daemon):
+        # commands are written back to back and replies read afterwards, daemon
+        # executes them in order and returns one reply for each command
+        results = [False] * len(cmd_list)
+        sock = self.client_socks.get(daemon, None)
+        if sock is None:
+            syslog.syslog(syslog.LOG_ERR, 'daemon %s is not connected' % daemon)
+            return results
+        for start in range(0, len(cmd_list), self.MAX_PIPELINE_CMDS):
+            cmd_chunk = cmd_list[start:start + self.MAX_PIPELINE_CMDS]
+            for cmd in cmd_chunk:
+                syslog.syslog(syslog.LOG_DEBUG, 'VTYSH CMD: %s daemon: %s' % (cmd, daemon))
+            try:
+                self.__send_data(sock, ''.join([cmd + '\0' for cmd in cmd_chunk]))
+            except socket.error as msg:
+                syslog.syslog(syslog.LOG_ERR, 'failed to send command to frr daemon: %s' % msg)
+                return results
+            replies = self.__get_replies(sock, len(cmd_chunk))
+            for idx, (ret_code, reply) in enumerate(replies):
+                if ret_code == 0:
+                    results[start + idx] = True
+                else:
+                    syslog.syslog(syslog.LOG_DEBUG, '[%s] command return code: %d' % (daemon, ret_code))
+                    syslog.syslog(syslog.LOG_DEBUG, reply)
+            if len(replies) < len(cmd_chunk):
+                syslog.syslog(syslog.LOG_ERR, 'failed to get reply from frr daemon %s' % daemon)
+                return results
+        return results
+    def __get_vtysh_cmd_list(self, table, command, daemons):
         if not command.startswith(self.VTYSH_MARK):
             syslog.syslog(syslog.LOG_ERR, 'command %s is not for vtysh config' % command)
-            return False
+            return (None, None)
         cmd_line = command[len(self.VTYSH_MARK):]
-        cmd_list = re.findall(r"-c\s+'([^']+)'\s*", cmd_line)
+        cmd_list = [cmd.strip() for cmd in re.findall(r"-c\s+'([^']+)'\s*", cmd_line)]
         cmd_list.append('end')
         if daemons is None:
             daemons = self.TABLE_DAEMON.get(table, None)
@@ -285,14 +357,108 @@ class BgpdClientMgr(threading.Thread):
             daemons = self.__get_cmd_daemons(cmd_list)
         if daemons is None or len(daemons) == 0:
             syslog.syslog(syslog.LOG_ERR, 'no common daemon list found for given commands')
+            return (None, None)
+        return (cmd_list, daemons)
+    @staticmethod
+    def __normalize_config_line(line):
+        if line.startswith('router bgp ') and line.endswith(' vrf default'):
+            return line[:-len(' vrf default')]
+        return line
+    @staticmethod
+    def __parse_running_config(config):
+        # running config is indented by context level, each line is kept
+        # together with lines of the contexts it belongs to
+        config_set = set()
+        context = []
+        for line in config.splitlines():
+            cfg_line = line.strip()
+            if len(cfg_line) == 0 or cfg_line.startswith('!'):
+                continue
+            indent = len(line) - len(line.lstrip(' '))
+            while len(context) > 0 and context[-1][0] >= indent:
+                context.pop()
+            if cfg_line in ['end', 'exit', 'exit-address-family', 'exit-vrf', 'exit-vni']:
+                continue
+            context.append((indent, cfg_line))
+            config_set.add(tuple([ctx_line for _, ctx_line in context]))
+        return config_set
+    def load_running_config(self):
+        """Load running config of all daemons, before it is cleared, config command already
+           in running config of a daemon will not be sent to that daemon again.
+        """
+        self.running_config = {}
+        self.changed_contexts = {}
+        self.skipped_cmd_cnt = 0
+        with self.lock:
+            for daemon in self.client_socks:
+                succ, config = self.__proc_command('show running-config', [daemon])
+                if not succ or config is None:
+                    syslog.syslog(syslog.LOG_ERR, 'failed to get running config from %s' % daemon)
+                    continue
+                self.running_config[daemon] = self.__parse_running_config(config)
+    def clear_running_config(self):
+        if self.running_config is not None:
+            syslog.syslog(syslog.LOG_INFO, '%d commands skipped because they were already in running config' %
+                          self.skipped_cmd_cnt)
+        self.running_config = None
+        self.changed_contexts = {}
+    def __get_config_lines(self, cmd_list):
+        if len(cmd_list) < 3 or cmd_list[0] != 'configure terminal' or cmd_list[-1] != 'end':
+            return None
+        return tuple([self.__normalize_config_line(cmd) for cmd in cmd_list[1:-1]])
+    def __in_running_config(self, cmd_list, daemon):
+        if self.running_config is None or daemon not in self.running_config:
             return False
-        ret_val = True
+        cfg_lines = self.__get_config_lines(cmd_list)
+        if cfg_lines is None or cfg_lines not in self.running_config[daemon]:
+            return False
+        # running config of a context is outdated once a command was sent to it, e.g.
+        # "no set extcommunity rt" followed by "set extcommunity rt" in route-map
+        changed_contexts = self.changed_contexts.get(daemon, set())
+        if len(cfg_lines) == 1:
+            return () not in changed_contexts
+        return all(cfg_lines[:idx] not in changed_contexts for idx in range(1, len(cfg_lines)))
+    def __set_context_changed(self, cmd_list, daemon):
+        if self.running_config is None:
+            return
+        cfg_lines = self.__get_config_lines(cmd_list)
+        if cfg_lines is None:
+            return
+        changed_contexts = self.changed_contexts.setdefault(daemon, set())
+        changed_contexts.add(cfg_lines[:-1])
+        if cfg_lines[-1].startswith('no '):
+            # negated line might be a context itself, e.g. "no route-map X permit 10"
+            changed_contexts.add(cfg_lines[:-1] + (cfg_lines[-1][len('no '):],))
+    def run_vtysh_batch(self, batch_list):
+        """Run list of (table, command, daemons) and return list of per-command result.
+           Command lines for each daemon are sent as one batch, a command succeeds if
+           each of its lines is run successfully by at least one daemon.
+        """
+        line_results = []
+        daemon_cmds = {}
+        for cmd_idx, (table, command, daemons) in enumerate(batch_list):
+            cmd_list, daemons = self.__get_vtysh_cmd_list(table, command, daemons)
+            if cmd_list is None:
+                line_results.append([False])
+                continue
+            line_results.append([False] * len(cmd_list))
+            for daemon in daemons:
+                if self.__in_running_config(cmd_list, daemon):
+                    self.skipped_cmd_cnt += 1
+                    line_results[-1] = [True] * len(cmd_list)
+                    continue
+                self.__set_context_changed(cmd_list, daemon)
+                daemon_cmds.setdefault(daemon, []).extend(
+                        [(cmd_idx, line_idx, cmd) for line_idx, cmd in enumerate(cmd_list)])
         with self.lock:
-            for cmd in cmd_list:
-                succ, _ = self.__proc_command(cmd.strip(), daemons)
-                if not succ:
-                    ret_val = False
-        return ret_val
+            for daemon, cmd_list in daemon_cmds.items():
+                results = self.__proc_command_list([cmd for _, _, cmd in cmd_list], daemon)
+                for (cmd_idx, line_idx, _), succ in zip(cmd_list, results):
+                    if succ:
+                        line_results[cmd_idx][line_idx] = True
+        return [all(results) for results in line_results]
+    def run_vtysh_command(self, table, command, daemons):
+        return self.run_vtysh_batch([(table, command, daemons)])[0]
     @staticmethod
     def __read_all(sock, data_len):
         in_buf = io.StringIO()
@@ -644,6 +810,8 @@ class BGPKeyMapList(list):
         start_idx = len(upper_vals)
         ret_val = False
         run_cmd_cnt = 0
+        batch_cmd_list = []
+        batch_key_list = []
         for db_field, key_map in self:
             merge_vals = False
             if type(db_field) is not list and type(db_field) is not tuple:
@@ -738,30 +906,40 @@ class BGPKeyMapList(list):
             for chk_list in cmd_list_list:
                if self.is_cmd_list_covered(cmd_list, chk_list):
                    cmd_list = chk_list
-            failed = False
             if len(cmd_list) > 0:
                 run_cmd_cnt += 1
                 cmd_prefix = 'vtysh '
                 for pfx in prefix_list:
                     cmd_prefix += "-c '%s' " % pfx
+                cmd_start = len(batch_cmd_list)
                 for cmd in cmd_list:
                     ignore_fail = False
                     if type(cmd) is tuple:
                         cmd, ignore_fail = cmd
-                    if not g_run_command(table, cmd_prefix + "-c '%s'" % cmd, True, key_map.daemons, ignore_fail):
-                        syslog.syslog(syslog.LOG_ERR, 'failed running FRR command: %s' % cmd)
-                        failed = True
-                        break
-                if not failed:
-                    ret_val = True
-            if not failed:
-                for key_list in key_list_list:
-                    for dkey in key_list:
-                        if dkey in data:
-                            data[dkey].status = CachedDataWithOp.STAT_SUCC
+                    batch_cmd_list.append((cmd_prefix + "-c '%s'" % cmd, key_map.daemons, ignore_fail))
+                batch_key_list.append((cmd_start, len(batch_cmd_list), key_list_list))
+            else:
+                self.set_data_status_succ(data, key_list_list)
         if run_cmd_cnt == 0:
             return True
+        # all commands generated for this update are sent in one batch
+        cmd_results = g_run_command_batch(table, batch_cmd_list)
+        for cmd_start, cmd_end, key_list_list in batch_key_list:
+            failed = False
+            for idx in range(cmd_start, cmd_end):
+                if not cmd_results[idx]:
+                    syslog.syslog(syslog.LOG_ERR, 'failed running FRR command: %s' % batch_cmd_list[idx][0])
+                    failed = True
+            if not failed:
+                ret_val = True
+                self.set_data_status_succ(data, key_list_list)
         return ret_val
+    @staticmethod
+    def set_data_status_succ(data, key_list_list):
+        for key_list in key_list_list:
+            for dkey in key_list:
+                if dkey in data:
+                    data[dkey].status = CachedDataWithOp.STAT_SUCC
 
 class CommandArgument(object):
     def __init__(self, daemon, enabled, val = None):
@@ -1442,10 +1620,17 @@ def hdl_static_route(daemon, cmd_str, op, st_idx, args, data):
     return cmd_list
 
 class ExtConfigDBConnector(ConfigDBConnector):
+    # notifications arriving back to back are collected for at most this
+    # many seconds, and each changed key is read from DB once per batch
+    COALESCE_WINDOW = 0.05
+    MAX_BATCH_KEYS = 1000
     def __init__(self, ns_attrs = None):
         super(ExtConfigDBConnector, self).__init__()
         self.nosort_attrs = ns_attrs if ns_attrs is not None else {}
         self.__listen_thread_running = False
+        self.__sub_key_spaces = []
+        self.notification_count = 0
+        self.handled_count = 0
     def raw_to_typed(self, raw_data, table = ''):
         if len(raw_data) == 0:
             raw_data = None
@@ -1456,36 +1641,75 @@ class ExtConfigDBConnector(ConfigDBConnector):
             if type(val) is list and key not in self.nosort_attrs.get(table, set()):
                 val.sort()
         return data
-    def sub_msg_handler(self, msg_item):
-        if msg_item['type'] == 'pmessage':
-            key = msg_item['channel'].split(':', 1)[1]
+    def __get_msg_key(self, msg_item):
+        if msg_item['type'] != 'pmessage':
+            return None
+        self.notification_count += 1
+        return msg_item['channel'].split(':', 1)[1]
+    def __handle_keys(self, key_list):
+        client = self.get_redis_client(self.db_name)
+        # read all entries of the batch first, then run handlers
+        fetched = []
+        for key in key_list:
             try:
                 (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
                 if table in self.handlers:
-                    client = self.get_redis_client(self.db_name)
-                    data = self.raw_to_typed(client.hgetall(key), table)
-                    super(ExtConfigDBConnector, self)._ConfigDBConnector__fire(table, row, data)
+                    fetched.append((table, row, client.hgetall(key)))
             except ValueError:
                 pass    #Ignore non table-formated redis entries
+            except Exception as e:
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed reading config DB key {} with exception: {}'.format(key, str(e)))
+                logging.exception(e)
+        for table, row, raw_data in fetched:
+            try:
+                data = self.raw_to_typed(raw_data, table)
+                self.handled_count += 1
+                super(ExtConfigDBConnector, self)._ConfigDBConnector__fire(table, row, data)
             except Exception as e:
                 syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
                 logging.exception(e)
+    def sub_msg_handler(self, msg_item):
+        key = self.__get_msg_key(msg_item)
+        if key is not None:
+            self.__handle_keys([key])
+    def get_notification_counters(self):
+        return {'received': self.notification_count, 'handled': self.handled_count}
 
     def listen_thread(self, timeout):
-        self.__listen_thread_running = True
-        sub_key_space = "__keyspace@{}__:*".format(self.get_dbid(self.db_name))
-        self.pubsub.psubscribe(sub_key_space)
         while self.__listen_thread_running:
             msg = self.pubsub.get_message(timeout, True)
-            if msg:
-                self.sub_msg_handler(msg)
+            if not msg:
+                continue
+            # dict keeps the order in which keys were first notified
+            pending_keys = {}
+            window_end = time.time() + self.COALESCE_WINDOW
+            while msg:
+                key = self.__get_msg_key(msg)
+                if key is not None:
+                    pending_keys[key] = None
+                if (len(pending_keys) >= self.MAX_BATCH_KEYS or time.time() >= window_end or
+                    not self.__listen_thread_running):
+                    break
+                msg = self.pubsub.get_message(timeout, True)
+            self.__handle_keys(list(pending_keys))
+            syslog.syslog(syslog.LOG_DEBUG, '[bgp cfgd] config DB notifications received {} handled {}'.format(
+                          self.notification_count, self.handled_count))
 
-        self.pubsub.punsubscribe(sub_key_space)
+        for sub_key_space in self.__sub_key_spaces:
+            self.pubsub.punsubscribe(sub_key_space)
 
-    def listen(self):
+    def listen(self, table_list = None):
         """Start listen Redis keyspace events and will trigger corresponding handlers when content of a table changes.
+           Only keyspace of tables in table_list, or of all subscribed tables if not given, is listened to.
         """
+        if table_list is None:
+            table_list = list(self.handlers)
+        dbid = self.get_dbid(self.db_name)
+        self.__sub_key_spaces = ['__keyspace@{}__:{}{}*'.format(dbid, table, self.TABLE_NAME_SEPARATOR) for table in table_list]
         self.pubsub = self.get_redis_client(self.db_name).pubsub()
+        for sub_key_space in self.__sub_key_spaces:
+            self.pubsub.psubscribe(sub_key_space)
+        self.__listen_thread_running = True
         self.sub_thread = threading.Thread(target=self.listen_thread, args=(0.01,))
         self.sub_thread.start()
 
@@ -2259,19 +2483,34 @@ class BGPConfigDaemon:
         for key, entry in self.table_data_cache.items():
             syslog.syslog(syslog.LOG_DEBUG, '  %-20s : %s' % (key, entry))
         if self.config_mode == "unified":
+            self.__replay_config()
+
+    def __replay_config(self):
+        # replay from the DB snapshot already loaded to cache, in handler table order
+        table_rows = {}
+        for table_key, data in self.table_data_cache.items():
+            table, key = table_key.split('&&', 1)
+            table_rows.setdefault(table, []).append((key, dict(data)))
+        # FRR was started with config rendered from the same DB, only
+        # send commands not yet found in its running config
+        if bgpd_client is not None:
+            bgpd_client.load_running_config()
+        try:
             for table, _ in self.table_handler_list:
-                table_list = self.config_db.get_table(table)
-                for key, data in table_list.items():
+                for key, data in table_rows.get(table, []):
                     syslog.syslog(syslog.LOG_DEBUG, 'config replay for table {} key {}'.format(table, key))
                     upd_data = {}
                     for upd_key, upd_val in data.items():
                         upd_data[upd_key] = CachedDataWithOp(upd_val, CachedDataWithOp.OP_ADD)
-                    self.bgp_message.put((self.config_db.serialize_key(key), False, table, upd_data))
+                    self.bgp_message.put((key, False, table, upd_data))
                     upd_data_list = []
                     self.__update_bgp(upd_data_list)
                     for table1, key1, data1 in upd_data_list:
                         table_key = ExtConfigDBConnector.get_table_key(table1, key1)
                         self.__update_cache_data(table_key, data1)
+        finally:
+            if bgpd_client is not None:
+                bgpd_client.clear_running_config()
 
     def subscribe_all(self):
         for table, hdlr in self.table_handler_list:
@@ -3789,7 +4028,7 @@ class BGPConfigDaemon:
 
     def start(self):
         self.subscribe_all()
-        self.config_db.listen()
+        self.config_db.listen([table for table, _ in self.table_handler_list])
     def stop(self):
         self.config_db.stop_listen()
         if self.config_db.sub_thread.is_alive():
@@ -13,12 +13,46 @@ def test_contructor():
     daemon.start()
     for table, hdlr in daemon.table_handler_list:
         daemon.config_db.subscribe.assert_any_call(table, hdlr)
-    daemon.config_db.pubsub.psubscribe.assert_called_once()
+    assert(daemon.config_db.pubsub.psubscribe.call_count == len(daemon.table_handler_list))
     assert(daemon.config_db.sub_thread.is_alive() == True)
     daemon.stop()
-    daemon.config_db.pubsub.punsubscribe.assert_called_once()
+    assert(daemon.config_db.pubsub.punsubscribe.call_count == len(daemon.table_handler_list))
     assert(daemon.config_db.sub_thread.is_alive() == False)
 
+@patch.dict('sys.modules', **mockmapping)
+def test_listen_coalesce():
+    from frrcfgd.frrcfgd import ExtConfigDBConnector
+    config_db = ExtConfigDBConnector()
+    config_db.TABLE_NAME_SEPARATOR = '|'
+    config_db.handlers = {'BGP_GLOBALS': None, 'BGP_NEIGHBOR': None}
+    config_db.get_dbid.return_value = 4
+    config_db.raw_to_typed = lambda raw_data, table = '': raw_data
+    client = config_db.get_redis_client.return_value
+    client.hgetall.side_effect = lambda key: {'key': key}
+    pubsub = client.pubsub.return_value
+    msg_keys = ['BGP_NEIGHBOR|default|10.0.0.1', 'BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1',
+                'BGP_NEIGHBOR|default|10.0.0.1', 'BGP_NEIGHBOR|default|10.0.0.2']
+    messages = [{'type': 'pmessage', 'channel': '__keyspace@4__:' + key} for key in msg_keys] + [None]
+    def get_message(timeout, interrupt):
+        if messages:
+            return messages.pop(0)
+        config_db.stop_listen()
+        return None
+    pubsub.get_message.side_effect = get_message
+    fired = []
+    with patch.object(ExtConfigDBConnector.__mro__[1], '_ConfigDBConnector__fire', create = True,
+                      new = lambda self, table, key, data: fired.append((table, key, data))):
+        config_db.listen(['BGP_GLOBALS', 'BGP_NEIGHBOR'])
+        config_db.sub_thread.join()
+    subscribed = sorted(args[0] for args, _ in pubsub.psubscribe.call_args_list)
+    assert(subscribed == ['__keyspace@4__:BGP_GLOBALS|*', '__keyspace@4__:BGP_NEIGHBOR|*'])
+    assert(fired == [('BGP_NEIGHBOR', 'default|10.0.0.1', {'key': 'BGP_NEIGHBOR|default|10.0.0.1'}),
+                     ('BGP_GLOBALS', 'default', {'key': 'BGP_GLOBALS|default'}),
+                     ('BGP_NEIGHBOR', 'default|10.0.0.2', {'key': 'BGP_NEIGHBOR|default|10.0.0.2'})])
+    assert(client.hgetall.call_count == 3)
+    assert(config_db.get_notification_counters() == {'received': 5, 'handled': 3})
+    assert(pubsub.punsubscribe.call_count == 2)
+
 class CmdMapTestInfo:
     data_buf = {}
     def __init__(self, table, key, data, exp_cmd, no_del = False, neg_cmd = None,
@@ -1,4 +1,5 @@
 import socket
+import threading
 import pytest
 from unittest.mock import MagicMock, NonCallableMagicMock, patch
 
@@ -18,6 +19,7 @@ with patch.dict('sys.modules', **mockmapping):
     from frrcfgd.frrcfgd import AggregateAddr
     from frrcfgd.frrcfgd import IpNextHop
     from frrcfgd.frrcfgd import IpNextHopSet
+    from frrcfgd.frrcfgd import BgpdClientMgr
 
 def test_data_with_op():
     data = CachedDataWithOp()
@@ -234,3 +236,171 @@ def test_nexthop_set():
             test_set.add(IpNextHop(af, bkh_list[idx], ip_list[idx] if af == socket.AF_INET else ip6_list[idx],
                                    None, intf_list[idx], tag_list[idx], None, vrf_list[idx]))
         assert(nh_set == test_set)
+
+def test_bgpd_client_batch():
+    def frr_daemon(sock, fail_cmds):
+        # reply to each null terminated command with 3 bytes of 0 and return code
+        data = b''
+        while True:
+            rd_msg = sock.recv(16384)
+            if len(rd_msg) == 0:
+                break
+            data += rd_msg
+            while b'\0' in data:
+                cmd, data = data.split(b'\0', 1)
+                cmd = cmd.decode()
+                recv_cmds.append(cmd)
+                ret_code = 1 if cmd in fail_cmds else 0
+                sock.sendall(('reply %s' % cmd).encode() + bytes([0, 0, 0, ret_code]))
+    recv_cmds = []
+    client = BgpdClientMgr.__new__(BgpdClientMgr)
+    client.lock = threading.Lock()
+    client.running_config = None
+    client.client_socks = {}
+    daemon_threads = []
+    for daemon in ['bgpd', 'staticd']:
+        client_sock, daemon_sock = socket.socketpair()
+        client.client_socks[daemon] = client_sock
+        thread = threading.Thread(target = frr_daemon, args = (daemon_sock, {'neighbor 1.1.1.1 bad'}))
+        thread.start()
+        daemon_threads.append((thread, daemon_sock))
+    nbr_cmd = "vtysh -c 'configure terminal' -c 'router bgp 100' -c 'neighbor 1.1.1.1 %s'"
+    results = client.run_vtysh_batch([('BGP_NEIGHBOR', nbr_cmd % 'remote-as 200', None),
+                                      ('BGP_NEIGHBOR', nbr_cmd % 'bad', None),
+                                      ('STATIC_ROUTE', "vtysh -c 'configure terminal' -c 'ip route 1.0.0.0/8 Null0'", None),
+                                      ('BGP_NEIGHBOR', 'show running-config', None)])
+    assert(results == [True, False, True, False])
+    assert(client.run_vtysh_command('BGP_NEIGHBOR', nbr_cmd % 'remote-as 300', None))
+    for sock in client.client_socks.values():
+        sock.close()
+    for thread, daemon_sock in daemon_threads:
+        thread.join()
+        daemon_sock.close()
+    assert(recv_cmds.count('end') == 4)
+    assert(recv_cmds.count('configure terminal') == 4)
+    assert('ip route 1.0.0.0/8 Null0' in recv_cmds)
+    assert(recv_cmds.index('neighbor 1.1.1.1 bad') < recv_cmds.index('neighbor 1.1.1.1 remote-as 300'))
+
+def test_bgpd_client_running_config():
+    running_config = ('frr version 8.5.1\n'
+                      '!\n'
+                      'router bgp 100\n'
+                      ' bgp router-id 1.1.1.1\n'
+                      ' neighbor 10.0.0.1 remote-as 200\n'
+                      ' !\n'
+                      ' address-family ipv4 unicast\n'
+                      '  neighbor 10.0.0.1 activate\n'
+                      ' exit-address-family\n'
+                      'exit\n'
+                      '!\n'
+                      'router bgp 200 vrf Vrf_red\n'
+                      'exit\n'
+                      '!\n'
+                      'end\n')
+    def frr_daemon(sock):
+        data = b''
+        while True:
+            rd_msg = sock.recv(16384)
+            if len(rd_msg) == 0:
+                break
+            data += rd_msg
+            while b'\0' in data:
+                cmd, data = data.split(b'\0', 1)
+                cmd = cmd.decode()
+                recv_cmds.append(cmd)
+                reply = running_config if cmd == 'show running-config' else ''
+                sock.sendall(reply.encode() + bytes([0, 0, 0, 0]))
+    recv_cmds = []
+    client = BgpdClientMgr.__new__(BgpdClientMgr)
+    client.lock = threading.Lock()
+    client_sock, daemon_sock = socket.socketpair()
+    client.client_socks = {'bgpd': client_sock}
+    thread = threading.Thread(target = frr_daemon, args = (daemon_sock,))
+    thread.start()
+    client.load_running_config()
+    bgp_cmd = lambda vrf, asn, *cmds: ' '.join(["vtysh -c 'configure terminal' -c 'router bgp %d vrf %s'" % (asn, vrf)] +
+                                               ["-c '%s'" % cmd for cmd in cmds])
+    results = client.run_vtysh_batch([('BGP_GLOBALS', bgp_cmd('default', 100), None),
+                                      ('BGP_GLOBALS', bgp_cmd('default', 100, 'bgp router-id 1.1.1.1'), None),
+                                      ('BGP_NEIGHBOR_AF', bgp_cmd('default', 100, 'address-family ipv4 unicast',
+                                                                  'neighbor 10.0.0.1 activate'), None),
+                                      ('BGP_NEIGHBOR_AF', bgp_cmd('default', 100, 'address-family ipv6 unicast',
+                                                                  'neighbor 10.0.0.1 activate'), None),
+                                      ('BGP_GLOBALS', bgp_cmd('default', 100, 'bgp router-id 2.2.2.2'), None),
+                                      ('BGP_GLOBALS', bgp_cmd('Vrf_red', 200), None)])
+    assert(results == [True] * 6)
+    assert(client.skipped_cmd_cnt == 4)
+    client.clear_running_config()
+    assert(client.running_config is None)
+    assert(client.run_vtysh_command('BGP_GLOBALS', bgp_cmd('default', 100, 'bgp router-id 1.1.1.1'), None))
+    client_sock.close()
+    thread.join()
+    daemon_sock.close()
+    assert(recv_cmds.count('bgp router-id 1.1.1.1') == 1)
+    assert('bgp router-id 2.2.2.2' in recv_cmds)
+    assert('address-family ipv6 unicast' in recv_cmds)
+    assert('address-family ipv4 unicast' not in recv_cmds)
+    assert('router bgp 200 vrf Vrf_red' not in recv_cmds)
+
+def test_bgpd_client_running_config_changed():
+    running_config = ('frr version 8.5.1\n'
+                      '!\n'
+                      'router bgp 100\n'
+                      ' neighbor 10.0.0.1 remote-as 200\n'
+                      ' address-family ipv4 unicast\n'
+                      '  neighbor 10.0.0.1 activate\n'
+                      ' exit-address-family\n'
+                      'exit\n'
+                      '!\n'
+                      'route-map RM permit 10\n'
+                      ' set extcommunity rt 100:1\n'
+                      'exit\n'
+                      '!\n'
+                      'route-map RM permit 20\n'
+                      ' set metric 10\n'
+                      'exit\n'
+                      '!\n'
+                      'end\n')
+    def frr_daemon(sock):
+        data = b''
+        while True:
+            rd_msg = sock.recv(16384)
+            if len(rd_msg) == 0:
+                break
+            data += rd_msg
+            while b'\0' in data:
+                cmd, data = data.split(b'\0', 1)
+                cmd = cmd.decode()
+                recv_cmds.append(cmd)
+                reply = running_config if cmd == 'show running-config' else ''
+                sock.sendall(reply.encode() + bytes([0, 0, 0, 0]))
+    recv_cmds = []
+    client = BgpdClientMgr.__new__(BgpdClientMgr)
+    client.lock = threading.Lock()
+    client_sock, daemon_sock = socket.socketpair()
+    client.client_socks = {'bgpd': client_sock}
+    thread = threading.Thread(target = frr_daemon, args = (daemon_sock,))
+    thread.start()
+    client.load_running_config()
+    vtysh_cmd = lambda *cmds: ' '.join(["vtysh -c 'configure terminal'"] + ["-c '%s'" % cmd for cmd in cmds])
+    # route-map extcommunity is replayed as "no set extcommunity rt/soo" followed by "set extcommunity rt"
+    results = client.run_vtysh_batch([('ROUTE_MAP', vtysh_cmd('route-map RM permit 10', 'no set extcommunity rt'), None),
+                                      ('ROUTE_MAP', vtysh_cmd('route-map RM permit 10', 'no set extcommunity soo'), None),
+                                      ('ROUTE_MAP', vtysh_cmd('route-map RM permit 10', 'set extcommunity rt 100:1'), None),
+                                      ('ROUTE_MAP', vtysh_cmd('route-map RM permit 20', 'set metric 10'), None),
+                                      ('ROUTE_MAP', vtysh_cmd('no route-map RM permit 20'), None),
+                                      ('ROUTE_MAP', vtysh_cmd('route-map RM permit 20', 'set metric 10'), None),
+                                      ('BGP_NEIGHBOR', vtysh_cmd('router bgp 100', 'no neighbor 10.0.0.1'), None),
+                                      ('BGP_NEIGHBOR', vtysh_cmd('router bgp 100', 'neighbor 10.0.0.1 remote-as 200'), None),
+                                      ('BGP_NEIGHBOR_AF', vtysh_cmd('router bgp 100', 'address-family ipv4 unicast',
+                                                                    'neighbor 10.0.0.1 activate'), None)])
+    assert(results == [True] * 9)
+    assert(client.skipped_cmd_cnt == 1)
+    client.clear_running_config()
+    client_sock.close()
+    thread.join()
+    daemon_sock.close()
+    assert(recv_cmds.count('set extcommunity rt 100:1') == 1)
+    assert(recv_cmds.count('set metric 10') == 1)
+    assert(recv_cmds.count('neighbor 10.0.0.1 remote-as 200') == 1)
+    assert(recv_cmds.count('neighbor 10.0.0.1 activate') == 1)
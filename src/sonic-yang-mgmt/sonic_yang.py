@@ -3,7 +3,7 @@ import syslog
 
 from json import dump
 from glob import glob
-from sonic_yang_ext import SonicYangExtMixin, SonicYangException
+from sonic_yang_ext import SonicYangExtMixin, SonicYangException, YANG_CACHE_DIR
 
 """
 Yang schema and data tree python APIs based on libyang python
@@ -12,8 +12,11 @@ i.e. it is mixin not parent class.
 """
 class SonicYang(SonicYangExtMixin):
 
-    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0):
+    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0, cache_dir=YANG_CACHE_DIR, profile=False):
         self.yang_dir = yang_dir
+        # directory of the cached yang model bundles, None to disable the cache
+        self.cache_dir = cache_dir
+        self.yangModelBundleKey = None
         self.ctx = None
         self.module = None
         self.root = None
@@ -44,6 +47,14 @@ class SonicYang(SonicYangExtMixin):
         # below dict will store preProcessed yang objects, which may be needed by
         # all yang modules, such as grouping.
         self.preProcessedYang = dict()
+        # leafDicts of containers and lists of config DB tables, see _createLeafDict()
+        self.leafDicts = dict()
+        # memoized converters of field values, see _getTypeConverter()
+        self.typeConverters = dict()
+        # report time spent per table in translation if enabled
+        self.profile = profile
+        # time spent per table: {table: {'xlate': seconds, 'revXlate': seconds}}
+        self.profileStats = dict()
         # element path for CONFIG DB. An example for this list could be:
         # ['PORT', 'Ethernet0', 'speed']
         self.elementPath = []
@@ -4,10 +4,65 @@
 from __future__ import print_function
 import yang as ly
 import syslog
+import errno
+import hashlib
+import os
+import pickle
+import stat
+import sys
+import tempfile
+import time
+from copy import deepcopy
 from json import dump, dumps, loads
 from xmltodict import parse
 from glob import glob
 
+# Directory of the cached YANG schema bundles, see _loadYangModelBundle().
+# A bundle prebuilt at image build time can be placed here as well.
+# Bundles are unpickled by root, so the directory is under /run which only
+# root can write to, and see _isSecureCachePath().
+YANG_CACHE_DIR = os.environ.get('SONIC_YANG_CACHE_DIR', '/run/sonic-yang-cache')
+# Version of the bundle content, bump it when the content changes
+YANG_BUNDLE_VERSION = 1
+
+def _isSecureCachePath(st):
+    '''
+        Check whether the file of the os.stat() result st is owned by the
+        current user or root, and not writable by group or others.
+    '''
+    return st.st_uid in (0, os.getuid()) and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+def _openCacheFile(path):
+    '''
+        Open the cache file for reading, raise OSError if the file or its
+        directory is not secure.
+    '''
+    st = os.lstat(os.path.dirname(path))
+    if not stat.S_ISDIR(st.st_mode) or not _isSecureCachePath(st):
+        raise OSError(errno.EPERM, 'Insecure cache directory', os.path.dirname(path))
+    f = os.fdopen(os.open(path, os.O_RDONLY | os.O_NOFOLLOW), 'rb')
+    st = os.fstat(f.fileno())
+    if not stat.S_ISREG(st.st_mode) or not _isSecureCachePath(st):
+        f.close()
+        raise OSError(errno.EPERM, 'Insecure cache file', path)
+    return f
+
+def _makeCacheDir(directory):
+    '''
+        Create the cache directory accessible by the current user only, if it
+        doesn't exist. Return True if the directory can be used.
+    '''
+    try:
+        os.makedirs(directory, 0o700)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            return False
+    try:
+        st = os.lstat(directory)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and _isSecureCachePath(st)
+
 Type_1_list_maps_model = [
     'DSCP_TO_TC_MAP_LIST',
     'DOT1P_TO_TC_MAP_LIST',
@@ -65,10 +120,16 @@ class SonicYangExtMixin:
             self.sysLog(syslog.LOG_DEBUG,'Loaded below Yang Models')
             self.sysLog(syslog.LOG_DEBUG,str(self.yangFiles))
 
-            # load json for each yang model
-            self._loadJsonYangModel()
-            # create a map from config DB table to yang container
-            self._createDBTableToModuleMap()
+            # JSON of yang models, the map and leafDicts are served from the
+            # cached bundle, if it was created for the same yang models
+            if not self._loadYangModelBundle():
+                # load json for each yang model
+                self._loadJsonYangModel()
+                # create a map from config DB table to yang container
+                self._createDBTableToModuleMap()
+                # create leafDicts of all config DB tables
+                self._createLeafDicts()
+                self._saveYangModelBundle()
         except Exception as e:
             self.sysLog(msg="Yang Models Load failed:{}".format(str(e)), \
                 debug=syslog.LOG_ERR, doPrint=True)
@@ -95,6 +156,96 @@ class SonicYangExtMixin:
 
         return
 
+    def _getYangModelBundleKey(self):
+        '''
+            Compute the key of the yang model bundle: a hash of the content of
+            all yang model files, this code and the bundle format.
+
+            Returns:
+                (str): key of the bundle
+        '''
+        h = hashlib.sha256()
+        h.update(repr((YANG_BUNDLE_VERSION, sys.version_info[:2])).encode())
+        for file in [os.path.abspath(__file__)] + sorted(glob(self.yang_dir + "/*.yang")):
+            h.update(os.path.basename(file).encode())
+            with open(file, 'rb') as f:
+                h.update(hashlib.sha256(f.read()).digest())
+        return h.hexdigest()
+
+    def _loadYangModelBundle(self):
+        '''
+            Load JSON of yang models, the map from config DB table to yang
+            container, preProcessed yang objects and leafDicts from the bundle
+            stored in self.cache_dir. A bundle is used only if it was created
+            for the same yang models, i.e. it is invalidated by any change of
+            the yang model files.
+
+            Returns:
+                (bool): True if loaded from the bundle, False otherwise
+        '''
+        if not self.cache_dir:
+            return False
+        try:
+            self.yangModelBundleKey = self._getYangModelBundleKey()
+            bundleFile = os.path.join(self.cache_dir, self.yangModelBundleKey + '.pickle')
+            with _openCacheFile(bundleFile) as f:
+                bundle = pickle.load(f)
+            yJson = bundle['yJson']
+            confDbYangMap = bundle['confDbYangMap']
+            preProcessedYang = bundle['preProcessedYang']
+            leafDicts = bundle['leafDicts']
+        except (IOError, OSError, EOFError, ValueError, KeyError, TypeError, \
+                AttributeError, pickle.UnpicklingError):
+            return False
+
+        self.yJson = yJson
+        self.confDbYangMap = confDbYangMap
+        self.preProcessedYang = preProcessedYang
+        self.leafDicts = leafDicts
+        self.sysLog(msg="Yang models are loaded from bundle {}".format(bundleFile))
+        return True
+
+    def _saveYangModelBundle(self):
+        '''
+            Store JSON of yang models, the map from config DB table to yang
+            container, preProcessed yang objects and leafDicts in self.cache_dir.
+            The bundle is pickled as one object, so the objects shared between
+            them stay shared when it is loaded. Failures are ignored, the bundle
+            is an optimization only.
+
+            Returns:
+                void
+        '''
+        if not self.cache_dir or self.yangModelBundleKey is None:
+            return
+        bundle = {
+            'yJson': self.yJson,
+            'confDbYangMap': self.confDbYangMap,
+            'preProcessedYang': self.preProcessedYang,
+            'leafDicts': self.leafDicts
+        }
+        tmpFile = None
+        try:
+            if not _makeCacheDir(self.cache_dir):
+                self.sysLog(msg="Yang model bundle is not stored, cache directory {} is not secure".format(self.cache_dir), \
+                    debug=syslog.LOG_WARNING)
+                return
+            fd, tmpFile = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.rename(tmpFile, os.path.join(self.cache_dir, self.yangModelBundleKey + '.pickle'))
+            tmpFile = None
+        except (IOError, OSError, pickle.PicklingError) as e:
+            self.sysLog(msg="Failed to store yang model bundle:{}".format(str(e)), \
+                debug=syslog.LOG_WARNING)
+        finally:
+            if tmpFile is not None:
+                try:
+                    os.remove(tmpFile)
+                except OSError:
+                    pass
+        return
+
     def _preProcessYangGrouping(self, moduleName, module):
         '''
             PreProcess Grouping Section of YANG models, and store it in
@@ -371,6 +522,11 @@ class SonicYangExtMixin:
                  leafDict (dict): dict with leaf(s) information for List\Container
                     corresponding to config DB table.
         '''
+        key = self._getLeafDictKey(model, table)
+        leafDict = self.leafDicts.get(key)
+        if leafDict is not None:
+            return leafDict
+
         leafDict = dict()
         #Iterate over leaf, choices and leaf-list.
         self._fillLeafDict(model.get('leaf'), leafDict)
@@ -390,48 +546,175 @@ class SonicYangExtMixin:
         if model.get('uses') is not None:
             self._fillLeafDictUses(model.get('uses'), table, leafDict)
 
+        self.leafDicts[key] = leafDict
         return leafDict
 
     """
-    Convert a string from Config DB value to Yang Value based on type of the
-    key in Yang model.
-    @model : A List of Leafs in Yang model list
+    Key of leafDict of a list or container in self.leafDicts
     """
-    def _findYangTypedValue(self, key, value, leafDict):
+    def _getLeafDictKey(self, model, table):
+        return (table, model.get('@name'), model.get('key') is not None)
 
-        # convert config DB string to yang Type
-        def _yangConvert(val):
-            # Convert everything to string
-            val = str(val)
-            # find type of this key from yang leaf
-            type = leafDict[key]['type']['@name']
+    def _getTypeConverter(self, table, key, leaf, reverse=False):
+        '''
+            Get converter of a value of a field in config DB table to yang
+            value, or of a yang value to config DB value if reverse is True.
+            Converters are memoized per table, field and yang type.
+
+            Parameters:
+                table (str): config DB table.
+                key (str): field name, i.e. leaf name.
+                leaf (dict): json format of yang leaf from leafDict.
+                reverse (bool): convert yang value to config DB value.
 
+            Returns:
+                 (function): converter of a single value
+        '''
+        type = leaf['type']['@name']
+        isleafList = leaf['__isleafList']
+        ckey = (table, key, type, isleafList, reverse)
+        converter = self.typeConverters.get(ckey)
+        if converter is not None:
+            return converter
+
+        # Field defined as leaf-list but has string value in CONFIG DB
+        separator = LEAF_LIST_WITH_STRING_VALUE_DICT.get((table, key))
+        if not reverse:
+            # config DB has strings only, convert to int for uint types.
+            # TODO: find type of leafref from schema node, find type in
+            # sonic-head, as of now all are strings.
             if 'uint' in type:
-                vValue = int(val, 10)
-            # TODO: find type of leafref from schema node
-            elif 'leafref' in type:
-                vValue = val
-            #TODO: find type in sonic-head, as of now, all are enumeration
-            elif 'stypes:' in type:
-                vValue = val
+                def _yangConvert(val):
+                    return int(str(val), 10)
+            else:
+                _yangConvert = str
+
+            if isleafList and separator is not None:
+                # e.g. port.adv_speeds in CONFIG DB has value "100,1000,10000",
+                # it shall be transferred to [100,1000,10000] as YANG value.
+                def converter(value):
+                    if isinstance(value, str):
+                        value = (x.strip() for x in value.split(separator))
+                    return [_yangConvert(v) for v in value]
+            elif isleafList:
+                def converter(value):
+                    return [_yangConvert(v) for v in value]
             else:
-                vValue = val
-            return vValue
-
-        # if it is a leaf-list do it for each element
-        if leafDict[key]['__isleafList']:
-            vValue = list()
-            if isinstance(value, str) and (self.elementPath[0], self.elementPath[-1]) in LEAF_LIST_WITH_STRING_VALUE_DICT:
-                # For field defined as leaf-list but has string value in CONFIG DB, need do special handling here. For exampe:
-                # port.adv_speeds in CONFIG DB has value "100,1000,10000", it shall be transferred to [100,1000,10000] as YANG value here to
-                # make it align with its YANG definition.
-                value = (x.strip() for x in value.split(LEAF_LIST_WITH_STRING_VALUE_DICT[(self.elementPath[0], self.elementPath[-1])]))
-            for v in value:
-                vValue.append(_yangConvert(v))
+                converter = _yangConvert
         else:
-            vValue = _yangConvert(value)
+            if isleafList and separator is not None:
+                # e.g. port.adv_speeds is [10,100,1000] in YANG, need to convert
+                # it into a string for CONFIG DB: "10,100,1000"
+                def converter(value):
+                    if isinstance(value, list):
+                        return separator.join(str(x) for x in value)
+                    return [str(v) for v in value]
+            elif isleafList:
+                def converter(value):
+                    return [str(v) for v in value]
+            elif type == 'boolean':
+                def converter(value):
+                    return 'true' if value else 'false'
+            else:
+                converter = str
+
+        self.typeConverters[ckey] = converter
+        return converter
+
+    def _createTypeConverters(self, model, table, reverse=False):
+        '''
+            Create a dict to map each field of a list or container of config
+            DB table to its converter, see _getTypeConverter(). This is done to
+            translate entries with a table driven loop.
+
+            Parameters:
+                model (dict): json format of yang list or container.
+                table (str): config DB table, this table is being translated.
+                reverse (bool): convert yang values to config DB values.
+
+            Returns:
+                 (dict): field name -> converter
+        '''
+        key = (self._getLeafDictKey(model, table), reverse)
+        converters = self.typeConverters.get(key)
+        if converters is None:
+            leafDict = self._createLeafDict(model, table)
+            converters = dict()
+            for field, leaf in leafDict.items():
+                converters[field] = self._getTypeConverter(table, field, leaf, reverse)
+            self.typeConverters[key] = converters
+        return converters
+
+    def _profileTable(self, table, stage, start):
+        '''
+            Account time spent in translation of a table, if profiling is enabled.
+
+            Parameters:
+                table (str): config DB table.
+                stage (str): 'xlate' or 'revXlate'.
+                start (float): time when the translation of the table started.
+
+            Returns:
+                void
+        '''
+        stats = self.profileStats.setdefault(table, {'xlate': 0.0, 'revXlate': 0.0})
+        stats[stage] += time.time() - start
+        return
+
+    def _logProfile(self, stage):
+        '''
+            Report time spent per table in a translation stage, slowest first.
+
+            Parameters:
+                stage (str): 'xlate' or 'revXlate'.
+
+            Returns:
+                void
+        '''
+        tables = sorted(self.profileStats.items(), key=lambda item: item[1][stage], reverse=True)
+        total = sum(stats[stage] for _, stats in tables)
+        self.sysLog(msg="{} profile: total {:.6f}s".format(stage, total), doPrint=True)
+        for table, stats in tables:
+            if stats[stage]:
+                self.sysLog(msg="{} profile: {} {:.6f}s".format(stage, table, stats[stage]), doPrint=True)
+        return
+
+    def _createLeafDicts(self):
+        '''
+            Create leafDicts of containers and lists of all config DB tables,
+            so that they are stored in the yang model bundle.
+
+            Returns:
+                void
+        '''
+        for table, cmap in self.confDbYangMap.items():
+            # common yang modules are stored without container
+            if cmap.get('container') is None:
+                continue
+            models = [cmap['container']]
+            while models:
+                model = models.pop()
+                try:
+                    self._createLeafDict(model, table)
+                except Exception:
+                    # translation of this table will report it
+                    continue
+                for section in ['list', 'container']:
+                    children = model.get(section)
+                    if isinstance(children, dict):
+                        children = [children]
+                    models.extend(children or [])
+        return
+
+    """
+    Convert a string from Config DB value to Yang Value based on type of the
+    key in Yang model.
+    @model : A List of Leafs in Yang model list
+    """
+    def _findYangTypedValue(self, key, value, leafDict):
 
-        return vValue
+        # convert config DB string to yang Type
+        return self._getTypeConverter(self.elementPath[0], key, leafDict[key])(value)
 
     """
     Xlate a Type 1 map list
@@ -557,7 +840,7 @@ class SonicYangExtMixin:
         #This is done to improve performance of mapping from values of TABLEs in
         #config DB to leaf in YANG LIST.
 
-        leafDict = self._createLeafDict(model, table)
+        converters = self._createTypeConverters(model, table)
         # get keys from YANG model list itself
         listKeys = model['key']['@value']
         self.sysLog(msg="xlateList keyList:{}".format(listKeys))
@@ -565,20 +848,14 @@ class SonicYangExtMixin:
         for pkey in primaryKeys:
             try:
                 self.elementPath.append(pkey)
-                vKey = None
                 self.sysLog(syslog.LOG_DEBUG, "xlateList Extract pkey:{}".\
                     format(pkey))
                 # Find and extracts key from each dict in config
                 keyDict = self._extractKey(pkey, listKeys)
-                # fill rest of the values in keyDict
-                for vKey in config[pkey]:
-                    self.elementPath.append(vKey)
-                    self.sysLog(syslog.LOG_DEBUG, "xlateList vkey {}".format(vKey))
-                    try:
-                        keyDict[vKey] = self._findYangTypedValue(vKey, \
-                                            config[pkey][vKey], leafDict)
-                    finally:
-                        self.elementPath.pop()
+                # fill rest of the values in keyDict, a field without leaf
+                # raises KeyError
+                for vKey, vValue in config[pkey].items():
+                    keyDict[vKey] = converters[vKey](vValue)
                 yang.append(keyDict)
                 # delete pkey from config, done to match one key with one list
                 del config[pkey]
@@ -675,15 +952,13 @@ class SonicYangExtMixin:
                 self._xlateContainerInContainer(modelContainer, yang, configC, table)
 
         ## Handle other leaves in container,
-        leafDict = self._createLeafDict(model, table)
+        converters = self._createTypeConverters(model, table)
         vKeys = list(configC.keys())
         for vKey in vKeys:
             #vkey must be a leaf\leaf-list\choice in container
-            if leafDict.get(vKey):
-                self.elementPath.append(vKey)
-                self.sysLog(syslog.LOG_DEBUG, "xlateContainer vkey {}".format(vKey))
-                yang[vKey] = self._findYangTypedValue(vKey, configC[vKey], leafDict)
-                self.elementPath.pop()
+            converter = converters.get(vKey)
+            if converter is not None:
+                yang[vKey] = converter(configC[vKey])
                 # delete entry from copy of config
                 del configC[vKey]
 
@@ -705,6 +980,8 @@ class SonicYangExtMixin:
 
         # find top level container for each table, and run the xlate_container.
         for table in jIn.keys():
+            if self.profile:
+                start = time.time()
             cmap = self.confDbYangMap[table]
             # create top level containers
             key = cmap['module']+":"+cmap['topLevelContainer']
@@ -717,6 +994,11 @@ class SonicYangExtMixin:
             self._xlateContainer(cmap['container'], yangJ[key][subkey], \
                                 jIn[table], table)
             self.elementPath = []
+            if self.profile:
+                self._profileTable(table, 'xlate', start)
+
+        if self.profile:
+            self._logProfile('xlate')
 
         return
 
@@ -767,26 +1049,7 @@ class SonicYangExtMixin:
     def _revFindYangTypedValue(self, key, value, leafDict):
 
         # convert yang Type to config DB string
-        def _revYangConvert(val):
-            # config DB has only strings, thank god for that :), wait not yet!!!
-            return str(val)
-
-        # if it is a leaf-list do it for each element
-        if leafDict[key]['__isleafList']:
-            if isinstance(value, list) and (self.elementPath[0], self.elementPath[-1]) in LEAF_LIST_WITH_STRING_VALUE_DICT:
-                # For field defined as leaf-list but has string value in CONFIG DB, we need do special handling here:
-                # e.g. port.adv_speeds is [10,100,1000] in YANG, need to convert it into a string for CONFIG DB: "10,100,1000"
-                vValue = LEAF_LIST_WITH_STRING_VALUE_DICT[(self.elementPath[0], self.elementPath[-1])].join((_revYangConvert(x) for x in value))
-            else:
-                vValue = list()
-                for v in value:
-                    vValue.append(_revYangConvert(v))
-        elif leafDict[key]['type']['@name'] == 'boolean':
-            vValue = 'true' if value else 'false'
-        else:
-            vValue = _revYangConvert(value)
-
-        return vValue
+        return self._getTypeConverter(self.elementPath[0], key, leafDict[key], reverse=True)(value)
 
     """
     Rev xlate from <TABLE>_LIST to table in config DB
@@ -881,7 +1144,7 @@ class SonicYangExtMixin:
         # create a dict to map each key under primary key with a dict yang model.
         # This is done to improve performance of mapping from values of TABLEs in
         # config DB to leaf in YANG LIST.
-        leafDict = self._createLeafDict(model, table)
+        converters = self._createTypeConverters(model, table, reverse=True)
 
         # list with name <NAME>_LIST should be removed,
         if "_LIST" in model['@name']:
@@ -889,16 +1152,9 @@ class SonicYangExtMixin:
                 # create key of config DB table
                 pkey, pkeydict = self._createKey(entry, listKeys)
                 self.sysLog(syslog.LOG_DEBUG, "revXlateList pkey:{}".format(pkey))
-                self.elementPath.append(pkey)
-                config[pkey]= dict()
                 # fill rest of the entries
-                for key in entry:
-                    if key not in pkeydict:
-                        self.elementPath.append(key)
-                        config[pkey][key] = self._revFindYangTypedValue(key, \
-                            entry[key], leafDict)
-                        self.elementPath.pop()
-                self.elementPath.pop()
+                config[pkey] = {key: converters[key](value) \
+                    for key, value in entry.items() if key not in pkeydict}
 
         return
 
@@ -952,14 +1208,12 @@ class SonicYangExtMixin:
                 self._revXlateContainerInContainer(modelContainer, yang, config, table)
 
         ## Handle other leaves in container,
-        leafDict = self._createLeafDict(model, table)
+        converters = self._createTypeConverters(model, table, reverse=True)
         for vKey in yang:
             #vkey must be a leaf\leaf-list\choice in container
-            if leafDict.get(vKey):
-                self.sysLog(syslog.LOG_DEBUG, "revXlateContainer vkey {}".format(vKey))
-                self.elementPath.append(vKey)
-                config[vKey] = self._revFindYangTypedValue(vKey, yang[vKey], leafDict)
-                self.elementPath.pop()
+            converter = converters.get(vKey)
+            if converter is not None:
+                config[vKey] = converter(yang[vKey])
 
         return
 
@@ -982,6 +1236,8 @@ class SonicYangExtMixin:
                 if len(names) > 2:
                     raise SonicYangException("Invalid Yang data file structure")
                 table = names[0] if len(names) == 1 else names[1]
+                if self.profile:
+                    start = time.time()
                 #print("revXlate " + table)
                 cmap = self.confDbYangMap[table]
                 cDbJson[table] = dict()
@@ -991,6 +1247,11 @@ class SonicYangExtMixin:
                 self._revXlateContainer(cmap['container'], yangJ[module_top][container], \
                     cDbJson[table], table)
                 self.elementPath = []
+                if self.profile:
+                    self._profileTable(table, 'revXlate', start)
+
+        if self.profile:
+            self._logProfile('revXlate')
 
         return
 
@@ -1124,6 +1385,192 @@ class SonicYangExtMixin:
 
        return True
 
+    """
+    Find xpath and yang model (list or container) of an entry of a config DB
+    table. The model must have leafs for all fields.
+    Returns (None, None) if the entry can't be updated in the data tree in
+    place, i.e. it needs a full translation.
+    """
+    def _findXpathEntry(self, table, key, fields):
+
+        module, topc, container = self._getModuleTLCcontainer(table)
+        xpath = "/" + module + ":" + topc + "/" + container['@name']
+        clist = container.get('list')
+        # entries are containers in the table container
+        if clist is None:
+            ccontainer = container.get('container')
+            if isinstance(ccontainer, dict):
+                ccontainer = [ccontainer]
+            for model in ccontainer or []:
+                if model['@name'] == key and \
+                   all(field in self._createLeafDict(model, table) for field in fields):
+                    return xpath + "/" + key, model
+            return None, None
+
+        # entries are in a list or in one of multiple lists
+        if isinstance(clist, dict):
+            clist = [clist]
+        keyValues = [value.strip() for value in key.split("|")]
+        for model in clist:
+            if model['@name'] in Type_1_list_maps_model:
+                return None, None
+            if len(model['key']['@value'].split()) != len(keyValues):
+                continue
+            leafDict = self._createLeafDict(model, table)
+            if all(field in leafDict for field in fields):
+                return self._findXpathList(xpath, model, keyValues), model
+        return None, None
+
+    """
+    Update an entry of config DB table in the data tree.
+    entryXpath, model: from _findXpathEntry()
+    fields: {field: value} to set in the entry, value None deletes the field,
+            fields is None to delete the entry
+    dependencies: filled with (xpath, [leafref dependents]) of leafs which
+                  are deleted or changed
+    """
+    def _updateDataEntry(self, table, key, entryXpath, model, fields, dependencies):
+
+        node = self._find_data_node(entryXpath)
+        listKeys = model['key']['@value'].split() if model.get('key') else []
+        if fields is None:
+            if node is not None:
+                for listKey in listKeys:
+                    leafXpath = entryXpath + "/" + listKey
+                    dependencies.append((leafXpath, self.find_data_dependencies(leafXpath)))
+                node.unlink()
+            return
+
+        if node is None:
+            self.root.new_path(self.ctx, entryXpath, None, 0, 0)
+        leafDict = self._createLeafDict(model, table)
+        for field, value in fields.items():
+            if field in listKeys:
+                continue
+            leafXpath = entryXpath + "/" + field
+            if not leafDict[field]['__isleafList'] and \
+               self._find_data_node(leafXpath) is not None:
+                dependencies.append((leafXpath, self.find_data_dependencies(leafXpath)))
+            # remove current leaf or all current leaf-list entries
+            nodeSet = self.root.find_path(leafXpath)
+            if nodeSet is not None:
+                for leaf in nodeSet.data():
+                    leaf.unlink()
+            if value is None:
+                continue
+            self.elementPath = [table, key, field]
+            try:
+                vValue = self._findYangTypedValue(field, value, leafDict)
+            finally:
+                self.elementPath = []
+            for v in (vValue if isinstance(vValue, list) else [vValue]):
+                self.root.new_path(self.ctx, leafXpath, str(v), 0, 0)
+
+        return
+
+    """
+    Check that leafref dependents of deleted or changed leafs still refer to
+    an existing value.
+    dependencies: list of (xpath, [leafref dependents]) from _updateDataEntry()
+    """
+    def _checkDataDependencies(self, dependencies):
+
+        dangling = list()
+        for xpath, refs in dependencies:
+            value = self._find_data_node_value(xpath) \
+                if self._find_data_node(xpath) is not None else None
+            for ref in refs:
+                if self._find_data_node(ref) is None:
+                    continue
+                if value is None or self._find_data_node_value(ref) != value:
+                    dangling.append(ref)
+        if len(dangling):
+            raise Exception("Leafref dependents refer to deleted values: {}".\
+                format(dangling))
+
+        return
+
+    """
+    Update data: apply a config DB diff to the loaded data tree and validate
+    it. (Public)
+    Only the entries in the diff are translated and changed in the data tree,
+    instead of translating and loading the whole config as loadData() does.
+    Leafref dependents of the deleted or changed leafs are checked, then the
+    whole data tree is validated.
+    input:    configdbDiff - {table: {key: {field: value}}}, a key with value
+              None deletes the entry, a field with value None deletes the field,
+              other fields are set and fields not in the diff are kept.
+    returns:  True - success. SonicYangException is raised on failure, the data
+              tree is loaded again with the config before the diff then.
+    """
+    def updateData(self, configdbDiff):
+
+        if self.root is None:
+            raise SonicYangException("Data Update Failed\nData tree is not loaded")
+        # entries before the diff, to restore the config on failure
+        oldEntries = list()
+        try:
+            updates = list()
+            incremental = True
+            for table, entries in configdbDiff.items():
+                config = self.jIn if table in self.confDbYangMap else self.tablesWithOutYang
+                for key, fields in entries.items():
+                    oldEntry = config.get(table, dict()).get(key)
+                    oldEntries.append((config, table, key, deepcopy(oldEntry)))
+                    if fields is None:
+                        config.get(table, dict()).pop(key, None)
+                        if table in config and len(config[table]) == 0:
+                            del config[table]
+                    else:
+                        entry = config.setdefault(table, dict()).setdefault(key, dict())
+                        for field, value in fields.items():
+                            if value is None:
+                                entry.pop(field, None)
+                            else:
+                                entry[field] = value
+                    if config is self.tablesWithOutYang or not incremental:
+                        continue
+                    # changed fields and fields remaining in the entry must be in the model
+                    entryFields = set(fields or dict()) | set(oldEntry or dict())
+                    entryXpath, model = self._findXpathEntry(table, key, entryFields)
+                    if entryXpath is None:
+                        incremental = False
+                    updates.append((table, key, entryXpath, model, fields))
+
+            if not incremental:
+                self.sysLog(msg="updateData: diff needs full translation")
+                config = dict(self.jIn)
+                config.update(self.tablesWithOutYang)
+                return self.loadData(config)
+
+            dependencies = list()
+            for table, key, entryXpath, model, fields in updates:
+                self.sysLog(syslog.LOG_DEBUG, "updateData {}".format(entryXpath))
+                self._updateDataEntry(table, key, entryXpath, model, fields, dependencies)
+            self._checkDataDependencies(dependencies)
+            self._validate_data(self.root, self.ctx)
+
+        except Exception as e:
+            self.sysLog(msg="Data Update Failed:{}".format(str(e)), \
+                debug=syslog.LOG_ERR, doPrint=True)
+            # restore config before the diff and load it again
+            for config, table, key, oldEntry in reversed(oldEntries):
+                if oldEntry is None:
+                    config.get(table, dict()).pop(key, None)
+                    if table in config and len(config[table]) == 0:
+                        del config[table]
+                else:
+                    config.setdefault(table, dict())[key] = oldEntry
+            config = dict(self.jIn)
+            config.update(self.tablesWithOutYang)
+            try:
+                self.loadData(config)
+            except SonicYangException:
+                pass
+            raise SonicYangException("Data Update Failed\n{}".format(str(e)))
+
+        return True
+
     """
     Get data from Data tree, data tree will be assigned in self.xlateJson. (Public)
     """
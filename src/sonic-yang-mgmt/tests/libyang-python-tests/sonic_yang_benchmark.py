@@ -0,0 +1,93 @@
+"""
+Benchmark of loadData() vs updateData() of config DB with SONiC YANG
+models. Run as a script to print timings for a large config:
+
+    python tests/libyang-python-tests/sonic_yang_benchmark.py --ports 512
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+modules_path = os.path.dirname(os.path.dirname(test_path))
+sys.path.insert(0, modules_path)
+
+import sonic_yang as sy
+
+YANG_DIR = "/usr/local/yang-models/"
+
+
+def generate_config(ports):
+    config = {
+        "DEVICE_METADATA": {
+            "localhost": {
+                "hostname": "sonic",
+                "hwsku": "Force10-S6000",
+                "mac": "00:11:22:33:44:55",
+                "platform": "x86_64-dell_s6000_s1220-r0",
+                "type": "ToRRouter",
+                "bgp_asn": "65100"
+            }
+        },
+        "PORT": {},
+        "VLAN": {
+            "Vlan1000": {"vlanid": "1000"}
+        },
+        "VLAN_MEMBER": {}
+    }
+    for i in range(ports):
+        name = "Ethernet{}".format(i * 4)
+        config["PORT"][name] = {
+            "alias": "etp{}".format(i + 1),
+            "lanes": ",".join(str(i * 4 + lane) for lane in range(4)),
+            "speed": "100000",
+            "mtu": "9100",
+            "admin_status": "up",
+            "index": str(i)
+        }
+        config["VLAN_MEMBER"]["Vlan1000|{}".format(name)] = {"tagging_mode": "untagged"}
+    return config
+
+
+def run(ports, iterations, yang_dir=YANG_DIR):
+    syc = sy.SonicYang(yang_dir, print_log_enabled=False)
+    syc.loadYangModel()
+    config = generate_config(ports)
+    port = "Ethernet{}".format((ports - 1) * 4)
+
+    full = list()
+    for i in range(iterations):
+        config["PORT"][port]["mtu"] = str(9000 + i)
+        start = time.time()
+        syc.loadData(json.loads(json.dumps(config)))
+        syc.validate_data_tree()
+        full.append(time.time() - start)
+
+    incremental = list()
+    for i in range(iterations):
+        start = time.time()
+        syc.updateData({"PORT": {port: {"mtu": str(8000 + i)}}})
+        incremental.append(time.time() - start)
+
+    assert syc.getData()["PORT"][port]["mtu"] == str(8000 + iterations - 1)
+    return {
+        "ports": ports,
+        "iterations": iterations,
+        "full_mean": sum(full) / len(full),
+        "incremental_mean": sum(incremental) / len(incremental)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loadData vs updateData of SONiC YANG")
+    parser.add_argument("--ports", type=int, default=512)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--yang-dir", default=YANG_DIR)
+    args = parser.parse_args()
+    print(json.dumps(run(args.ports, args.iterations, args.yang_dir), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ import sonic_yang as sy
 import json
 import glob
 import logging
+import shutil
+import tempfile
+from unittest import mock
 from ijson import items as ijson_itmes
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -381,5 +384,105 @@ class Test_SonicYang(object):
 
         return
 
+    def test_translation_profile(self, sonic_yang_data):
+        # in this test, time spent in translation is reported per table
+        test_file = sonic_yang_data['test_file']
+        syc = sy.SonicYang(sonic_yang_data['yang_dir'], profile=True)
+        syc.loadYangModel()
+
+        jIn = json.loads(self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON'))
+        syc.loadData(jIn)
+        syc.getData()
+        assert syc.profileStats['PORT']['xlate'] > 0
+        assert syc.profileStats['PORT']['revXlate'] > 0
+        # converters are memoized per table and field
+        mtu = syc.leafDicts[('PORT', 'PORT_LIST', True)]['mtu']
+        assert ('PORT', 'mtu', mtu['type']['@name'], False, False) in syc.typeConverters
+
+        return
+
+    def test_update_data(self, sonic_yang_data):
+        # in this test, a config DB diff is applied to the loaded data tree
+        test_file = sonic_yang_data['test_file']
+        syc = sonic_yang_data['syc']
+
+        jIn = self.readIjsonInput(test_file, 'SAMPLE_CONFIG_DB_JSON')
+        syc.loadData(json.loads(jIn))
+
+        # set fields of list and container entries, delete an entry
+        syc.updateData({
+            'PORT': {'Ethernet0': {'mtu': '9000', 'description': None}},
+            'DEVICE_METADATA': {'localhost': {'hostname': 'asw.dc2'}},
+            'VLAN_MEMBER': {'Vlan111|Ethernet0': None}
+        })
+        config = syc.getData()
+        assert config['PORT']['Ethernet0']['mtu'] == '9000'
+        assert 'description' not in config['PORT']['Ethernet0']
+        assert config['DEVICE_METADATA']['localhost']['hostname'] == 'asw.dc2'
+        assert 'Vlan111|Ethernet0' not in config['VLAN_MEMBER']
+
+        # a port referenced by VLAN_MEMBER can't be deleted, data tree is restored
+        with pytest.raises(sy.SonicYangException):
+            syc.updateData({'PORT': {'Ethernet1': None}})
+        config = syc.getData()
+        assert 'Ethernet1' in config['PORT']
+        assert config['PORT']['Ethernet0']['mtu'] == '9000'
+
+        # invalid value, data tree is restored
+        with pytest.raises(sy.SonicYangException):
+            syc.updateData({'PORT': {'Ethernet0': {'mtu': 'invalid'}}})
+        assert syc.getData()['PORT']['Ethernet0']['mtu'] == '9000'
+
+        return
+
+    def test_yang_model_bundle(self, sonic_yang_data):
+        # in this test, yang models are loaded from the cached bundle, and the
+        # bundle is invalidated when a yang model file changes
+        cache_dir = tempfile.mkdtemp()
+        yang_dir = tempfile.mkdtemp()
+        try:
+            for file in glob.glob(sonic_yang_data['yang_dir'] + "/*.yang"):
+                shutil.copy(file, yang_dir)
+
+            syc = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+            syc.loadYangModel()
+            assert len(os.listdir(cache_dir)) == 1
+
+            cached = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+            cached.loadYangModel()
+            assert len(os.listdir(cache_dir)) == 1
+            assert cached.yJson == syc.yJson
+            assert cached.confDbYangMap == syc.confDbYangMap
+            assert cached.leafDicts == syc.leafDicts
+            # objects shared by the map and yang JSON remain shared
+            for cmap in cached.confDbYangMap.values():
+                if cmap.get('yangModule') is not None:
+                    assert any(cmap['yangModule'] is j['module'] for j in cached.yJson)
+
+            # data is translated and validated with the cached bundle
+            jIn = json.loads(self.readIjsonInput(sonic_yang_data['test_file'], 'SAMPLE_CONFIG_DB_JSON'))
+            cached.loadData(jIn)
+            cached.validate_data_tree()
+
+            # a change of a yang model file creates a new bundle
+            with open(glob.glob(yang_dir + "/*.yang")[0], 'a') as f:
+                f.write("\n")
+            changed = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+            changed.loadYangModel()
+            assert len(os.listdir(cache_dir)) == 2
+
+            # a bundle in a directory writable by others is not loaded
+            os.chmod(cache_dir, 0o777)
+            insecure = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+            with mock.patch('sonic_yang_ext.pickle.load') as mock_load:
+                insecure.loadYangModel()
+                mock_load.assert_not_called()
+            assert insecure.confDbYangMap == changed.confDbYangMap
+        finally:
+            shutil.rmtree(cache_dir)
+            shutil.rmtree(yang_dir)
+
+        return
+
     def teardown_class(self):
         pass
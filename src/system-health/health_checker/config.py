@@ -12,6 +12,17 @@ class Config(object):
     # Default system health check interval
     DEFAULT_INTERVAL = 60
 
+    # Default check interval of checkers, checkers not listed here use the system health check interval. Can be
+    # overridden by "checker_intervals" in the configuration file.
+    DEFAULT_CHECKER_INTERVALS = {
+        'ServiceChecker': 10,
+        'HardwareChecker': 60
+    }
+
+    # Default time a checker may take for one check. Can be overridden per checker by "checker_timeouts" in the
+    # configuration file.
+    DEFAULT_CHECKER_TIMEOUT = 60
+
     # Default boot up timeout. When reboot system, system health will wait a few seconds before starting to work.
     DEFAULT_BOOTUP_TIMEOUT = 300
 
@@ -44,6 +55,8 @@ class Config(object):
         self.ignore_services = None
         self.ignore_devices = None
         self.user_defined_checkers = None
+        self.checker_intervals = None
+        self.checker_timeouts = None
 
     def config_file_exists(self):
         return os.path.exists(self._config_file)
@@ -72,6 +85,8 @@ class Config(object):
                 self.ignore_services = self._get_list_data('services_to_ignore')
                 self.ignore_devices = self._get_list_data('devices_to_ignore')
                 self.user_defined_checkers = self._get_list_data('user_defined_checkers')
+                self.checker_intervals = self._get_dict_data('checker_intervals')
+                self.checker_timeouts = self._get_dict_data('checker_timeouts')
             except Exception as e:
                 self._reset()
 
@@ -86,6 +101,30 @@ class Config(object):
         self.ignore_services = None
         self.ignore_devices = None
         self.user_defined_checkers = None
+        self.checker_intervals = None
+        self.checker_timeouts = None
+
+    def get_checker_interval(self, checker_name):
+        """
+        Get check interval of a checker.
+        :param checker_name: Checker class name, e.g. ServiceChecker
+        :return: Interval in seconds
+        """
+        if self.checker_intervals and checker_name in self.checker_intervals:
+            return self.checker_intervals[checker_name]
+
+        return self.DEFAULT_CHECKER_INTERVALS.get(checker_name, self.interval)
+
+    def get_checker_timeout(self, checker_name):
+        """
+        Get the maximum time of one check of a checker.
+        :param checker_name: Checker class name, e.g. ServiceChecker
+        :return: Timeout in seconds
+        """
+        if self.checker_timeouts and checker_name in self.checker_timeouts:
+            return self.checker_timeouts[checker_name]
+
+        return self.DEFAULT_CHECKER_TIMEOUT
 
     def get_led_color(self, status):
         """
@@ -142,3 +181,15 @@ class Config(object):
             if isinstance(data, list):
                 return set(data)
         return None
+
+    def _get_dict_data(self, key):
+        """
+        Get dictionary type configuration data by key.
+        :param key: Key of the configuration entry
+        :return: A dictionary of configuration data if key exists
+        """
+        if key in self.config_data:
+            data = self.config_data[key]
+            if isinstance(data, dict):
+                return data
+        return None
@@ -1,3 +1,7 @@
+import concurrent.futures
+import copy
+import time
+
 from .config import Config
 from .health_checker import HealthChecker
 from .service_checker import ServiceChecker
@@ -8,10 +12,27 @@ from . import utils
 
 class HealthCheckerManager(object):
     """
-    Manage all system health checkers and system health configuration.
+    Manage all system health checkers and system health configuration. Checkers run concurrently on a worker pool,
+    each of them with its own check interval and timeout.
     """
+    # Maximum number of checkers running at the same time
+    MAX_WORKERS = 8
+
+    # A checker is due if its next check time is less than this number of seconds ahead
+    CHECK_TIME_TOLERANCE = 1
+
     def __init__(self):
         self._checkers = []
+        self._user_defined_checkers = {}
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=HealthCheckerManager.MAX_WORKERS)
+        # Running checks, checker -> (future, start time)
+        self._running = {}
+        # Time of the next check, checker -> time
+        self._next_check_time = {}
+        # Result of the last finished check, checker -> (category, info, exception)
+        self._results = {}
+        # Statistic of the last finished check, checker name -> {'duration': ..., 'last_check': ...}
+        self._checker_stats = {}
         self.config = Config()
         self.initialize()
 
@@ -25,43 +46,122 @@ class HealthCheckerManager(object):
 
     def check(self, chassis):
         """
-        Load new configuration if any and perform the system health check for all existing checkers.
+        Load new configuration if any and perform the system health check for all checkers which are due. Results of
+        the other checkers are taken from their last check.
         :param chassis: A chassis object.
         :return: A dictionary that contains the status for all objects that was checked.
         """
-        HealthChecker.summary = HealthChecker.STATUS_OK
-        stats = {}
         self.config.load_config()
+        checkers = self._checkers + self._get_user_defined_checkers()
+
+        now = time.time()
+        for checker in checkers:
+            # A checker which is still running, i.e. timed out, is not started again until it finishes
+            if checker in self._running:
+                continue
+            if self._next_check_time.get(checker, 0) > now + HealthCheckerManager.CHECK_TIME_TOLERANCE:
+                continue
+            self._next_check_time[checker] = now + self.config.get_checker_interval(self._get_checker_name(checker))
+            self._running[checker] = (self._executor.submit(self._run_check, checker), now)
 
-        for checker in self._checkers:
+        for checker, (future, start) in list(self._running.items()):
+            timeout = self.config.get_checker_timeout(self._get_checker_name(checker))
+            try:
+                future.result(timeout=max(start + timeout - time.time(), 0))
+            except concurrent.futures.TimeoutError:
+                continue
+            del self._running[checker]
+
+        stats = {}
+        for checker in checkers:
             self._do_check(checker, stats)
 
-        if self.config.user_defined_checkers:
-            for udc in self.config.user_defined_checkers:
-                checker = UserDefinedChecker(udc)
-                self._do_check(checker, stats)
+        HealthChecker.summary = HealthChecker.STATUS_OK
+        for info in stats.values():
+            for obj_data in info.values():
+                if obj_data.get(HealthChecker.INFO_FIELD_OBJECT_STATUS) == HealthChecker.STATUS_NOT_OK:
+                    HealthChecker.summary = HealthChecker.STATUS_NOT_OK
 
         self._set_system_led(chassis)
         return stats
 
-    def _do_check(self, checker, stats):
+    def get_check_interval(self):
+        """
+        Get the interval to call check(), i.e. the shortest check interval of all checkers.
+        :return: Interval in seconds
+        """
+        checkers = self._checkers + list(self._user_defined_checkers.values())
+        return min([self.config.get_checker_interval(self._get_checker_name(checker)) for checker in checkers] +
+                   [self.config.interval])
+
+    def get_checker_stats(self):
+        """
+        Get statistic of the last finished check of each checker.
+        :return: A dictionary, checker name -> {'duration': seconds, 'last_check': time}
+        """
+        return copy.deepcopy(self._checker_stats)
+
+    def _get_user_defined_checkers(self):
         """
-        Do check for a particular checker and collect the check statistic.
+        Get user defined checkers of current configuration, a checker is kept as long as it's configured.
+        :return: A list of user defined checkers.
+        """
+        udcs = self.config.user_defined_checkers or set()
+        for udc in list(self._user_defined_checkers):
+            if udc not in udcs and self._user_defined_checkers[udc] not in self._running:
+                checker = self._user_defined_checkers.pop(udc)
+                self._next_check_time.pop(checker, None)
+                self._results.pop(checker, None)
+                self._checker_stats.pop(str(checker), None)
+        for udc in sorted(udcs):
+            if udc not in self._user_defined_checkers:
+                self._user_defined_checkers[udc] = UserDefinedChecker(udc)
+        return [self._user_defined_checkers[udc] for udc in sorted(udcs)]
+
+    @staticmethod
+    def _get_checker_name(checker):
+        return checker.__class__.__name__
+
+    def _run_check(self, checker):
+        """
+        Do check for a particular checker in a worker thread and store the result.
         :param checker: A checker object.
-        :param stats: Check statistic.
         :return:
         """
+        begin = time.time()
         try:
             checker.check(self.config)
-            category = checker.get_category()
-            info = checker.get_info()
-            if category not in stats:
-                stats[category] = info
+            result = (checker.get_category(), copy.deepcopy(checker.get_info()), None)
+        except Exception as e:
+            result = (None, None, e)
+        self._results[checker] = result
+        self._checker_stats[str(checker)] = {
+            'duration': time.time() - begin,
+            'last_check': begin
+        }
+
+    def _do_check(self, checker, stats):
+        """
+        Collect the check statistic of a particular checker.
+        :param checker: A checker object.
+        :param stats: Check statistic.
+        :return:
+        """
+        error_msg = None
+        if checker in self._results:
+            category, info, e = self._results[checker]
+            if e is not None:
+                error_msg = 'Failed to perform health check for {} due to exception - {}'.format(checker, repr(e))
+            elif category not in stats:
+                stats[category] = dict(info)
             else:
                 stats[category].update(info)
-        except Exception as e:
-            HealthChecker.summary = HealthChecker.STATUS_NOT_OK
-            error_msg = 'Failed to perform health check for {} due to exception - {}'.format(checker, repr(e))
+
+        if checker in self._running:
+            timeout = self.config.get_checker_timeout(self._get_checker_name(checker))
+            error_msg = 'Health check for {} did not finish in {} seconds'.format(checker, timeout)
+
+        if error_msg:
             entry = {str(checker): {
                 HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
                 HealthChecker.INFO_FIELD_OBJECT_MSG: error_msg,
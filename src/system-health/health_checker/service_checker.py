@@ -2,6 +2,7 @@ import docker
 import os
 import pickle
 import re
+import time
 
 from swsscommon import swsscommon
 from sonic_py_common import multi_asic, device_info
@@ -31,6 +32,13 @@ class ServiceChecker(HealthChecker):
     # Command to query the status of monit service.
     CHECK_MONIT_SERVICE_CMD = 'systemctl is-active monit.service'
 
+    # Table in STATE_DB with the supervisor state of the processes of each container. It is written by
+    # supervisor-proc-exit-listener of the container, which refreshes the field update_time periodically.
+    PROCESS_STATE_TABLE = 'PROCESS_STATE'
+    PROCESS_STATE_UPDATE_TIME_FIELD = 'update_time'
+    # An entry not refreshed in this time is ignored, and the processes are queried by docker exec
+    PROCESS_STATE_STALE_TIMEOUT = 120
+
     # Command to get summary of critical system service.
     CHECK_CMD = 'monit summary -B'
     MIN_CHECK_CMD_LINES = 3
@@ -55,6 +63,13 @@ class ServiceChecker(HealthChecker):
 
         self.config_db = None
 
+        # Subscription to PROCESS_STATE table and the process states received from it
+        self.process_state_subscribers = None
+        self.process_state_select = None
+        self.process_states = {}
+
+        self.current_running_containers = set()
+
         self.load_critical_process_cache()
 
         self.events_handle = swsscommon.events_init_publisher(EVENTS_PUBLISHER_SOURCE)
@@ -276,6 +291,8 @@ class ServiceChecker(HealthChecker):
         feature_table = self.config_db.get_table("FEATURE")
         expected_running_containers, self.container_feature_dict = self.get_expected_running_containers(feature_table)
         current_running_containers = self.get_current_running_containers()
+        self.current_running_containers = current_running_containers
+        self.update_process_states()
 
         newly_disabled_containers = set(self.container_critical_processes.keys()).difference(expected_running_containers)
         for newly_disabled_container in newly_disabled_containers:
@@ -328,6 +345,78 @@ class ServiceChecker(HealthChecker):
             data[items[0].strip()] = items[1].strip()
         return data
 
+    def _subscribe_process_state(self):
+        """Subscribe to PROCESS_STATE table of STATE_DB of all namespaces. The existing entries are
+        received as the first notifications.
+        """
+        self.process_state_select = swsscommon.Select()
+        self.process_state_subscribers = []
+        namespaces = set(multi_asic.get_namespace_list()) | {multi_asic.DEFAULT_NAMESPACE}
+        for namespace in namespaces:
+            db = swsscommon.DBConnector("STATE_DB", 0, False, namespace)
+            subscriber = swsscommon.SubscriberStateTable(db, ServiceChecker.PROCESS_STATE_TABLE)
+            self.process_state_select.addSelectable(subscriber)
+            self.process_state_subscribers.append((db, subscriber))
+
+    def update_process_states(self):
+        """Apply pending notifications of PROCESS_STATE table to self.process_states. On failure the
+        process states are dropped, so the processes are queried by docker exec until the subscription
+        is restored on the next check.
+        """
+        try:
+            if self.process_state_subscribers is None:
+                self._subscribe_process_state()
+
+            while True:
+                state, _ = self.process_state_select.select(0)
+                if state != swsscommon.Select.OBJECT:
+                    break
+                for _, subscriber in self.process_state_subscribers:
+                    while True:
+                        key, op, fvs = subscriber.pop()
+                        if not key:
+                            break
+                        if op == 'SET':
+                            self.process_states[key] = dict(fvs)
+                        elif op == 'DEL':
+                            self.process_states.pop(key, None)
+        except Exception as e:
+            logger.log_warning('Failed to read {} table: {}'.format(ServiceChecker.PROCESS_STATE_TABLE, e))
+            self.process_state_subscribers = None
+            self.process_state_select = None
+            self.process_states = {}
+
+    def _get_process_status(self, container_name):
+        """Get the supervisor state of the processes of a container. The state from PROCESS_STATE table
+        is used if the container is running and its entry is up to date, otherwise the state is queried
+        by supervisorctl in the container.
+
+        Args:
+            container_name (str): Container name
+
+        Returns:
+            dict: process name -> process state, None if the state is not available
+        """
+        entry = self.process_states.get(container_name)
+        if entry and container_name in self.current_running_containers:
+            try:
+                update_time = int(entry.get(ServiceChecker.PROCESS_STATE_UPDATE_TIME_FIELD, 0))
+            except ValueError:
+                update_time = 0
+            if time.time() - update_time < ServiceChecker.PROCESS_STATE_STALE_TIMEOUT:
+                return {name: state for name, state in entry.items()
+                        if name != ServiceChecker.PROCESS_STATE_UPDATE_TIME_FIELD}
+
+        # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
+        # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
+        # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
+        cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
+        process_status = utils.run_command(cmd)
+        if process_status is None:
+            return None
+
+        return self._parse_supervisorctl_status(process_status.strip().splitlines())
+
     def publish_events(self, container_name, critical_process_list):
         params = swsscommon.FieldValueMap()
         params["ctr_name"] = container_name
@@ -351,18 +440,13 @@ class ServiceChecker(HealthChecker):
             if ("state" in feature_table[feature_name]
                     and feature_table[feature_name]["state"] not in ["disabled", "always_disabled"]):
 
-                # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
-                # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
-                # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
-                cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
-                process_status = utils.run_command(cmd)
+                process_status = self._get_process_status(container_name)
                 if process_status is None:
                     for process_name in critical_process_list:
                         self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
                     self.publish_events(container_name, critical_process_list)
                     return
 
-                process_status = self._parse_supervisorctl_status(process_status.strip().splitlines())
                 for process_name in critical_process_list:
                     if config and config.ignore_services and process_name in config.ignore_services:
                         continue
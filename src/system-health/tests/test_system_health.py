@@ -12,6 +12,7 @@
 import copy
 import os
 import sys
+import time
 from imp import load_source
 from swsscommon import swsscommon
 
@@ -250,6 +251,55 @@ def test_service_checker_no_critical_process(mock_get_table, mock_docker_client)
     assert 'system' in checker._info
     assert checker._info['system'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
 
+@patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
+@patch('health_checker.service_checker.ServiceChecker._get_container_folder', MagicMock(return_value=test_path))
+@patch('health_checker.service_checker.ServiceChecker.check_by_monit', MagicMock())
+@patch('health_checker.service_checker.ServiceChecker.update_process_states', MagicMock())
+@patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False))
+@patch('docker.DockerClient')
+@patch('health_checker.utils.run_command')
+@patch('swsscommon.swsscommon.ConfigDBConnector')
+def test_service_checker_process_state_table(mock_config_db, mock_run, mock_docker_client):
+    mock_db_data = MagicMock()
+    mock_db_data.get_table = MagicMock(return_value={
+        'snmp': {
+            'state': 'enabled',
+            'has_global_scope': 'True',
+            'has_per_asic_scope': 'False',
+        }
+    })
+    mock_config_db.return_value = mock_db_data
+    mock_snmp_container = MagicMock()
+    mock_snmp_container.name = 'snmp'
+    mock_docker_client_object = MagicMock()
+    mock_docker_client.return_value = mock_docker_client_object
+    mock_docker_client_object.containers.list = MagicMock(return_value=[mock_snmp_container])
+    mock_run.return_value = mock_supervisorctl_output
+
+    checker = ServiceChecker()
+
+    # Up to date entry of PROCESS_STATE table is used instead of docker exec
+    checker.process_states = {
+        'snmp': {
+            'snmpd': 'EXITED',
+            'snmp-subagent': 'RUNNING',
+            'update_time': str(int(time.time()))
+        }
+    }
+    mock_run.reset_mock()
+    checker.check(Config())
+    assert not any('docker exec' in call[0][0] for call in mock_run.call_args_list)
+    assert checker._info['snmp:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    assert checker._info['snmp:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+
+    # Stale entry is ignored
+    checker.process_states['snmp']['update_time'] = str(int(time.time()) - ServiceChecker.PROCESS_STATE_STALE_TIMEOUT - 1)
+    checker.check(Config())
+    assert any('docker exec' in call[0][0] for call in mock_run.call_args_list)
+    assert checker._info['snmp:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+    assert checker._info['snmp:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+
+
 @patch('health_checker.service_checker.ServiceChecker.check_services', MagicMock())
 @patch('health_checker.utils.run_command')
 def test_service_checker_check_by_monit(mock_run):
@@ -516,6 +566,8 @@ def test_manager(mock_hw_info, mock_service_info, mock_udc_info):
 
     manager = HealthCheckerManager()
     manager.config.user_defined_checkers = ['some check']
+    # run all checkers on every check
+    manager.config.checker_intervals = {'ServiceChecker': 0, 'HardwareChecker': 0, 'UserDefinedChecker': 0}
     assert len(manager._checkers) == 2
 
     mock_hw_info.return_value = {
@@ -563,6 +615,12 @@ def test_manager(mock_hw_info, mock_service_info, mock_udc_info):
     assert stat['Internal']['ServiceChecker']['status'] == 'Not OK'
     assert stat['Internal']['HardwareChecker']['status'] == 'Not OK'
     assert stat['Internal']['UserDefinedChecker - some check']['status'] == 'Not OK'
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+
+    checker_stats = manager.get_checker_stats()
+    assert set(checker_stats.keys()) == {'ServiceChecker', 'HardwareChecker', 'UserDefinedChecker - some check'}
+    assert checker_stats['ServiceChecker']['duration'] >= 0
+    assert manager.get_check_interval() == 0
 
     chassis.set_status_led.side_effect = NotImplementedError()
     manager._set_system_led(chassis)
@@ -873,12 +931,136 @@ def test_healthd_check_interval(mock_time):
     daemon.stop_event.wait = MagicMock()
 
     daemon.stop_event.wait.return_value = False
-    manager.config.interval = 60
+    manager.get_check_interval.return_value = 60
+    manager.get_checker_stats.return_value = {'ServiceChecker': {'duration': 1.5, 'last_check': 100}}
     mock_time.side_effect = [0, 3, 0, 61, 0, 1]
     assert daemon._run_checker(manager, chassis)
     daemon.stop_event.wait.assert_called_with(57)
+    assert MockConnector.data['SYSTEM_HEALTH_CHECKER_STATS|ServiceChecker'] == {'duration': '1.500', 'last_check': '100'}
     assert daemon._run_checker(manager, chassis)
     daemon.stop_event.wait.assert_called_with(1)
 
     daemon.stop_event.wait.return_value = True
     assert not daemon._run_checker(manager, chassis)
+
+
+@patch('swsscommon.swsscommon.ConfigDBConnector', MagicMock())
+@patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
+@patch('health_checker.service_checker.ServiceChecker.check', MagicMock())
+@patch('health_checker.hardware_checker.HardwareChecker.get_info', MagicMock(return_value={}))
+@patch('health_checker.service_checker.ServiceChecker.get_info', MagicMock(return_value={}))
+@patch('health_checker.hardware_checker.HardwareChecker.check')
+def test_manager_checker_schedule(mock_hw_check):
+    import threading
+    chassis = MagicMock()
+    manager = HealthCheckerManager()
+    manager.config.checker_intervals = {'ServiceChecker': 0, 'HardwareChecker': 60}
+    manager.config.checker_timeouts = {'HardwareChecker': 0.1}
+
+    # hardware checker is checked once in its interval
+    manager.check(chassis)
+    manager.check(chassis)
+    assert mock_hw_check.call_count == 1
+    assert manager.get_check_interval() == 0
+
+    # a checker exceeding its timeout is reported and not started again until it finishes
+    event = threading.Event()
+    mock_hw_check.side_effect = lambda config: event.wait()
+    manager._next_check_time.clear()
+    stat = manager.check(chassis)
+    assert stat['Internal']['HardwareChecker']['status'] == 'Not OK'
+    assert HealthChecker.summary == HealthChecker.STATUS_NOT_OK
+    manager._next_check_time.clear()
+    manager.check(chassis)
+    assert mock_hw_check.call_count == 2
+
+    event.set()
+    manager._running[manager._checkers[1]][0].result()
+    stat = manager.check(chassis)
+    assert 'Internal' not in stat
+    assert HealthChecker.summary == HealthChecker.STATUS_OK
+
+
+@patch('healthd.time.time')
+@patch('healthd.RedisPipeline')
+@patch('healthd.RedisCommand')
+def test_healthd_process_stat(mock_command, mock_pipeline, mock_time):
+    commands = []
+
+    def new_command():
+        command = MagicMock()
+        commands.append(command)
+        return command
+
+    mock_command.side_effect = new_command
+    daemon = HealthDaemon()
+    daemon._db.get_redis_client = MagicMock()
+    daemon._db.get = MagicMock(return_value='1001')
+    daemon._db.get_all = MagicMock(return_value={'ntp': 'ntp is not running', 'summary': HealthChecker.STATUS_NOT_OK,
+                                                 'generation': '900'})
+    mock_time.return_value = 1000
+    stat = {
+        'Services': {
+            'snmp:snmpd': {
+                HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
+                HealthChecker.INFO_FIELD_OBJECT_MSG: 'snmpd is not running'
+            },
+            'telemetry': {
+                HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_OK,
+                HealthChecker.INFO_FIELD_OBJECT_MSG: ''
+            }
+        }
+    }
+    HealthChecker.summary = HealthChecker.STATUS_NOT_OK
+
+    # First write replaces the table, without deleting it
+    daemon._process_stat(None, None, stat)
+    assert len(commands) == 2
+    commands[0].formatHDEL.assert_called_once_with(HealthDaemon.SYSTEM_HEALTH_TABLE_NAME, ['ntp'])
+    assert not commands[0].formatDEL.called
+    commands[1].formatHSET.assert_called_once_with(HealthDaemon.SYSTEM_HEALTH_TABLE_NAME, {
+        'snmp:snmpd': 'snmpd is not running',
+        'summary': HealthChecker.STATUS_NOT_OK,
+        'generation': '1001'
+    })
+    assert mock_pipeline.return_value.flush.call_count == 1
+
+    # Nothing is written if nothing changed
+    daemon._process_stat(None, None, copy.deepcopy(stat))
+    assert len(commands) == 2
+    assert mock_pipeline.return_value.flush.call_count == 1
+
+    # Only the changed fields are written
+    stat['Services']['snmp:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] = HealthChecker.STATUS_OK
+    HealthChecker.summary = HealthChecker.STATUS_OK
+    daemon._process_stat(None, None, stat)
+    assert len(commands) == 4
+    commands[2].formatHDEL.assert_called_once_with(HealthDaemon.SYSTEM_HEALTH_TABLE_NAME, ['snmp:snmpd'])
+    commands[3].formatHSET.assert_called_once_with(HealthDaemon.SYSTEM_HEALTH_TABLE_NAME, {
+        'summary': HealthChecker.STATUS_OK,
+        'generation': '1002'
+    })
+    assert mock_pipeline.return_value.flush.call_count == 2
+
+    # The table is rewritten if it was removed
+    daemon._db.get = MagicMock(return_value=None)
+    daemon._db.get_all = MagicMock(return_value={})
+    daemon._process_stat(None, None, stat)
+    assert len(commands) == 5
+    commands[4].formatHSET.assert_called_once_with(HealthDaemon.SYSTEM_HEALTH_TABLE_NAME, {
+        'summary': HealthChecker.STATUS_OK,
+        'generation': '1003'
+    })
+
+    # and periodically
+    daemon._db.get = MagicMock(return_value='1003')
+    daemon._db.get_all = MagicMock(return_value={'summary': HealthChecker.STATUS_OK, 'generation': '1003'})
+    daemon._process_stat(None, None, stat)
+    assert len(commands) == 5
+    mock_time.return_value = 1000 + HealthDaemon.FULL_WRITE_INTERVAL
+    daemon._process_stat(None, None, stat)
+    assert len(commands) == 6
+    commands[5].formatHSET.assert_called_once_with(HealthDaemon.SYSTEM_HEALTH_TABLE_NAME, {
+        'summary': HealthChecker.STATUS_OK,
+        'generation': '1301'
+    })